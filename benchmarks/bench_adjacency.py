@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: raising boxes and churning connections on a busy box
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+# ------------------------------------------------------------------------------------------------------------
+# One split hardware group, every other box connects to both of its halves
+
+def makeHub(connection_count, ports_per_group=8):
+    graph = graph_t()
+    graph.groups = [(1, "system", patchcanvas.SPLIT_YES, patchcanvas.ICON_HARDWARE)]
+    graph.ports  = []
+    graph.connections = []
+
+    for i in range(connection_count // 2):
+        graph.ports.append((1, i*2+1, "capture_%i" % i, patchcanvas.PORT_MODE_OUTPUT, patchcanvas.PORT_TYPE_AUDIO_JACK))
+        graph.ports.append((1, i*2+2, "playback_%i" % i, patchcanvas.PORT_MODE_INPUT, patchcanvas.PORT_TYPE_AUDIO_JACK))
+
+    port_id = connection_count + 1
+
+    for i in range(connection_count // 2):
+        group_id = 2 + i // ports_per_group
+
+        if i % ports_per_group == 0:
+            graph.groups.append((group_id, "client_%i" % group_id, patchcanvas.SPLIT_NO, patchcanvas.ICON_APPLICATION))
+
+        graph.ports.append((group_id, port_id, "in_%i" % i, patchcanvas.PORT_MODE_INPUT, patchcanvas.PORT_TYPE_AUDIO_JACK))
+        graph.ports.append((group_id, port_id+1, "out_%i" % i, patchcanvas.PORT_MODE_OUTPUT, patchcanvas.PORT_TYPE_AUDIO_JACK))
+        graph.connections.append((i*2+1, i*2+1, port_id))
+        graph.connections.append((i*2+2, port_id+1, i*2+2))
+        port_id += 2
+
+    return graph
+
+def raiseBoxes(boxes, rounds):
+    for i in range(rounds):
+        for box in boxes:
+            patchcanvas.canvas.last_z_value += 1
+            box.setZValue(patchcanvas.canvas.last_z_value)
+            box.resetLinesZValue()
+
+def disconnectAll(graph):
+    for connection in graph.connections:
+        patchcanvas.disconnectPorts(connection[0])
+
+def connectAll(graph):
+    for connection in graph.connections:
+        patchcanvas.connectPorts(*connection)
+
+if __name__ == '__main__':
+    connection_count = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    app, view, scene = initCanvas()
+
+    graph = makeHub(connection_count)
+    populate(graph, True)
+
+    boxes = []
+    for group in patchcanvas.canvas.groups.values():
+        boxes += [box for box in group.widgets if box is not None]
+
+    print("%i boxes, %i connections" % (len(boxes), len(graph.connections)))
+
+    timeit("raise every box, %i rounds" % rounds, raiseBoxes, boxes, rounds)
+    timeit("raise hardware boxes, %i rounds" % rounds, raiseBoxes, boxes[:2], rounds)
+
+    with patchcanvas.batch():
+        timeit("disconnect all", disconnectAll, graph)
+        timeit("connect all", connectAll, graph)
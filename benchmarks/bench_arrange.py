@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: automatic layout
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+from patchcanvas_arrange import *
+
+# ------------------------------------------------------------------------------------------------------------
+# Synthetic signal flow: capture -> clients in a few stages -> playback, with some feedback
+
+def makeArrangeGraph(box_count, edge_count, stages=6, seed=0):
+    rand = random.Random(seed)
+
+    boxes = []
+    stage = {}
+
+    for i in range(box_count):
+        box = arrange_box_t()
+        box.key    = (i, patchcanvas.PORT_MODE_NULL)
+        box.x      = rand.randint(0, 3000)
+        box.y      = rand.randint(0, 3000)
+        box.width  = rand.randint(80, 200)
+        box.height = rand.randint(40, 300)
+
+        if i < 4:
+            box.kind = ARRANGE_SOURCE
+            stage[box.key] = 0
+        elif i < 8:
+            box.kind = ARRANGE_SINK
+            stage[box.key] = stages + 1
+        else:
+            box.kind = ARRANGE_CLIENT
+            stage[box.key] = rand.randint(1, stages)
+
+        boxes.append(box)
+
+    edges = {}
+    while len(edges) < edge_count:
+        box_out = rand.choice(boxes)
+        box_in  = rand.choice(boxes)
+
+        if box_out is box_in or box_out.kind == ARRANGE_SINK or box_in.kind == ARRANGE_SOURCE:
+            continue
+
+        # Mostly forward, sometimes feedback
+        if stage[box_out.key] >= stage[box_in.key] and rand.random() > 0.05:
+            continue
+
+        edges[(box_out.key, box_in.key)] = rand.randint(1, 4)
+
+    return (boxes, edges)
+
+def addOneClient(boxes, edges, result):
+    # Existing boxes are where the last layout put them
+    for box in boxes:
+        box.x, box.y = result.positions[box.key]
+
+    box = arrange_box_t()
+    box.key    = (len(boxes), patchcanvas.PORT_MODE_NULL)
+    box.kind   = ARRANGE_CLIENT
+    box.x      = 0
+    box.y      = 0
+    box.width  = 120
+    box.height = 80
+
+    new_edges = dict(edges)
+    new_edges[(boxes[0].key, box.key)] = 2
+    new_edges[(box.key, boxes[5].key)] = 2
+
+    return (boxes + [box], new_edges)
+
+def runCanvasArrange(graph):
+    patchcanvas.arrange()
+    patchcanvas.canvas.arrange_thread.wait()
+    QApplication.processEvents()
+
+if __name__ == '__main__':
+    for box_count, edge_count in ((100, 500), (500, 5000), (1000, 10000)):
+        boxes, edges = makeArrangeGraph(box_count, edge_count)
+        print("%i boxes, %i edges" % (box_count, edge_count))
+
+        result = timeit("  full layout", arrangeGraph, boxes, edges)
+        print("%-40s %9i" % ("  crossings", result.crossings))
+
+        boxes, edges = addOneClient(boxes, edges, result)
+        inc_result = timeit("  add one client (incremental)", arrangeGraph, boxes, edges, result.state)
+        print("%-40s %9i" % ("  boxes moved", len(inc_result.positions)))
+
+    # Whole canvas path: snapshot, layout thread, applying positions and updating lines
+    for port_count, connection_count in ((8000, 5000), (16000, 10000)):
+        app, view, scene = initCanvas()
+        graph = makeGraph(port_count, connection_count)
+        populate(graph, True)
+
+        # Let the scene build its item index first, it is not part of arrange()
+        QApplication.processEvents()
+
+        print("canvas, %i groups, %i ports, %i connections" % (len(graph.groups), len(graph.ports), len(graph.connections)))
+        timeit("  arrange()", runCanvasArrange, graph)
+        timeit("  arrange() again", runCanvasArrange, graph)
+
+        patchcanvas.clear()
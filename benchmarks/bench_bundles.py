@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: rendering heavily routed graphs, with and without connection bundles
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+# ------------------------------------------------------------------------------------------------------------
+# A studio-like graph, every client feeds all its channels to a few others
+
+def makeRoutedGraph(group_count, channels, fan_out):
+    graph = makeGraph(group_count * channels * 2, 0, ports_per_group=channels*2)
+
+    for group_out in range(group_count):
+        for step in range(1, fan_out+1):
+            group_in = (group_out + step) % group_count
+
+            for channel in range(channels):
+                # ports alternate output and input inside each group
+                port_out_id = group_out * channels * 2 + channel * 2 + 1
+                port_in_id  = group_in  * channels * 2 + channel * 2 + 2
+                graph.connections.append((len(graph.connections)+1, port_out_id, port_in_id))
+
+    return graph
+
+def spreadBoxes(graph, columns=8):
+    for i, group in enumerate(graph.groups):
+        x = (i % columns) * 500
+        y = (i // columns) * 900
+        patchcanvas.setGroupPosFull(group[0], x, y, x, y + 450)
+
+    QApplication.processEvents()
+
+def renderFrames(view, frames):
+    for i in range(frames):
+        view.viewport().repaint()
+
+def countItems(scene):
+    lines = sum(1 for connection in patchcanvas.canvas.connections.values() if connection.widget is not None)
+    return lines, len(patchcanvas.canvas.bundles), len(scene.items())
+
+if __name__ == '__main__':
+    group_count = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    channels = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    frames = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    graph = makeRoutedGraph(group_count, channels, 3)
+
+    for bundle_connections in (False, True):
+        if bundle_connections:
+            patchcanvas.clear()
+
+        app, view, scene = initCanvas(bundle_connections=bundle_connections)
+        view.resize(1280, 800)
+        view.show()
+
+        print("bundles %s, %i groups, %i connections" % ("on" if bundle_connections else "off", len(graph.groups), len(graph.connections)))
+
+        timeit("  populate", populate, graph, True)
+        spreadBoxes(graph)
+
+        lines, bundles, items = countItems(scene)
+        print("%-40s %9i" % ("  line items", lines))
+        print("%-40s %9i" % ("  bundle items", bundles))
+        print("%-40s %9i" % ("  scene items", items))
+
+        # Close enough for full detail, while still showing most of the graph
+        view.resetTransform()
+        view.scale(0.6, 0.6)
+        view.centerOn(scene.itemsBoundingRect().center())
+        QApplication.processEvents()
+
+        start = time.perf_counter()
+        renderFrames(view, frames)
+        print("%-40s %9.1f ms" % ("  render, per frame", (time.perf_counter() - start) * 1000 / frames))
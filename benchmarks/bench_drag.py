@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: dragging a box with many connections
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+# ------------------------------------------------------------------------------------------------------------
+# Count line paths and gradients being built
+
+gCounters = {}
+
+def countCalls(name, func):
+    def wrapper(*args):
+        gCounters[name] = gCounters.get(name, 0) + 1
+        return func(*args)
+    return wrapper
+
+patchcanvas.CanvasBezierLine.setPath = countCalls("paths", patchcanvas.QGraphicsPathItem.setPath)
+patchcanvas.CanvasLine.setLine = countCalls("paths", patchcanvas.QGraphicsLineItem.setLine)
+patchcanvas.QLinearGradient = countCalls("gradients", patchcanvas.QLinearGradient)
+
+# ------------------------------------------------------------------------------------------------------------
+# One box in the middle, connected to a column of boxes on each side
+
+def makeHub(connection_count, ports_per_group=8):
+    with patchcanvas.batch():
+        patchcanvas.addGroup(1, "hub", patchcanvas.SPLIT_NO, patchcanvas.ICON_APPLICATION)
+
+        for i in range(connection_count // 2):
+            patchcanvas.addPort(1, i*2+1, "out_%i" % i, patchcanvas.PORT_MODE_OUTPUT, patchcanvas.PORT_TYPE_AUDIO_JACK)
+            patchcanvas.addPort(1, i*2+2, "in_%i" % i, patchcanvas.PORT_MODE_INPUT, patchcanvas.PORT_TYPE_AUDIO_JACK)
+
+        port_id = connection_count + 1
+
+        for i in range(connection_count // 2):
+            group_id = 2 + i // ports_per_group
+
+            if i % ports_per_group == 0:
+                patchcanvas.addGroup(group_id, "client_%i" % group_id, patchcanvas.SPLIT_NO, patchcanvas.ICON_APPLICATION)
+
+            patchcanvas.addPort(group_id, port_id, "in_%i" % i, patchcanvas.PORT_MODE_INPUT, patchcanvas.PORT_TYPE_AUDIO_JACK)
+            patchcanvas.addPort(group_id, port_id+1, "out_%i" % i, patchcanvas.PORT_MODE_OUTPUT, patchcanvas.PORT_TYPE_AUDIO_JACK)
+            patchcanvas.connectPorts(i*2+1, i*2+1, port_id)
+            patchcanvas.connectPorts(i*2+2, port_id+1, i*2+2)
+            port_id += 2
+
+    for group_id in range(2, 2 + (connection_count // 2 + ports_per_group - 1) // ports_per_group):
+        patchcanvas.setGroupPos(group_id, 600 if group_id % 2 else -600, (group_id // 2) * 120)
+
+    patchcanvas.setGroupPos(1, 0, 0)
+    QApplication.processEvents()
+
+def dragFrames(view, box, frames, paint=True):
+    pos = box.pos()
+
+    for i in range(frames):
+        box.setPos(pos.x() + i % 40, pos.y() + i % 30)
+        if paint:
+            view.viewport().repaint()
+
+def repaintFrames(view, frames):
+    for i in range(frames):
+        view.viewport().repaint()
+
+def run(title, func, *args):
+    gCounters.clear()
+    timeit(title, func, *args)
+    print("%-40s %9i" % ("  line paths built", gCounters.get("paths", 0)))
+    print("%-40s %9i" % ("  gradients built", gCounters.get("gradients", 0)))
+
+if __name__ == '__main__':
+    connection_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    app, view, scene = initCanvas()
+    view.resize(1280, 800)
+    view.show()
+
+    makeHub(connection_count)
+    view.fitInView(scene.itemsBoundingRect(), patchcanvas.Qt.KeepAspectRatio)
+    QApplication.processEvents()
+
+    box = patchcanvas.canvas.groups[1].widgets[0]
+
+    run("drag hub, %i connections, %i frames" % (connection_count, frames), dragFrames, view, box, frames)
+    run("drag hub, no painting", dragFrames, view, box, frames, False)
+    run("repaint only, %i frames" % frames, repaintFrames, view, frames)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: fading in a whole graph with full eyecandy
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+# ------------------------------------------------------------------------------------------------------------
+# Count rendered frames
+
+gFrameCount = 0
+
+def countFrames(drawBackground):
+    def wrapper(self, painter, rect):
+        global gFrameCount
+        gFrameCount += 1
+        return drawBackground(self, painter, rect)
+    return wrapper
+
+patchcanvas.PatchScene.drawBackground = countFrames(patchcanvas.PatchScene.drawBackground)
+
+# ------------------------------------------------------------------------------------------------------------
+
+def waitForFades(timeout=10.0):
+    start = time.perf_counter()
+
+    while patchcanvas.canvas.fade_animation.fadeCount() > 0 and time.perf_counter() - start < timeout:
+        QApplication.processEvents()
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    conn_count = int(sys.argv[2]) if len(sys.argv) > 2 else port_count*2
+
+    app, view, scene = initCanvas(patchcanvas.EYECANDY_FULL)
+    view.resize(1280, 800)
+    view.show()
+
+    graph = makeGraph(port_count, conn_count)
+    print("%i groups, %i ports, %i connections" % (len(graph.groups), len(graph.ports), len(graph.connections)))
+
+    # Not batched, every item starts its own fade
+    timeit("populate", populate, graph)
+    print("%-40s %9i" % ("  running fades", patchcanvas.canvas.fade_animation.fadeCount()))
+
+    gFrameCount = 0
+    timeit("fade in", waitForFades)
+    print("%-40s %9i" % ("  frames", gFrameCount))
+
+    for connection in graph.connections:
+        patchcanvas.disconnectPorts(connection[0])
+
+    gFrameCount = 0
+    timeit("fade out connections", waitForFades)
+    print("%-40s %9i" % ("  frames", gFrameCount))
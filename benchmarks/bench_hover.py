@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: hovering ports while dragging a new connection
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+if True:
+    from PyQt5.QtCore import QEvent
+    from PyQt5.QtGui import QMouseEvent
+    from PyQt5.QtTest import QTest
+
+def spreadBoxes(graph, columns=16):
+    for i, group in enumerate(graph.groups):
+        x = (i % columns) * 300
+        y = (i // columns) * 400
+        patchcanvas.setGroupPosFull(group[0], x, y, x, y + 200)
+
+    QApplication.processEvents()
+
+# QTest moves carry no buttons, send those directly
+def sendMouseMove(view, scene_pos):
+    pos = view.mapFromScene(scene_pos)
+    event = QMouseEvent(QEvent.MouseMove, patchcanvas.QPointF(pos), patchcanvas.Qt.NoButton, patchcanvas.Qt.LeftButton, patchcanvas.Qt.NoModifier)
+    QApplication.sendEvent(view.viewport(), event)
+
+# Drag from one port over every other port of the scene, in a fixed order
+def dragOverPorts(view, port, targets):
+    QTest.mousePress(view.viewport(), patchcanvas.Qt.LeftButton, patchcanvas.Qt.NoModifier, view.mapFromScene(port.sceneBoundingRect().center()))
+
+    hovered = 0
+    for target in targets:
+        sendMouseMove(view, target.sceneBoundingRect().center())
+        if port.m_hover_item is not None:
+            hovered += 1
+
+    # Release on empty space, no connection is made
+    QTest.mouseRelease(view.viewport(), patchcanvas.Qt.LeftButton, patchcanvas.Qt.NoModifier, view.mapFromScene(patchcanvas.QPointF(-1000, -1000)))
+    return hovered
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    app, view, scene = initCanvas()
+    view.resize(1280, 800)
+    view.show()
+
+    graph = makeGraph(port_count, port_count*2)
+    populate(graph, True)
+    spreadBoxes(graph)
+
+    # Let the scene build its item index first
+    QApplication.processEvents()
+
+    ports   = [port.widget for port in patchcanvas.canvas.ports.values()]
+    port    = ports[0]
+    targets = ports[1:]
+
+    hovered = timeit("drag over %i ports" % len(targets), dragOverPorts, view, port, targets)
+    print("%-40s %9i" % ("  compatible ports hovered", hovered))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: box icons
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+# Icons come from the Qt resources
+loadResources()
+
+# ------------------------------------------------------------------------------------------------------------
+# Count SVG renderers being created
+
+gRendererCount = 0
+
+def countRenderers(QSvgRenderer):
+    def wrapper(*args):
+        global gRendererCount
+        gRendererCount += 1
+        return QSvgRenderer(*args)
+    return wrapper
+
+patchcanvas.QSvgRenderer = countRenderers(patchcanvas.QSvgRenderer)
+
+# ------------------------------------------------------------------------------------------------------------
+# Clients with the usual names, every 10th is split hardware
+
+CLIENT_NAMES = ("vlc", "audacious", "clementine", "jamin", "mplayer", "distrho", "client")
+
+def addClients(client_count):
+    for group_id in range(1, client_count+1):
+        if group_id % 10 == 0:
+            patchcanvas.addGroup(group_id, "system_%i" % group_id, patchcanvas.SPLIT_YES, patchcanvas.ICON_HARDWARE)
+        else:
+            patchcanvas.addGroup(group_id, "%s_%i" % (CLIENT_NAMES[group_id % len(CLIENT_NAMES)], group_id),
+                                 patchcanvas.SPLIT_NO, patchcanvas.ICON_APPLICATION)
+
+    QApplication.processEvents()
+
+def spreadBoxes(client_count):
+    columns = 20
+
+    for group_id in range(1, client_count+1):
+        x = ((group_id - 1) % columns) * 220
+        y = ((group_id - 1) // columns) * 60
+        patchcanvas.setGroupPosFull(group_id, x, y, x, y + 30)
+
+    QApplication.processEvents()
+
+def repaintFrames(view, frames):
+    for i in range(frames):
+        view.viewport().repaint()
+
+if __name__ == '__main__':
+    client_count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    app, view, scene = initCanvas()
+    view.resize(1280, 800)
+    view.show()
+
+    timeit("add %i clients" % client_count, addClients, client_count)
+    print("%-40s %9i" % ("  svg renderers", gRendererCount))
+
+    spreadBoxes(client_count)
+    view.fitInView(scene.itemsBoundingRect(), patchcanvas.Qt.KeepAspectRatio)
+    QApplication.processEvents()
+    timeit("repaint all, %i frames" % frames, repaintFrames, view, frames)
+
+    view.resetTransform()
+    view.scale(2.0, 2.0)
+    QApplication.processEvents()
+    timeit("repaint at 200%%, %i frames" % frames, repaintFrames, view, frames)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Catia benchmark: populating the canvas from the JACK graph at start-up
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# Runs Catia's own initPorts() on a synthetic JACK graph, canvas included.
+# With "--baseline <rev>", the same is also run on the src and resources of that git revision.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import ctypes
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Set when running on the copy of another revision
+REVISION = os.environ.pop("BENCH_REVISION", "working tree")
+
+# Catia settings and logs are found from HOME
+os.environ["HOME"] = tempfile.mkdtemp(prefix="bench_jack_bootstrap_")
+os.environ["XDG_RUNTIME_DIR"] = os.environ["HOME"]
+os.environ.pop("XDG_CONFIG_HOME", None)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.svg=false")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+# ------------------------------------------------------------------------------------------------------------
+# Real jacklib on top of a library of no-op functions, its port functions then serve a synthetic graph
+
+class fake_function_t(object):
+    def __call__(self, *args):
+        return 0
+
+class fake_library_t(object):
+    def __getattr__(self, name):
+        func = fake_function_t()
+        setattr(self, name, func)
+        return func
+
+loadLibrary = ctypes.cdll.LoadLibrary
+ctypes.cdll.LoadLibrary = lambda name: fake_library_t()
+
+try:
+    import jacklib
+finally:
+    ctypes.cdll.LoadLibrary = loadLibrary
+
+class fake_graph_t(object):
+    __slots__ = [
+        'names',       # [name]
+        'flags',       # {name: flags}
+        'connections', # {name: [name]}
+        'calls'        # {function name: count}
+    ]
+
+gGraph = fake_graph_t()
+gGraph.names = []
+gGraph.flags = {}
+gGraph.connections = {}
+gGraph.calls = {}
+
+def fakeCall(func):
+    def wrapper(*args):
+        gGraph.calls[func.__name__] = gGraph.calls.get(func.__name__, 0) + 1
+        return func(*args)
+    setattr(jacklib, func.__name__, wrapper)
+    return wrapper
+
+@fakeCall
+def client_open(client_name, options, status, uuid=""):
+    return None
+
+@fakeCall
+def custom_get_data(client, client_name, key):
+    return (-1, None, 0)
+
+@fakeCall
+def get_ports(client, port_name_pattern, type_name_pattern, flags):
+    return [name.encode("utf-8") for name in gGraph.names] + [None]
+
+@fakeCall
+def port_by_name(client, port_name):
+    return port_name if port_name in gGraph.flags else None
+
+@fakeCall
+def port_flags(port):
+    return gGraph.flags[port]
+
+@fakeCall
+def port_type(port):
+    return jacklib.JACK_DEFAULT_AUDIO_TYPE.encode("utf-8")
+
+@fakeCall
+def port_get_aliases(port):
+    return (0, "", "")
+
+@fakeCall
+def port_get_all_connections(client, port):
+    return [name.encode("utf-8") for name in gGraph.connections.get(port, ())] + [None]
+
+jacklib.free = lambda ptr: None
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom Stuff)
+
+from PyQt5.QtWidgets import QApplication
+
+from build_ui import loadUi
+
+for uiName in ("catia", "logs", "render", "settings_app", "settings_jack"):
+    loadUi(uiName)
+
+app = QApplication(sys.argv)
+
+import catia
+import patchcanvas
+import properties_helper
+
+# ------------------------------------------------------------------------------------------------------------
+# Synthetic graph, the first client is physical and every 4th one is a2j
+
+A2J_CLIENT_NAME = "a2j"
+
+def makeGraph(port_count, ports_per_client=16):
+    gGraph.names = []
+    gGraph.flags = {}
+    gGraph.connections = {}
+
+    for i in range(port_count):
+        client = i // ports_per_client
+        if client % 4 == 3:
+            name = "%s:client_%i [%i] (capture): port_%i" % (A2J_CLIENT_NAME, client, client, i)
+        else:
+            name = "client_%i:port_%i" % (client, i)
+
+        gGraph.names.append(name)
+        gGraph.flags[name] = jacklib.JackPortIsOutput if i % 2 else jacklib.JackPortIsInput
+
+        if client == 0:
+            gGraph.flags[name] |= jacklib.JackPortIsPhysical
+
+    for i in range(1, port_count, 2):
+        gGraph.connections[gGraph.names[i]] = [gGraph.names[(i * 7 + 2 * j) % port_count - (i * 7 + 2 * j) % 2]
+                                               for j in range(3)]
+
+# ------------------------------------------------------------------------------------------------------------
+# Catia main window, started with JACK off so it comes up with an empty canvas
+
+def initCatia():
+    catia.app = app
+    catia.haveDBus = False
+    catia.gDBus.jack = None
+    catia.gDBus.a2j  = None
+    catia.gA2JClientName = A2J_CLIENT_NAME
+
+    properties_helper._instance = catia.GroupPropertiesHelper(Debug=False)
+
+    return catia.CatiaMainW()
+
+def stopCatia():
+    catia.GroupPropertiesHelper.instance().stop()
+
+def run(window, port_count):
+    makeGraph(port_count)
+    patchcanvas.clear()
+
+    catia.gJack.client = object()
+    gGraph.calls = {}
+
+    start = time.perf_counter()
+    window.initPorts()
+    msecs = (time.perf_counter() - start) * 1000
+
+    catia.gJack.client = None
+
+    print("%-30s %9.1f ms, %i ports, %i connections, %i jack calls" % ("  %i ports" % port_count, msecs,
+                                                                          window.fLastPortId - 1,
+                                                                          window.fLastConnectionId - 1,
+                                                                          sum(gGraph.calls.values())))
+
+# ------------------------------------------------------------------------------------------------------------
+# The same benchmark on another revision, from a copy of its tree
+
+def runBaseline(revision, port_counts):
+    repoDir = os.path.join(BENCH_DIR, "..")
+    treeDir = tempfile.mkdtemp(prefix="bench_jack_bootstrap_tree_")
+
+    try:
+        archive = subprocess.check_output(["git", "-C", repoDir, "archive", revision, "src", "resources"])
+        subprocess.run(["tar", "-x", "-C", treeDir], input=archive, check=True)
+
+        os.mkdir(os.path.join(treeDir, "benchmarks"))
+        for fileName in ("bench_jack_bootstrap.py", "build_ui.py"):
+            shutil.copy(os.path.join(BENCH_DIR, fileName), os.path.join(treeDir, "benchmarks"))
+
+        sys.stdout.flush()
+        subprocess.check_call([sys.executable, os.path.join(treeDir, "benchmarks", "bench_jack_bootstrap.py")] +
+                              [str(port_count) for port_count in port_counts],
+                              env=dict(os.environ, BENCH_REVISION=revision))
+    finally:
+        shutil.rmtree(treeDir)
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    baseline = None
+
+    if "--baseline" in args:
+        index = args.index("--baseline")
+        baseline = args[index+1]
+        del args[index:index+2]
+
+    port_counts = [int(arg) for arg in args] or (1000, 5000)
+
+    window = initCatia()
+
+    print("initPorts() at %s" % REVISION)
+    for port_count in port_counts:
+        run(window, port_count)
+
+    stopCatia()
+
+    if baseline is not None:
+        runBaseline(baseline, port_counts)
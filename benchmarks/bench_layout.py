@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: box layout while adding ports
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+gLayoutCount = 0
+
+def countLayouts(updatePositions):
+    def wrapper(self):
+        global gLayoutCount
+        gLayoutCount += 1
+        return updatePositions(self)
+    return wrapper
+
+patchcanvas.CanvasBox.updatePositions = countLayouts(patchcanvas.CanvasBox.updatePositions)
+
+def addHardwareBox(channels):
+    patchcanvas.addGroup(1, "system", patchcanvas.SPLIT_YES, patchcanvas.ICON_HARDWARE)
+
+    for i in range(channels):
+        patchcanvas.addPort(1, i*2+1, "capture_%i" % (i+1), patchcanvas.PORT_MODE_OUTPUT, patchcanvas.PORT_TYPE_AUDIO_JACK)
+        patchcanvas.addPort(1, i*2+2, "playback_%i" % (i+1), patchcanvas.PORT_MODE_INPUT, patchcanvas.PORT_TYPE_AUDIO_JACK)
+
+    QApplication.processEvents()
+
+def run(title, func, *args):
+    global gLayoutCount
+    gLayoutCount = 0
+    timeit(title, func, *args)
+    print("%-40s %9i" % ("  box layouts", gLayoutCount))
+
+if __name__ == '__main__':
+    channels   = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    port_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    app, view, scene = initCanvas()
+
+    run("hardware box, %i channels" % channels, addHardwareBox, channels)
+    patchcanvas.clear()
+
+    patchcanvas.init("CanvasBench", scene, canvasCallback)
+    graph = makeGraph(port_count, port_count*2)
+    run("populate, %i ports" % port_count, populate, graph)
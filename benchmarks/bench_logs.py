@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Cadence benchmark: Logs window CPU use, idle and with one busy log
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+# Logs files are found from HOME when importing logs
+HOME_DIR = tempfile.mkdtemp(prefix="bench_logs_")
+os.environ["HOME"] = HOME_DIR
+
+LOG_FILES = (("jack", "jackdbus.log"), ("a2j", "a2j.log"), ("lash", "lash.log"), ("ladish", "ladish.log"))
+
+for logDir, logFile in LOG_FILES:
+    os.makedirs(os.path.join(HOME_DIR, ".log", logDir))
+    with open(os.path.join(HOME_DIR, ".log", logDir, logFile), "w") as file:
+        file.write("".join("%s line %i\n" % (logDir, i) for i in range(10000)))
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from build_ui import loadUi
+
+# Built here when 'make' wasn't run
+loadUi("logs")
+
+import logs
+
+# ------------------------------------------------------------------------------------------------------------
+
+def cpuTime():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+# Appends lines to the JACK log at a fixed rate, until stopped
+def writeLines(stopEvent, linesPerSecond):
+    filename = os.path.join(HOME_DIR, ".log", "jack", "jackdbus.log")
+    count = 0
+    with open(filename, "a") as file:
+        while not stopEvent.wait(1.0 / linesPerSecond):
+            file.write("jack busy line %i\n" % count)
+            file.flush()
+            count += 1
+
+def run(title, app, window, seconds, linesPerSecond=0):
+    updates = []
+    window.fReadThread.updateLog.connect(lambda index, text: updates.append(index))
+
+    stopEvent = threading.Event()
+    writer = threading.Thread(target=writeLines, args=(stopEvent, linesPerSecond)) if linesPerSecond else None
+
+    if writer:
+        writer.start()
+
+    start = cpuTime()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    msecs = (cpuTime() - start) * 1000 / seconds
+
+    stopEvent.set()
+    if writer:
+        writer.join()
+
+    print("%-30s %9.2f ms CPU per second, %i GUI updates, %i tabs updated" % (title, msecs, len(updates), len(set(updates))))
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    app = QApplication(sys.argv)
+    window = logs.LogsW(None)
+
+    # initial load
+    run("  open", app, window, 0.5)
+
+    run("  idle", app, window, seconds)
+    run("  one log, 50 lines/s", app, window, seconds, 50)
+
+    window.close()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: the Claudia mini canvas preview
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+from canvaspreviewframe import CanvasPreviewFrame
+
+# Claudia's canvas size
+CANVAS_WIDTH  = 3100
+CANVAS_HEIGHT = 2400
+
+def spreadBoxes(graph, columns=12):
+    for i, group in enumerate(graph.groups):
+        x = (i % columns) * 250
+        y = (i // columns) * 300
+        patchcanvas.setGroupPosFull(group[0], x, y, x, y + 150)
+
+    QApplication.processEvents()
+
+# The view scrolls, the preview only needs to move its view rectangle
+def scrollFrames(preview, frames):
+    for i in range(frames):
+        preview.setViewPosX(float(i % 50) / 50)
+        preview.repaint()
+
+def renderFrames(preview, frames):
+    for i in range(frames):
+        preview.invalidate()
+        preview.updatePixmap()
+
+# A box is dragged around, the preview follows the scene changes
+def dragFrames(preview, box, frames):
+    pos = box.pos()
+
+    for i in range(frames):
+        box.setPos(pos.x() + i % 40, pos.y() + i % 30)
+        QApplication.processEvents()
+        preview.repaint()
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    app, view, scene = initCanvas()
+    view.setSceneRect(0, 0, CANVAS_WIDTH, CANVAS_HEIGHT)
+    view.resize(1280, 800)
+    view.show()
+
+    graph = makeGraph(port_count, port_count*2)
+    populate(graph, True)
+    spreadBoxes(graph)
+
+    # Let the scene build its item index first
+    QApplication.processEvents()
+
+    preview = CanvasPreviewFrame(None)
+    preview.setRealParent(preview)
+    preview.slot_miniCanvasCheckAll = lambda: None
+    preview.init(scene, CANVAS_WIDTH, CANVAS_HEIGHT)
+    preview.resize(preview.minimumSize())
+    preview.show()
+    QApplication.processEvents()
+
+    # Only time the preview
+    view.hide()
+
+    box = patchcanvas.canvas.groups[2].widgets[0]
+
+    for boxes_only in (False, True):
+        preview.setBoxesOnly(boxes_only)
+
+        print("%i ports, %s" % (port_count, "boxes only" if boxes_only else "full preview"))
+        timeit("  scroll, %i frames" % frames, scrollFrames, preview, frames)
+        timeit("  re-render, %i frames" % 10, renderFrames, preview, 10)
+        timeit("  drag a box, %i frames" % frames, dragFrames, preview, box, frames)
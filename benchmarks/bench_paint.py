@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: painting ports and boxes, without the scene around them
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+if True:
+    from PyQt5.QtGui import QImage, QPainter
+    from PyQt5.QtWidgets import QStyleOptionGraphicsItem
+
+# Calls paint() on every item directly, so only the python side and the actual drawing are measured
+def paintItems(items, rounds, selected):
+    image = QImage(64, 64, QImage.Format_ARGB32_Premultiplied)
+    option = QStyleOptionGraphicsItem()
+
+    for item in items:
+        item.setSelected(selected)
+
+    painter = QPainter(image)
+
+    for i in range(rounds):
+        for item in items:
+            item.paint(painter, option, None)
+
+    painter.end()
+
+    for item in items:
+        item.setSelected(False)
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    app, view, scene = initCanvas()
+
+    graph = makeGraph(port_count, 0)
+    populate(graph, True)
+
+    ports = [port.widget for port in patchcanvas.canvas.ports.values()]
+    boxes = [item for item in scene.items() if item.type() == patchcanvas.CanvasBoxType]
+
+    print("%i ports, %i boxes, %i rounds" % (len(ports), len(boxes), rounds))
+
+    timeit("  ports", paintItems, ports, rounds, False)
+    timeit("  ports, selected", paintItems, ports, rounds, True)
+    timeit("  boxes", paintItems, boxes, rounds, False)
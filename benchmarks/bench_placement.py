@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: box placement and box lookups by position
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+def zoomFits(scene, count):
+    for i in range(count):
+        scene.zoom_fit()
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    conn_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    app, view, scene = initCanvas()
+    graph = makeGraph(port_count, conn_count)
+
+    print("%i groups, %i ports, %i connections" % (len(graph.groups), len(graph.ports), len(graph.connections)))
+
+    timeit("populate (batch)", populate, graph, True)
+    timeit("zoom fit (x100)", zoomFits, scene, 100)
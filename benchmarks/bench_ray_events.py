@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# RaySession benchmark: delay before a launched client has its properties
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_ray_menu import installWindowTools
+from bench_ray_osc import installRayControl
+from fake_ray_daemon import FakeRayDaemon
+from properties_helper import GroupPropertiesHelper, RAY_POLL_INTERVAL
+
+# ------------------------------------------------------------------------------------------------------------
+
+def waitFor(helper, condition, timeout=RAY_POLL_INTERVAL*3):
+    start = time.perf_counter()
+    while not condition(helper.jackclients):
+        if time.perf_counter() - start > timeout:
+            return None
+        time.sleep(0.001)
+    return (time.perf_counter() - start) * 1000
+
+# Launches and removes clients one by one, timing how long until the helper thread has seen it.
+# Without monitoring, clients are only seen on the next full read.
+def run(title, helper, daemon, launches):
+    delays = []
+    for i in range(launches):
+        client_id = daemon.addClient(1000 + i)
+        delays.append(waitFor(helper, lambda jackclients: "fake-%i" % (1000 + i) in jackclients))
+        daemon.removeClient(client_id)
+        waitFor(helper, lambda jackclients: "fake-%i" % (1000 + i) not in jackclients)
+
+    delays = [delay for delay in delays if delay is not None]
+    if delays:
+        print("%-30s %9.1f ms average, %9.1f ms max, %i/%i seen" % (title, sum(delays) / len(delays), max(delays), len(delays), launches))
+    else:
+        print("%-30s never seen" % title)
+
+if __name__ == '__main__':
+    launches = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    # new clients get their windows prewarmed
+    installWindowTools(installRayControl(), 0)
+
+    for use_osc in (True, False):
+        # without OSC every value is a ray_control process, a big session takes seconds to read
+        daemon = FakeRayDaemon(20 if use_osc else 4).start()
+        os.environ["FAKE_RAY_DAEMON_PORTS"] = str(daemon.port)
+
+        helper = GroupPropertiesHelper(Debug=False, UseOsc=use_osc)
+        run("  monitor" if use_osc else "  polling", helper, daemon, launches)
+
+        helper.stop()
+        helper.thread.join()
+        daemon.stop()
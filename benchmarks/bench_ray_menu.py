@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# RaySession benchmark: building the "Go to app" menu of ray clients
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import stat
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PyQt5.QtCore import QCoreApplication
+
+from bench_ray_osc import installRayControl
+from fake_ray_daemon import FakeRayDaemon
+from properties_helper import GroupPropertiesHelper
+
+# ------------------------------------------------------------------------------------------------------------
+# Window lookup tools, answering with one window for any pid or title.
+# The delay stands for listing the X windows, which the real tools do.
+
+def installWindowTools(bin_dir, delay=0.05):
+    scripts = {
+        "getwindidbypid": "sleep %g\necho \"0x04000001 0 $2 localhost Fake window\"\n" % delay,
+        "getwindidbyregexp": "sleep %g\necho \"0x04000002 0 localhost Fake window\"\n" % delay,
+    }
+
+    for name, body in scripts.items():
+        script = os.path.join(bin_dir, name)
+        with open(script, "w") as file:
+            file.write("#!/bin/sh\n" + body)
+        os.chmod(script, os.stat(script).st_mode | stat.S_IXUSR)
+
+def openMenus(helper, jacknames):
+    start = time.perf_counter()
+    for jackname in jacknames:
+        helper.getWinIdsAndtitles(jackname)
+    return (time.perf_counter() - start) * 1000 / len(jacknames)
+
+def waitPrewarm(app, helper, jacknames):
+    app.processEvents()
+    while len(helper.snapshot.clients) < len(jacknames):
+        time.sleep(0.01)
+        app.processEvents()
+
+    # each client has its own window list once prewarmed
+    while len([key for key in list(helper.resolver_cache) if key[0] == 'pid-windows']) < len(jacknames):
+        time.sleep(0.001)
+
+if __name__ == '__main__':
+    client_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    app = QCoreApplication(sys.argv)
+    installWindowTools(installRayControl())
+
+    daemon = FakeRayDaemon(client_count).start()
+    os.environ["FAKE_RAY_DAEMON_PORTS"] = str(daemon.port)
+
+    helper = GroupPropertiesHelper(Debug=False)
+    jacknames = ["fake-%i" % i for i in range(client_count)]
+
+    start = time.perf_counter()
+    waitPrewarm(app, helper, jacknames)
+    print("%-30s %9.1f ms for %i clients" % ("prewarm in the pool", (time.perf_counter() - start) * 1000, client_count))
+
+    print("%-30s %9.1f ms per menu" % ("cached", openMenus(helper, jacknames)))
+
+    helper.resolver_cache.clear()
+    print("%-30s %9.1f ms per menu" % ("uncached", openMenus(helper, jacknames)))
+
+    helper.stop()
+    helper.thread.join()
+    daemon.stop()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# RaySession benchmark: refreshing client properties over OSC and ray_control
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import stat
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fake_ray_daemon import FakeRayDaemon
+from properties_helper import GroupPropertiesHelper
+
+# ------------------------------------------------------------------------------------------------------------
+# ray_control on PATH is the fake one, answering for the fake daemons of this process
+
+def installRayControl():
+    bin_dir = tempfile.mkdtemp(prefix="fake_ray_control_")
+    script = os.path.join(bin_dir, "ray_control")
+
+    with open(script, "w") as file:
+        file.write("#!/bin/sh\nexec \"%s\" \"%s\" \"$@\"\n" % (sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_ray_daemon.py")))
+
+    os.chmod(script, os.stat(script).st_mode | stat.S_IXUSR)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+    return bin_dir
+
+def refresh(helper, daemon):
+    # forget the session, so all clients are read again
+    helper.session_path_by_port = {}
+    daemon.messages = 0
+
+    start = time.perf_counter()
+    helper.read_sessions()
+    msecs = (time.perf_counter() - start) * 1000
+
+    return msecs, len(helper.jackclients), daemon.messages
+
+def run(title, helper, daemon):
+    msecs, jackclients, messages = refresh(helper, daemon)
+    print("%-30s %9.1f ms, %i jack clients, %i daemon messages" % (title, msecs, jackclients, messages))
+
+if __name__ == '__main__':
+    installRayControl()
+
+    for client_count in [int(arg) for arg in sys.argv[1:]] or (5, 20, 80):
+        daemon = FakeRayDaemon(client_count).start()
+        os.environ["FAKE_RAY_DAEMON_PORTS"] = str(daemon.port)
+
+        # refreshes are run here, not from the helper thread
+        helper = GroupPropertiesHelper(Debug=False)
+        helper.stop()
+        helper.thread.join()
+
+        print("%i clients" % client_count)
+        run("  osc", helper, daemon)
+        helper.use_osc = False
+        run("  ray_control", helper, daemon)
+
+        helper.closeOscClient(str(daemon.port))
+        daemon.stop()
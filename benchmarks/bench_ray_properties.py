@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# RaySession benchmark: reading ray client properties from the GUI thread
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_ray_menu import installWindowTools
+from bench_ray_osc import installRayControl
+from fake_ray_daemon import FakeRayDaemon
+from properties_helper import GroupPropertiesHelper
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Every other client registers its jack name with the pid pattern, like clients started with their pid in it
+def makeDaemon(client_count):
+    daemon = FakeRayDaemon(client_count)
+    for i, client in enumerate(daemon.clients.values()):
+        if i % 2:
+            client['custom_data']['jacknames'] = "fake_%i_xxx-PID-xxx" % i
+    return daemon.start()
+
+def lookupNames(client_count):
+    names = []
+    for i in range(client_count):
+        names.append("fake_%i_%i" % (i, 20000 + i) if i % 2 else "fake-%i" % i)
+        names.append("fake-%i-midi" % i)
+        names.append("system-%i" % i)
+    return names
+
+def run(title, helper, names, rounds):
+    start = time.perf_counter()
+    found = 0
+    for i in range(rounds):
+        for name in names:
+            if helper.getProperty(name, 'windowtitle') is not None:
+                found += 1
+    usecs = (time.perf_counter() - start) * 1000000 / (rounds * len(names))
+    print("%-30s %9.2f us per lookup, %i found" % (title, usecs, found // rounds))
+
+if __name__ == '__main__':
+    installWindowTools(installRayControl(), 0)
+
+    for client_count in [int(arg) for arg in sys.argv[1:]] or (20, 200):
+        daemon = makeDaemon(client_count)
+        os.environ["FAKE_RAY_DAEMON_PORTS"] = str(daemon.port)
+
+        helper = GroupPropertiesHelper(Debug=False)
+        # no menu prewarming running along
+        helper.stop()
+        helper.thread.join()
+        helper.resolver.shutdown(wait=True)
+
+        print("%i clients" % client_count)
+        run("  getProperty", helper, lookupNames(client_count), 200)
+
+        daemon.stop()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: indexed group/port/connection registry
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+def lookups(graph):
+    for group_id, port_id, port_name, port_mode, port_type in graph.ports:
+        patchcanvas.CanvasGetFullPortName(port_id)
+        patchcanvas.CanvasGetPortConnectionList(port_id)
+
+def renames(graph):
+    for group_id, port_id, port_name, port_mode, port_type in graph.ports[::10]:
+        patchcanvas.renamePort(port_id, port_name + "_renamed")
+
+def splitJoins(graph):
+    for group_id, group_name, split, icon in graph.groups[1::10]:
+        patchcanvas.splitGroup(group_id)
+        patchcanvas.joinGroup(group_id)
+
+    QApplication.processEvents()
+
+def disconnects(graph):
+    for connection_id, port_out_id, port_in_id in graph.connections:
+        patchcanvas.disconnectPorts(connection_id)
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    conn_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    app, view, scene = initCanvas()
+    graph = makeGraph(port_count, conn_count)
+
+    print("%i groups, %i ports, %i connections" % (len(graph.groups), len(graph.ports), len(graph.connections)))
+
+    timeit("populate", populate, graph)
+    timeit("name/connection lookups (all ports)", lookups, graph)
+    timeit("rename (every 10th port)", renames, graph)
+    timeit("split + join (every 10th group)", splitJoins, graph)
+    timeit("disconnect all", disconnects, graph)
+    timeit("clear", patchcanvas.clear)
+    update_requests, update_count = patchcanvas.getUpdateCounters()
+    print("%-40s %9i / %i" % ("scene updates (performed / requested)", update_count, update_requests))
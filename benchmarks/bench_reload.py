@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: clear + reload of the whole graph
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+import tempfile
+
+from canvas_bench import *
+
+if True:
+    from PyQt5.QtCore import QSettings
+
+# Removes everything item by item, as clear() used to do
+def clearOneByOne():
+    for connection_id in list(patchcanvas.canvas.connections):
+        patchcanvas.disconnectPorts(connection_id)
+
+    for port_id in list(patchcanvas.canvas.ports):
+        patchcanvas.removePort(port_id)
+
+    for group_id in list(patchcanvas.canvas.groups):
+        patchcanvas.removeGroup(group_id)
+
+    patchcanvas.clear()
+
+def reload(graph):
+    patchcanvas.init("CanvasBench", patchcanvas.canvas.scene, canvasCallback)
+    populate(graph, True)
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    conn_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    # Keep group positions away from the user settings
+    settingsDir = tempfile.TemporaryDirectory()
+    QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope, settingsDir.name)
+
+    app, view, scene = initCanvas(patchcanvas.EYECANDY_NONE, True)
+    graph = makeGraph(port_count, conn_count)
+
+    print("%i groups, %i ports, %i connections" % (len(graph.groups), len(graph.ports), len(graph.connections)))
+
+    timeit("populate (batch)", populate, graph, True)
+    timeit("clear, item by item", clearOneByOne)
+    timeit("reload", reload, graph)
+    timeit("clear", patchcanvas.clear)
+    timeit("reload", reload, graph)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: frame time at several zoom levels
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+ZOOM_LEVELS = (1.0, 0.6, 0.4, 0.25, 0.2)
+
+def spreadBoxes(graph, columns=16):
+    for i, group in enumerate(graph.groups):
+        x = (i % columns) * 300
+        y = (i // columns) * 400
+        patchcanvas.setGroupPosFull(group[0], x, y, x, y + 200)
+
+    QApplication.processEvents()
+
+def frameTime(view, frames):
+    start = time.perf_counter()
+
+    for i in range(frames):
+        view.viewport().repaint()
+
+    return (time.perf_counter() - start) * 1000 / frames
+
+def setLevelOfDetail(enabled):
+    patchcanvas.options.lod_text   = patchcanvas.LOD_TEXT_MIN if enabled else 0.0
+    patchcanvas.options.lod_simple = patchcanvas.LOD_SIMPLE_MIN if enabled else 0.0
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    app, view, scene = initCanvas()
+    view.resize(1280, 800)
+    view.show()
+
+    graph = makeGraph(port_count, port_count*2)
+    populate(graph, True)
+    spreadBoxes(graph)
+
+    # Let the scene build its item index first
+    QApplication.processEvents()
+
+    center = scene.itemsBoundingRect().center()
+
+    print("%i ports, %i connections, ms per frame" % (port_count, len(graph.connections)))
+    print("%-10s %12s %12s" % ("zoom", "full detail", "lod"))
+
+    for zoom in ZOOM_LEVELS:
+        view.resetTransform()
+        view.scale(zoom, zoom)
+        view.centerOn(center)
+        QApplication.processEvents()
+
+        setLevelOfDetail(False)
+        full = frameTime(view, frames)
+
+        setLevelOfDetail(True)
+        lod = frameTime(view, frames)
+
+        print("%-10.2f %12.1f %12.1f" % (zoom, full, lod))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: scrolling a large graph, with and without item caching
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+from canvas_bench import *
+
+# ------------------------------------------------------------------------------------------------------------
+# Count box and port paints
+
+gPaintCount = 0
+
+def countPaints(paint):
+    def wrapper(self, painter, option, widget):
+        global gPaintCount
+        gPaintCount += 1
+        return paint(self, painter, option, widget)
+    return wrapper
+
+patchcanvas.CanvasBox.paint  = countPaints(patchcanvas.CanvasBox.paint)
+patchcanvas.CanvasPort.paint = countPaints(patchcanvas.CanvasPort.paint)
+
+# ------------------------------------------------------------------------------------------------------------
+
+def spreadBoxes(graph, columns=16):
+    for i, group in enumerate(graph.groups):
+        x = (i % columns) * 300
+        y = (i // columns) * 400
+        patchcanvas.setGroupPosFull(group[0], x, y, x, y + 200)
+
+    QApplication.processEvents()
+
+def scrollFrames(view, frames):
+    scrollbar = view.horizontalScrollBar()
+    step = max(1, (scrollbar.maximum() - scrollbar.minimum()) // frames)
+
+    scrollbar.setValue(scrollbar.minimum())
+    QApplication.processEvents()
+
+    for i in range(frames):
+        scrollbar.setValue(scrollbar.minimum() + i * step)
+        view.viewport().repaint()
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    connection_count = int(sys.argv[3]) if len(sys.argv) > 3 else port_count*2
+
+    graph = makeGraph(port_count, connection_count)
+
+    for use_item_cache in (False, True):
+        if use_item_cache:
+            patchcanvas.clear()
+
+        app, view, scene = initCanvas(use_item_cache=use_item_cache)
+        view.resize(1280, 800)
+        view.show()
+
+        populate(graph, True)
+        spreadBoxes(graph)
+
+        # Let the scene build its item index first
+        QApplication.processEvents()
+
+        print("item cache %s, %i ports, %i connections" % ("on" if use_item_cache else "off", port_count, connection_count))
+
+        for title in ("  scroll, first pass", "  scroll, second pass"):
+            gPaintCount = 0
+            timeit("%s (%i frames)" % (title, frames), scrollFrames, view, frames)
+            print("%-40s %9i" % ("    box and port paints", gPaintCount))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas benchmark: virtual boxes, only materialized near the visible area
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+
+from canvas_bench import *
+
+import resource
+import subprocess
+
+def spreadBoxes(graph, columns=16):
+    for i, group in enumerate(graph.groups):
+        x = (i % columns) * 300
+        y = (i // columns) * 400
+        patchcanvas.setGroupPosFull(group[0], x, y, x, y + 200)
+
+    QApplication.processEvents()
+
+def scrollFrames(view, frames):
+    scrollbar = view.verticalScrollBar()
+    step = max(1, (scrollbar.maximum() - scrollbar.minimum()) // frames)
+
+    scrollbar.setValue(scrollbar.minimum())
+    QApplication.processEvents()
+
+    for i in range(frames):
+        scrollbar.setValue(scrollbar.minimum() + i * step)
+        QApplication.processEvents()
+        view.viewport().repaint()
+
+def countItems():
+    ports = sum(1 for port in patchcanvas.canvas.ports.values() if port.widget is not None)
+    lines = sum(1 for connection in patchcanvas.canvas.connections.values() if connection.widget is not None)
+    return ports, lines
+
+# Each mode runs in its own process, so peak memory is not shared
+def runMode(virtualize_groups, port_count, frames):
+    graph = makeGraph(port_count, port_count*2)
+
+    app, view, scene = initCanvas(virtualize_groups=virtualize_groups)
+    view.resize(1280, 800)
+    view.show()
+
+    print("virtualize %s, %i ports, %i connections" % ("on" if virtualize_groups else "off", port_count, len(graph.connections)))
+
+    timeit("  populate", populate, graph, True)
+    timeit("  spread boxes", spreadBoxes, graph)
+
+    ports, lines = countItems()
+    print("%-40s %9i" % ("  scene items", len(scene.items())))
+    print("%-40s %9i" % ("  port items", ports))
+    print("%-40s %9i" % ("  line items", lines))
+
+    timeit("  scroll (%i frames)" % frames, scrollFrames, view, frames)
+
+    print("%-40s %9.1f MiB" % ("  peak memory", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+if __name__ == '__main__':
+    port_count = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    if len(sys.argv) > 3:
+        runMode(bool(int(sys.argv[3])), port_count, frames)
+    else:
+        for virtualize_groups in (0, 1):
+            subprocess.call([sys.executable, __file__, str(port_count), str(frames), str(virtualize_groups)])
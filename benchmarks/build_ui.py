@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Builds the generated Qt modules for the benchmarks, like 'make' does
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources")
+
+gBuildDir = None
+
+# ------------------------------------------------------------------------------------------------------------
+# Modules not built yet go to a temporary directory, added to the import path
+
+def buildModule(name, tool, source):
+    global gBuildDir
+
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        pass
+
+    if gBuildDir is None:
+        gBuildDir = tempfile.mkdtemp(prefix="bench_build_")
+        sys.path.insert(0, gBuildDir)
+
+    subprocess.check_call([tool, source, "-o", os.path.join(gBuildDir, name + ".py")])
+    importlib.invalidate_caches()
+    return importlib.import_module(name)
+
+def loadResources():
+    return buildModule("resources_rc", os.environ.get("PYRCC", "pyrcc5"), os.path.join(RESOURCES_DIR, "resources.qrc"))
+
+# ui_<name>.py from resources/ui/<name>.ui, with the resources it uses
+def loadUi(name):
+    loadResources()
+    return buildModule("ui_" + name, os.environ.get("PYUIC", "pyuic5"), os.path.join(RESOURCES_DIR, "ui", name + ".ui"))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Common code for the PatchCanvas benchmarks
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.svg=false")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+if True:
+    from PyQt5.QtWidgets import QApplication, QGraphicsView
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom Stuff)
+
+import patchcanvas
+
+from build_ui import loadResources
+
+# ------------------------------------------------------------------------------------------------------------
+# Synthetic graphs
+
+class graph_t(object):
+    __slots__ = [
+        'groups',      # (group_id, group_name, split, icon)
+        'ports',       # (group_id, port_id, port_name, port_mode, port_type)
+        'connections'  # (connection_id, port_out_id, port_in_id)
+    ]
+
+def makeGraph(port_count, connection_count, ports_per_group=16, seed=0):
+    rand = random.Random(seed)
+
+    graph = graph_t()
+    graph.groups = []
+    graph.ports  = []
+    graph.connections = []
+
+    outs = []
+    ins  = []
+
+    for port_id in range(1, port_count+1):
+        group_id = (port_id - 1) // ports_per_group + 1
+
+        if (port_id - 1) % ports_per_group == 0:
+            hardware = bool(group_id == 1)
+            graph.groups.append((group_id, "client_%i" % group_id,
+                                 patchcanvas.SPLIT_YES if hardware else patchcanvas.SPLIT_UNDEF,
+                                 patchcanvas.ICON_HARDWARE if hardware else patchcanvas.ICON_APPLICATION))
+
+        if port_id % 2:
+            port_mode = patchcanvas.PORT_MODE_OUTPUT
+            outs.append((group_id, port_id))
+        else:
+            port_mode = patchcanvas.PORT_MODE_INPUT
+            ins.append((group_id, port_id))
+
+        port_type = patchcanvas.PORT_TYPE_MIDI_JACK if port_id % 8 == 0 else patchcanvas.PORT_TYPE_AUDIO_JACK
+        graph.ports.append((group_id, port_id, "port_%i" % port_id, port_mode, port_type))
+
+    used = set()
+    while len(graph.connections) < connection_count and len(used) < len(outs) * len(ins):
+        group_out_id, port_out_id = rand.choice(outs)
+        group_in_id,  port_in_id  = rand.choice(ins)
+
+        if group_out_id == group_in_id or (port_out_id, port_in_id) in used:
+            continue
+
+        used.add((port_out_id, port_in_id))
+        graph.connections.append((len(graph.connections)+1, port_out_id, port_in_id))
+
+    return graph
+
+# ------------------------------------------------------------------------------------------------------------
+# Canvas set-up
+
+def canvasCallback(action, value1, value2, value_str):
+    pass
+
+def initCanvas(eyecandy=patchcanvas.EYECANDY_NONE, handle_group_pos=False, use_item_cache=False, virtualize_groups=False, bundle_connections=False):
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    view  = QGraphicsView()
+    scene = patchcanvas.PatchScene(None, view)
+    view.setScene(scene)
+
+    pOptions = patchcanvas.options_t()
+    pOptions.theme_name       = patchcanvas.getDefaultThemeName()
+    pOptions.auto_hide_groups = False
+    pOptions.use_bezier_lines = True
+    pOptions.antialiasing     = patchcanvas.ANTIALIASING_SMALL
+    pOptions.eyecandy         = eyecandy
+    pOptions.use_item_cache   = use_item_cache
+    pOptions.virtualize_groups = virtualize_groups
+    pOptions.bundle_connections = bundle_connections
+
+    pFeatures = patchcanvas.features_t()
+    pFeatures.group_info   = False
+    pFeatures.group_rename = False
+    pFeatures.group_go_to_app = False
+    pFeatures.port_info    = False
+    pFeatures.port_rename  = False
+    pFeatures.handle_group_pos = handle_group_pos
+
+    patchcanvas.setOptions(pOptions)
+    patchcanvas.setFeatures(pFeatures)
+    patchcanvas.init("CanvasBench", scene, canvasCallback)
+
+    return app, view, scene
+
+def addGraph(graph):
+    for group in graph.groups:
+        patchcanvas.addGroup(*group)
+
+    for port in graph.ports:
+        patchcanvas.addPort(*port)
+
+    for connection in graph.connections:
+        patchcanvas.connectPorts(*connection)
+
+def populate(graph, batch=False):
+    if batch:
+        with patchcanvas.batch():
+            addGraph(graph)
+    else:
+        addGraph(graph)
+
+    # Let deferred work run, so it gets accounted for
+    QApplication.processEvents()
+
+# ------------------------------------------------------------------------------------------------------------
+# Timing
+
+def timeit(title, func, *args):
+    start = time.perf_counter()
+    ret = func(*args)
+    print("%-40s %9.1f ms" % (title, (time.perf_counter() - start) * 1000))
+    return ret
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# RaySession test helper: a fake ray-daemon answering over OSC
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import socket
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from properties_helper import RayOscClient, osc_decode, osc_encode
+
+# ------------------------------------------------------------------------------------------------------------
+# Fake daemon, serving one session of synthetic clients
+
+# client ids sent per /reply of list_clients
+LIST_CHUNK = 20
+
+class FakeRayDaemon(object):
+    def __init__(self, client_count, session_path="/tmp/fake_ray_session"):
+        self.session_path = session_path
+        self.clients = {}
+        self.monitors = []
+        self.messages = 0
+
+        for i in range(client_count):
+            self.clients["client_%i" % i] = self.makeClient(i)
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def makeClient(self, i):
+        return {
+            'pid': 10000 + i,
+            'custom_data': {
+                'jacknames': "fake-%i;fake-%i-midi" % (i, i),
+                'layer': str(i % 4),
+                'with_gui': "1",
+                'windowtitle': "Fake client %i" % i,
+                'guitoload': "fake-gui-%i" % i,
+                'clienttype': "ray_hack" if i % 2 else "nsm",
+            }
+        }
+
+    # Adds or removes a client from another thread, telling the monitors like ray-daemon does
+    def addClient(self, i):
+        client_id = "client_%i" % i
+        self.clients[client_id] = self.makeClient(i)
+        self.notify('/ray/monitor/client_event', client_id, "started")
+        return client_id
+
+    def removeClient(self, client_id):
+        del self.clients[client_id]
+        self.notify('/ray/monitor/client_event', client_id, "removed")
+
+    def notify(self, path, *args):
+        for address in self.monitors:
+            self.sock.sendto(osc_encode(path, *args), address)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.sock.close()
+
+    def run(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(65536)
+            except OSError:
+                break
+
+            self.messages += 1
+            path, args = osc_decode(data)
+            try:
+                for reply in self.handle(path, args, address):
+                    self.sock.sendto(osc_encode(*reply), address)
+            except OSError:
+                break
+
+    def handle(self, path, args, address):
+        if path == '/ray/server/monitor_announce':
+            self.monitors.append(address)
+            return [('/reply', path, "announced")]
+
+        if path == '/ray/server/monitor_quit':
+            if address in self.monitors:
+                self.monitors.remove(address)
+            return [('/reply', path, "monitor exit")]
+
+        if path == '/ray/server/get_session_path':
+            return [('/reply', path, self.session_path)]
+
+        if path == '/ray/session/list_clients':
+            client_ids = list(self.clients)
+            replies = [('/reply', path) + tuple(client_ids[i:i+LIST_CHUNK]) for i in range(0, len(client_ids), LIST_CHUNK)]
+            return replies + [('/reply', path)]
+
+        if path in ('/ray/client/get_custom_data', '/ray/client/get_pid') and args:
+            client = self.clients.get(args[0])
+            if client is None:
+                return [('/error', path, -1, "no client with id %s" % args[0])]
+            if path == '/ray/client/get_pid':
+                return [('/reply', path, str(client['pid']))]
+            if len(args) > 1 and args[1] in client['custom_data']:
+                return [('/reply', path, client['custom_data'][args[1]])]
+            return [('/error', path, -1, "no custom data")]
+
+        return [('/error', path, -1, "unknown message")]
+
+# ------------------------------------------------------------------------------------------------------------
+# ray_control subset, talking to fake daemons over OSC
+# Daemon ports are read from FAKE_RAY_DAEMON_PORTS, as a space separated list
+
+def rayControl(argv):
+    if argv[:1] == ['list_daemons']:
+        print("\n".join(os.environ.get("FAKE_RAY_DAEMON_PORTS", "").split()))
+        return 0
+
+    if len(argv) < 3 or argv[0] != '--port':
+        return 1
+
+    client = RayOscClient(argv[1])
+    command = argv[2:]
+
+    if command == ['get_session_path']:
+        query = ('/ray/server/get_session_path',)
+    elif command == ['list_clients']:
+        query = ('/ray/session/list_clients',)
+    elif len(command) == 4 and command[0] == 'client' and command[2] == 'get_custom_data':
+        query = ('/ray/client/get_custom_data', command[1], command[3])
+    elif len(command) == 3 and command[0] == 'client' and command[2] == 'get_pid':
+        query = ('/ray/client/get_pid', command[1])
+    else:
+        return 1
+
+    # like ray_control, give up quietly when the daemon is gone
+    try:
+        result = client.query([query])[0]
+    except socket.timeout:
+        result = None
+    finally:
+        client.close()
+
+    if result is None:
+        return 1
+
+    print("\n".join(str(value) for value in result))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(rayControl(sys.argv[1:]))
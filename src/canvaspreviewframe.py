@@ -19,14 +19,16 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
+from math import ceil
+
 if True:
-    from PyQt5.QtCore import pyqtSignal, Qt, QRectF, QTimer
-    from PyQt5.QtGui import QBrush, QColor, QCursor, QPainter, QPen
-    from PyQt5.QtWidgets import QFrame
+    from PyQt5.QtCore import pyqtSignal, Qt, QPointF, QRectF, QTimer
+    from PyQt5.QtGui import QBrush, QColor, QCursor, QPainter, QPen, QPixmap
+    from PyQt5.QtWidgets import QFrame, QGraphicsItem, QMenu
 else:
-    from PyQt4.QtCore import pyqtSignal, Qt, QRectF, QTimer
-    from PyQt4.QtGui import QBrush, QColor, QCursor, QPainter, QPen
-    from PyQt4.QtGui import QFrame
+    from PyQt4.QtCore import pyqtSignal, Qt, QPointF, QRectF, QTimer
+    from PyQt4.QtGui import QBrush, QColor, QCursor, QPainter, QPen, QPixmap
+    from PyQt4.QtGui import QFrame, QGraphicsItem, QMenu
 
 # ------------------------------------------------------------------------------------------------------------
 # Static Variables
@@ -36,6 +38,12 @@ iY = 1
 iWidth  = 2
 iHeight = 3
 
+# minimum time between re-renders of the cached preview, in ms
+RENDER_INTERVAL = 250
+
+# above this many changed regions the whole preview is re-rendered
+RENDER_DIRTY_MAX = 16
+
 # ------------------------------------------------------------------------------------------------------------
 # Widget Class
 
@@ -52,6 +60,8 @@ class CanvasPreviewFrame(QFrame):
         self.fViewBg    = QColor(0, 0, 0)
         self.fViewBrush = QBrush(QColor(75, 75, 255, 30))
         self.fViewPen   = QPen(Qt.blue, 1)
+        self.fBoxBrush  = QBrush(QColor(75, 75, 255, 160))
+        self.fBoxPen    = QPen(Qt.blue, 0)
 
         self.fScale = 1.0
         self.fScene = None
@@ -66,18 +76,35 @@ class CanvasPreviewFrame(QFrame):
         self.fViewPadY = 0.0
         self.fViewRect = [0.0, 0.0, 10.0, 10.0]
 
+        # The scene is rendered into a pixmap, refreshed at most once per RENDER_INTERVAL
+        self.fBoxesOnly  = False
+        self.fPixmap     = None
+        self.fDirtyAll   = True
+        self.fDirtyRects = []
+
+        self.fRenderTimer = QTimer(self)
+        self.fRenderTimer.setSingleShot(True)
+        self.fRenderTimer.setInterval(RENDER_INTERVAL)
+        self.fRenderTimer.timeout.connect(self.updatePixmap)
+
     def init(self, scene, realWidth, realHeight, useCustomPaint = False):
         padding = 6
 
+        if self.fScene is not scene:
+            if self.fScene is not None:
+                self.fScene.changed.disconnect(self.sceneChanged)
+            scene.changed.connect(self.sceneChanged)
+
         self.fScene = scene
         self.fFakeWidth  = float(realWidth) / 15
         self.fFakeHeight = float(realHeight) / 15
 
-        self.setMinimumSize(self.fFakeWidth+padding,   self.fFakeHeight+padding)
-        self.setMaximumSize(self.fFakeWidth*4+padding, self.fFakeHeight+padding)
+        self.setMinimumSize(int(self.fFakeWidth+padding),   int(self.fFakeHeight+padding))
+        self.setMaximumSize(int(self.fFakeWidth*4+padding), int(self.fFakeHeight+padding))
 
         self.fRenderTarget.setWidth(realWidth)
         self.fRenderTarget.setHeight(realHeight)
+        self.invalidate()
 
         if self.fUseCustomPaint != useCustomPaint:
             self.fUseCustomPaint = useCustomPaint
@@ -86,6 +113,115 @@ class CanvasPreviewFrame(QFrame):
     def setRealParent(self, parent):
         self.fRealParent = parent
 
+    def isBoxesOnly(self):
+        return self.fBoxesOnly
+
+    # Only draw the outline of boxes, no ports or connections
+    def setBoxesOnly(self, yesno):
+        if self.fBoxesOnly == yesno:
+            return
+        self.fBoxesOnly = yesno
+        self.invalidate()
+
+    def invalidate(self):
+        self.fDirtyAll   = True
+        self.fDirtyRects = []
+        self.scheduleRender()
+
+    def scheduleRender(self):
+        # Hidden previews catch up once shown again
+        if self.isVisible() and not self.fRenderTimer.isActive():
+            self.fRenderTimer.start()
+
+    def sceneChanged(self, regions):
+        if not self.fDirtyAll:
+            self.fDirtyRects += regions
+
+            if len(self.fDirtyRects) > RENDER_DIRTY_MAX:
+                self.fDirtyAll   = True
+                self.fDirtyRects = []
+
+        self.scheduleRender()
+
+    def updatePixmap(self):
+        self.fRenderTimer.stop()
+
+        if self.fScene is None:
+            return
+
+        ratio  = self.devicePixelRatioF()
+        width  = int(ceil(self.fRenderSource.width() * ratio))
+        height = int(ceil(self.fRenderSource.height() * ratio))
+
+        if width <= 0 or height <= 0:
+            return
+
+        if self.fPixmap is None or self.fPixmap.width() != width or self.fPixmap.height() != height:
+            self.fPixmap = QPixmap(width, height)
+            self.fPixmap.setDevicePixelRatio(ratio)
+            self.fDirtyAll = True
+
+        if not (self.fDirtyAll or self.fDirtyRects):
+            return
+
+        # Same mapping as QGraphicsScene.render() with Qt.KeepAspectRatio
+        source = self.fRenderTarget
+        scale  = min(self.fRenderSource.width() / source.width(), self.fRenderSource.height() / source.height())
+        offset = QPointF((self.fRenderSource.width()  - source.width()  * scale) / 2,
+                         (self.fRenderSource.height() - source.height() * scale) / 2)
+
+        if self.fDirtyAll:
+            targets = [QRectF(0, 0, self.fRenderSource.width(), self.fRenderSource.height())]
+        else:
+            targets = []
+            for rect in self.fDirtyRects:
+                rect = rect.intersected(source)
+                if rect.isEmpty():
+                    continue
+                target = QRectF(offset.x() + (rect.x() - source.x()) * scale,
+                                offset.y() + (rect.y() - source.y()) * scale,
+                                rect.width() * scale, rect.height() * scale)
+                targets.append(QRectF(target.toAlignedRect()))
+
+        self.fDirtyAll   = False
+        self.fDirtyRects = []
+
+        painter = QPainter(self.fPixmap)
+
+        for target in targets:
+            rect = QRectF(source.x() + (target.x() - offset.x()) / scale,
+                          source.y() + (target.y() - offset.y()) / scale,
+                          target.width() / scale, target.height() / scale)
+
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.fillRect(target, Qt.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+            if self.fBoxesOnly:
+                self.renderBoxes(painter, target, rect, offset, scale)
+            else:
+                self.fScene.render(painter, target, rect, Qt.IgnoreAspectRatio)
+
+        painter.end()
+        self.update()
+
+    def renderBoxes(self, painter, target, rect, offset, scale):
+        painter.save()
+        painter.setClipRect(target)
+        painter.fillRect(target, self.fScene.backgroundBrush())
+
+        painter.translate(offset)
+        painter.scale(scale, scale)
+        painter.translate(-self.fRenderTarget.topLeft())
+        painter.setBrush(self.fBoxBrush)
+        painter.setPen(self.fBoxPen)
+
+        for item in self.fScene.items(rect, Qt.IntersectsItemBoundingRect, Qt.AscendingOrder):
+            if item.parentItem() is None and item.flags() & QGraphicsItem.ItemIsMovable and item.isVisible():
+                painter.drawRect(item.sceneBoundingRect())
+
+        painter.restore()
+
     def getRenderSource(self):
         xPadding = (float(self.width())  - self.fFakeWidth) / 2.0
         yPadding = (float(self.height()) - self.fFakeHeight) / 2.0
@@ -113,12 +249,18 @@ class CanvasPreviewFrame(QFrame):
         self.update()
 
     def setViewTheme(self, bgColor, brushColor, penColor):
+        self.fBoxBrush = QBrush(QColor(penColor.red(), penColor.green(), penColor.blue(), 160))
+        self.fBoxPen   = QPen(QColor(penColor.red(), penColor.green(), penColor.blue()), 0)
+
         brushColor.setAlpha(40)
         penColor.setAlpha(100)
         self.fViewBg    = bgColor
         self.fViewBrush = QBrush(brushColor)
         self.fViewPen   = QPen(penColor, 1)
 
+        if self.fBoxesOnly:
+            self.invalidate()
+
     def handleMouseEvent(self, eventX, eventY):
         x = float(eventX) - self.fRenderSource.x() - (self.fViewRect[iWidth]  / self.fScale / 2)
         y = float(eventY) - self.fRenderSource.y() - (self.fViewRect[iHeight] / self.fScale / 2)
@@ -165,6 +307,17 @@ class CanvasPreviewFrame(QFrame):
         self.fMouseDown = False
         QFrame.mouseReleaseEvent(self, event)
 
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        act_x_boxes_only = menu.addAction("Show boxes only")
+        act_x_boxes_only.setCheckable(True)
+        act_x_boxes_only.setChecked(self.fBoxesOnly)
+
+        if menu.exec_(event.globalPos()) == act_x_boxes_only:
+            self.setBoxesOnly(act_x_boxes_only.isChecked())
+
+        event.accept()
+
     def paintEvent(self, event):
         painter = QPainter(self)
 
@@ -186,7 +339,12 @@ class CanvasPreviewFrame(QFrame):
             painter.setPen(self.fViewBg)
             painter.drawRoundedRect(2, 2, self.width()-6, self.height()-6, 3, 3)
 
-        self.fScene.render(painter, self.fRenderSource, self.fRenderTarget, Qt.KeepAspectRatio)
+        # First paint, or the preview was hidden while the scene changed
+        if self.fPixmap is None or (self.fDirtyAll and not self.fRenderTimer.isActive()):
+            self.updatePixmap()
+
+        if self.fPixmap is not None:
+            painter.drawPixmap(self.fRenderSource.topLeft(), self.fPixmap)
 
         maxWidth  = self.fViewRect[iWidth]  / self.fScale
         maxHeight = self.fViewRect[iHeight] / self.fScale
@@ -198,16 +356,24 @@ class CanvasPreviewFrame(QFrame):
 
         painter.setBrush(self.fViewBrush)
         painter.setPen(self.fViewPen)
-        painter.drawRect(self.fViewRect[iX], self.fViewRect[iY], maxWidth, maxHeight)
+        painter.drawRect(QRectF(self.fViewRect[iX], self.fViewRect[iY], maxWidth, maxHeight))
 
         if self.fUseCustomPaint:
             event.accept()
         else:
             QFrame.paintEvent(self, event)
 
+    def showEvent(self, event):
+        self.scheduleRender()
+        QFrame.showEvent(self, event)
+
     def resizeEvent(self, event):
         self.fRenderSource = self.getRenderSource()
 
+        # Re-rendered on the next paint, at the new size
+        self.fPixmap = None
+        self.invalidate()
+
         if self.fRealParent is not None:
             QTimer.singleShot(0, self.fRealParent.slot_miniCanvasCheckAll)
 
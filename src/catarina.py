@@ -652,6 +652,9 @@ class CatarinaMainW(AbstractCanvasJackClass):
         p_options.use_bezier_lines = self.fSavedSettings["Canvas/UseBezierLines"]
         p_options.antialiasing     = self.fSavedSettings["Canvas/Antialiasing"]
         p_options.eyecandy         = self.fSavedSettings["Canvas/EyeCandy"]
+        p_options.use_item_cache   = self.fSavedSettings["Canvas/UseItemCache"]
+        p_options.virtualize_groups = self.fSavedSettings["Canvas/VirtualizeGroups"]
+        p_options.bundle_connections = self.fSavedSettings["Canvas/BundleConnections"]
 
         p_features = patchcanvas.features_t()
         p_features.group_info   = False
@@ -833,17 +836,18 @@ class CatarinaMainW(AbstractCanvasJackClass):
                     break
 
     def initPorts(self):
-        for group in self.m_group_list:
-            patchcanvas.addGroup(group[iGroupId], group[iGroupName], patchcanvas.SPLIT_YES if (group[iGroupSplit]) else patchcanvas.SPLIT_NO, group[iGroupIcon])
+        with patchcanvas.batch():
+            for group in self.m_group_list:
+                patchcanvas.addGroup(group[iGroupId], group[iGroupName], patchcanvas.SPLIT_YES if (group[iGroupSplit]) else patchcanvas.SPLIT_NO, group[iGroupIcon])
 
-        for group_pos in self.m_group_list_pos:
-            patchcanvas.setGroupPosFull(group_pos[iGroupPosId], group_pos[iGroupPosX_o], group_pos[iGroupPosY_o], group_pos[iGroupPosX_i], group_pos[iGroupPosY_i])
+            for group_pos in self.m_group_list_pos:
+                patchcanvas.setGroupPosFull(group_pos[iGroupPosId], group_pos[iGroupPosX_o], group_pos[iGroupPosY_o], group_pos[iGroupPosX_i], group_pos[iGroupPosY_i])
 
-        for port in self.m_port_list:
-            patchcanvas.addPort(port[iPortGroup], port[iPortId], port[iPortName], port[iPortMode], port[iPortType])
+            for port in self.m_port_list:
+                patchcanvas.addPort(port[iPortGroup], port[iPortId], port[iPortName], port[iPortMode], port[iPortType])
 
-        for connection in self.m_connection_list:
-            patchcanvas.connectPorts(connection[iConnId], connection[iConnOutput], connection[iConnInput])
+            for connection in self.m_connection_list:
+                patchcanvas.connectPorts(connection[iConnId], connection[iConnOutput], connection[iConnInput])
 
         self.m_group_list_pos = []
         patchcanvas.updateZValues()
@@ -1250,6 +1254,9 @@ class CatarinaMainW(AbstractCanvasJackClass):
             p_options.use_bezier_lines = self.fSavedSettings["Canvas/UseBezierLines"]
             p_options.antialiasing     = self.fSavedSettings["Canvas/Antialiasing"]
             p_options.eyecandy         = self.fSavedSettings["Canvas/EyeCandy"]
+            p_options.use_item_cache   = self.fSavedSettings["Canvas/UseItemCache"]
+            p_options.virtualize_groups = self.fSavedSettings["Canvas/VirtualizeGroups"]
+            p_options.bundle_connections = self.fSavedSettings["Canvas/BundleConnections"]
 
             patchcanvas.setOptions(p_options)
             patchcanvas.init("Catarina", self.scene, self.canvasCallback, DEBUG)
@@ -1284,6 +1291,9 @@ class CatarinaMainW(AbstractCanvasJackClass):
             "Canvas/AutoHideGroups": settings.value("Canvas/AutoHideGroups", False, type=bool),
             "Canvas/UseBezierLines": settings.value("Canvas/UseBezierLines", True, type=bool),
             "Canvas/EyeCandy": settings.value("Canvas/EyeCandy", patchcanvas.EYECANDY_SMALL, type=int),
+            "Canvas/UseItemCache": settings.value("Canvas/UseItemCache", False, type=bool),
+            "Canvas/VirtualizeGroups": settings.value("Canvas/VirtualizeGroups", False, type=bool),
+            "Canvas/BundleConnections": settings.value("Canvas/BundleConnections", False, type=bool),
             "Canvas/UseOpenGL": settings.value("Canvas/UseOpenGL", False, type=bool),
             "Canvas/Antialiasing": settings.value("Canvas/Antialiasing", patchcanvas.ANTIALIASING_SMALL, type=int),
             "Canvas/TextAntialiasing": settings.value("Canvas/TextAntialiasing", True, type=bool),
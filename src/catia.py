@@ -79,20 +79,156 @@ GROUP_TYPE_NULL = 0
 GROUP_TYPE_ALSA = 1
 GROUP_TYPE_JACK = 2
 
-iGroupId   = 0
-iGroupName = 1
-iGroupType = 2
+URI_CANVAS_ICON = "http://kxstudio.sf.net/ns/canvas/icon"
+
+# ------------------------------------------------------------------------------------------------------------
+# Port Model
+
+class group_t(object):
+    __slots__ = [
+        'group_id',
+        'group_name',
+        'group_type',
+        'port_count'
+    ]
+
+class port_t(object):
+    __slots__ = [
+        'port_id',
+        'port_name',
+        'port_name_r',
+        'group_name'
+    ]
+
+class connection_t(object):
+    __slots__ = [
+        'connection_id',
+        'port_out_id',
+        'port_in_id'
+    ]
+
+def alsaPortAddress(portNameR):
+    # "[ALSA-Output] 14:0 Midi Through Port-0" -> "[ALSA-Output] 14:0"
+    return " ".join(portNameR.split(" ", 2)[:2])
+
+class CatiaPortModel(object):
+    def __init__(self):
+        object.__init__(self)
+
+        self.clear()
+
+    def clear(self):
+        self.fGroups       = {} # group_id -> group_t
+        self.fGroupsByName = {} # group_name -> group_t
+        self.fPorts        = {} # port_id -> port_t
+        self.fPortsByNameR = {} # full JACK name or ALSA real name -> port_t
+        self.fPortsByAlsaAddr = {} # "[ALSA-Mode] client:port" -> port_t
+        self.fConnections  = {} # connection_id -> connection_t
+        self.fConnectionsByPorts = {} # (port_out_id, port_in_id) -> connection_t
+
+    # -----------------------------------------------------------------
+    # Groups
+
+    def addGroup(self, groupId, groupName, groupType):
+        group = group_t()
+        group.group_id   = groupId
+        group.group_name = groupName
+        group.group_type = groupType
+        group.port_count = 0
+
+        self.fGroups[groupId] = group
+        self.fGroupsByName[groupName] = group
+        return group
+
+    def removeGroup(self, groupName):
+        group = self.fGroupsByName.pop(groupName, None)
+        if group is not None:
+            del self.fGroups[group.group_id]
+        return group
+
+    def getGroupByName(self, groupName):
+        return self.fGroupsByName.get(groupName)
+
+    # -----------------------------------------------------------------
+    # Ports
+
+    def addPort(self, portId, portName, portNameR, groupName):
+        port = port_t()
+        port.port_id     = portId
+        port.port_name   = portName
+        port.port_name_r = portNameR
+        port.group_name  = groupName
+
+        self.fPorts[portId] = port
+        self.fPortsByNameR[portNameR] = port
+
+        if portNameR.startswith("[ALSA-"):
+            self.fPortsByAlsaAddr[alsaPortAddress(portNameR)] = port
+
+        group = self.fGroupsByName.get(groupName)
+        if group is not None:
+            group.port_count += 1
+
+        return port
+
+    def removePort(self, portId):
+        port = self.fPorts.pop(portId, None)
+        if port is None:
+            return None
+
+        if self.fPortsByNameR.get(port.port_name_r) is port:
+            del self.fPortsByNameR[port.port_name_r]
+
+        if port.port_name_r.startswith("[ALSA-"):
+            self.fPortsByAlsaAddr.pop(alsaPortAddress(port.port_name_r), None)
+
+        group = self.fGroupsByName.get(port.group_name)
+        if group is not None:
+            group.port_count -= 1
+
+        return port
+
+    def renamePort(self, port, newNameR):
+        if self.fPortsByNameR.get(port.port_name_r) is port:
+            del self.fPortsByNameR[port.port_name_r]
 
-iPortId    = 0
-iPortName  = 1
-iPortNameR = 2
-iPortGroupName = 3
+        port.port_name_r = newNameR
+        self.fPortsByNameR[newNameR] = port
+
+    def getPort(self, portId):
+        return self.fPorts.get(portId)
 
-iConnId     = 0
-iConnOutput = 1
-iConnInput  = 2
+    def getPortByNameR(self, portNameR):
+        return self.fPortsByNameR.get(portNameR)
 
-URI_CANVAS_ICON = "http://kxstudio.sf.net/ns/canvas/icon"
+    def getPortByAlsaAddr(self, alsaMode, alsaGroupId, alsaPortId):
+        return self.fPortsByAlsaAddr.get("[ALSA-%s] %i:%i" % (alsaMode, alsaGroupId, alsaPortId))
+
+    def getPortNameR(self, portId):
+        port = self.fPorts.get(portId)
+        return port.port_name_r if port is not None else ""
+
+    # -----------------------------------------------------------------
+    # Connections
+
+    def addConnection(self, connectionId, portOutId, portInId):
+        connection = connection_t()
+        connection.connection_id = connectionId
+        connection.port_out_id   = portOutId
+        connection.port_in_id    = portInId
+
+        self.fConnections[connectionId] = connection
+        self.fConnectionsByPorts[(portOutId, portInId)] = connection
+        return connection
+
+    def removeConnection(self, portOutId, portInId):
+        connection = self.fConnectionsByPorts.pop((portOutId, portInId), None)
+        if connection is not None:
+            del self.fConnections[connection.connection_id]
+        return connection
+
+    def getConnection(self, connectionId):
+        return self.fConnections.get(connectionId)
 
 # ------------------------------------------------------------------------------------------------------------
 # Catia Main Window
@@ -103,10 +239,8 @@ class CatiaMainW(AbstractCanvasJackClass):
         
         GroupPropertiesHelper.instance()
 
-        self.fGroupList      = []
-        self.fGroupSplitList = []
-        self.fPortList       = []
-        self.fConnectionList = []
+        self.fPortModel      = CatiaPortModel()
+        self.fGroupSplitList = set()
 
         self.fLastGroupId = 1
         self.fLastPortId  = 1
@@ -155,6 +289,9 @@ class CatiaMainW(AbstractCanvasJackClass):
         pOptions.use_bezier_lines = self.fSavedSettings["Canvas/UseBezierLines"]
         pOptions.antialiasing     = self.fSavedSettings["Canvas/Antialiasing"]
         pOptions.eyecandy         = self.fSavedSettings["Canvas/EyeCandy"]
+        pOptions.use_item_cache   = self.fSavedSettings["Canvas/UseItemCache"]
+        pOptions.virtualize_groups = self.fSavedSettings["Canvas/VirtualizeGroups"]
+        pOptions.bundle_connections = self.fSavedSettings["Canvas/BundleConnections"]
 
         pFeatures = patchcanvas.features_t()
         pFeatures.group_info   = False
@@ -268,14 +405,14 @@ class CatiaMainW(AbstractCanvasJackClass):
         elif action == patchcanvas.ACTION_PORT_INFO:
             portId = value1
 
-            for port in self.fPortList:
-                if port[iPortId] == portId:
-                    portNameR = port[iPortNameR]
-                    portNameG = port[iPortGroupName]
-                    break
-            else:
+            port = self.fPortModel.getPort(portId)
+
+            if port is None:
                 return
 
+            portNameR = port.port_name_r
+            portNameG = port.group_name
+
             if portNameR.startswith("[ALSA-"):
                 portId, portName = portNameR.split("] ", 1)[1].split(" ", 1)
 
@@ -365,24 +502,24 @@ class CatiaMainW(AbstractCanvasJackClass):
             portId = value1
             portShortName = asciiString(valueStr)
 
-            for port in self.fPortList:
-                if port[iPortId] == portId:
-                    portNameR = port[iPortNameR]
-
-                    if portNameR.startswith("[ALSA-"):
-                        QMessageBox.warning(self, self.tr("Cannot continue"), self.tr(""
-                            "Rename functions rely on JACK aliases and cannot be done in ALSA ports"))
-                        return
-
-                    if portNameR.split(":", 1)[0] == gA2JClientName:
-                        a2jSplit = portNameR.split(":", 3)
-                        portName = "%s:%s: %s" % (a2jSplit[0], a2jSplit[1], portShortName)
-                    else:
-                        portName = "%s:%s" % (port[iPortGroupName], portShortName)
-                    break
-            else:
+            port = self.fPortModel.getPort(portId)
+
+            if port is None:
                 return
 
+            portNameR = port.port_name_r
+
+            if portNameR.startswith("[ALSA-"):
+                QMessageBox.warning(self, self.tr("Cannot continue"), self.tr(""
+                    "Rename functions rely on JACK aliases and cannot be done in ALSA ports"))
+                return
+
+            if portNameR.split(":", 1)[0] == gA2JClientName:
+                a2jSplit = portNameR.split(":", 3)
+                portName = "%s:%s: %s" % (a2jSplit[0], a2jSplit[1], portShortName)
+            else:
+                portName = "%s:%s" % (port.group_name, portShortName)
+
             portPtr = jacklib.port_by_name(gJack.client, portNameR)
             aliases = jacklib.port_get_aliases(portPtr)
 
@@ -407,14 +544,8 @@ class CatiaMainW(AbstractCanvasJackClass):
         elif action == patchcanvas.ACTION_PORTS_CONNECT:
             portIdA = value1
             portIdB = value2
-            portRealNameA = ""
-            portRealNameB = ""
-
-            for port in self.fPortList:
-                if port[iPortId] == portIdA:
-                    portRealNameA = port[iPortNameR]
-                if port[iPortId] == portIdB:
-                    portRealNameB = port[iPortNameR]
+            portRealNameA = self.fPortModel.getPortNameR(portIdA)
+            portRealNameB = self.fPortModel.getPortNameR(portIdB)
 
             if portRealNameA.startswith("[ALSA-"):
                 portIdAlsaA = portRealNameA.split(" ", 2)[1]
@@ -429,22 +560,15 @@ class CatiaMainW(AbstractCanvasJackClass):
         elif action == patchcanvas.ACTION_PORTS_DISCONNECT:
             connectionId = value1
 
-            for connection in self.fConnectionList:
-                if connection[iConnId] == connectionId:
-                    portIdA = connection[iConnOutput]
-                    portIdB = connection[iConnInput]
-                    break
-            else:
-                return
+            connection = self.fPortModel.getConnection(connectionId)
 
-            portRealNameA = ""
-            portRealNameB = ""
+            if connection is None:
+                return
 
-            for port in self.fPortList:
-                if port[iPortId] == portIdA:
-                    portRealNameA = port[iPortNameR]
-                if port[iPortId] == portIdB:
-                    portRealNameB = port[iPortNameR]
+            portIdA = connection.port_out_id
+            portIdB = connection.port_in_id
+            portRealNameA = self.fPortModel.getPortNameR(portIdA)
+            portRealNameB = self.fPortModel.getPortNameR(portIdB)
 
             if portRealNameA.startswith("[ALSA-"):
                 portIdAlsaA = portRealNameA.split(" ", 2)[1]
@@ -457,17 +581,16 @@ class CatiaMainW(AbstractCanvasJackClass):
                 jacklib.disconnect(gJack.client, portRealNameA, portRealNameB)
 
     def initPorts(self):
-        self.fGroupList      = []
-        self.fGroupSplitList = []
-        self.fPortList       = []
-        self.fConnectionList = []
+        self.fPortModel.clear()
+        self.fGroupSplitList = set()
 
         self.fLastGroupId = 1
         self.fLastPortId  = 1
         self.fLastConnectionId = 1
 
-        self.initJackPorts()
-        self.initAlsaPorts()
+        with patchcanvas.batch():
+            self.initJackPorts()
+            self.initAlsaPorts()
 
     def initJack(self):
         self.fXruns = 0
@@ -514,39 +637,31 @@ class CatiaMainW(AbstractCanvasJackClass):
 
         global gA2JClientName
 
-        # Get all jack ports, put a2j ones to the bottom of the list
-        a2jNameList  = []
-        portNameList = c_char_p_p_to_list(jacklib.get_ports(gJack.client, "", "", 0))
+        # Read all jack ports and their metadata at once
+        portInfoList = get_ports_snapshot(gJack.client, self.fSavedSettings["Main/JackPortAlias"] in (1, 2))
 
-        h = 0
-        for i in range(len(portNameList)):
-            if portNameList[i - h].split(":")[0] == gA2JClientName:
-                portName = portNameList.pop(i - h)
-                a2jNameList.append(portName)
-                h += 1
+        # Put a2j ones to the bottom of the list
+        if gA2JClientName:
+            a2jPrefix = "%s:" % gA2JClientName
+            portInfoList = ([portInfo for portInfo in portInfoList if not portInfo.name.startswith(a2jPrefix)] +
+                            [portInfo for portInfo in portInfoList if portInfo.name.startswith(a2jPrefix)])
 
-        for a2jName in a2jNameList:
-            portNameList.append(a2jName)
+        portDataList = [self.canvas_getJackPortData(portInfo) for portInfo in portInfoList]
 
-        del a2jNameList
+        # Groups with physical ports get created split right away
+        physicalGroups = set()
+        for portInfo, portData in zip(portInfoList, portDataList):
+            if portInfo.flags & jacklib.JackPortIsPhysical:
+                physicalGroups.add(portData[0])
 
         # Add jack ports
-        for portName in portNameList:
-            portPtr = jacklib.port_by_name(gJack.client, portName)
-            self.canvas_addJackPort(portPtr, portName)
-
-        # Add jack connections
-        for portName in portNameList:
-            portPtr = jacklib.port_by_name(gJack.client, portName)
+        for portInfo, portData in zip(portInfoList, portDataList):
+            self.canvas_addJackPortData(portInfo, portData, bool(portData[0] in physicalGroups))
 
-            # Only make connections from an output port
-            if jacklib.port_flags(portPtr) & jacklib.JackPortIsInput:
-                continue
-
-            portConnectionNames = c_char_p_p_to_list(jacklib.port_get_all_connections(gJack.client, portPtr))
-
-            for portConName in portConnectionNames:
-                self.canvas_connectPortsByName(portName, portConName)
+        # Add jack connections, only outputs have them listed
+        for portInfo in portInfoList:
+            for portConName in portInfo.connections:
+                self.canvas_connectPortsByName(portInfo.name, portConName)
 
     def initAlsaPorts(self):
         if not (haveALSA and self.ui.act_settings_show_alsa.isChecked()):
@@ -647,12 +762,8 @@ class CatiaMainW(AbstractCanvasJackClass):
                 portId    = int(lineSplit[0].strip())
                 portName  = lineSplit[1].rsplit("'", 1)[0].strip()
 
-                for port in self.fPortList:
-                    if port[iPortNameR] == "[ALSA-Input] %i:%i %s" % (groupId, portId, portName):
-                        lastPortId = port[iPortId]
-                        break
-                else:
-                    lastPortId = -1
+                port = self.fPortModel.getPortByNameR("[ALSA-Input] %i:%i %s" % (groupId, portId, portName))
+                lastPortId = port.port_id if port is not None else -1
 
             elif line.startswith("\tConnect") and lastGroupId >= 0 and lastPortId >= 0:
                 if line.startswith("\tConnected From"):
@@ -664,22 +775,18 @@ class CatiaMainW(AbstractCanvasJackClass):
                         alsaGroupId   = int(lineConnSplit[0].split("[real:",1)[0])
                         alsaPortId    = int(lineConnSplit[1].split("[real:",1)[0])
 
-                        portNameRtest = "[ALSA-Output] %i:%i " % (alsaGroupId, alsaPortId)
+                        port = self.fPortModel.getPortByAlsaAddr("Output", alsaGroupId, alsaPortId)
 
-                        for port in self.fPortList:
-                            if port[iPortNameR].startswith(portNameRtest):
-                                self.canvas_connectPorts(port[iPortId], lastPortId)
-                                break
+                        if port is not None:
+                            self.canvas_connectPorts(port.port_id, lastPortId)
 
             else:
                 lastGroupId = -1
                 lastPortId  = -1
 
     def canvas_getGroupId(self, groupName):
-        for group in self.fGroupList:
-            if group[iGroupName] == groupName:
-                return group[iGroupId]
-        return -1
+        group = self.fPortModel.getGroupByName(groupName)
+        return group.group_id if group is not None else -1
 
     def canvas_addAlsaGroup(self, alsaGroupId, groupName, hwSplit):
         groupId = self.fLastGroupId
@@ -689,17 +796,12 @@ class CatiaMainW(AbstractCanvasJackClass):
         else:
             patchcanvas.addGroup(groupId, groupName)
 
-        groupObj = [None, None, None]
-        groupObj[iGroupId]   = groupId
-        groupObj[iGroupName] = groupName
-        groupObj[iGroupType] = GROUP_TYPE_ALSA
-
-        self.fGroupList.append(groupObj)
+        self.fPortModel.addGroup(groupId, groupName, GROUP_TYPE_ALSA)
         self.fLastGroupId += 1
 
         return groupId
 
-    def canvas_addJackGroup(self, groupName):
+    def canvas_addJackGroup(self, groupName, isPhysical=False):
         ret, data, dataSize = jacklib.custom_get_data(gJack.client, groupName, URI_CANVAS_ICON)
 
         groupId    = self.fLastGroupId
@@ -722,30 +824,26 @@ class CatiaMainW(AbstractCanvasJackClass):
             elif iconName =="plugin":
                 groupIcon = patchcanvas.ICON_PLUGIN
 
-        patchcanvas.addGroup(groupId, groupName, groupSplit, groupIcon)
+        if isPhysical:
+            groupSplit = patchcanvas.SPLIT_YES
+            groupIcon  = patchcanvas.ICON_HARDWARE
+            self.fGroupSplitList.add(groupId)
 
-        groupObj = [None, None, None]
-        groupObj[iGroupId]   = groupId
-        groupObj[iGroupName] = groupName
-        groupObj[iGroupType] = GROUP_TYPE_JACK
+        patchcanvas.addGroup(groupId, groupName, groupSplit, groupIcon)
 
-        self.fGroupList.append(groupObj)
+        self.fPortModel.addGroup(groupId, groupName, GROUP_TYPE_JACK)
         self.fLastGroupId += 1
 
         return groupId
 
     def canvas_removeGroup(self, groupName):
-        groupId = -1
-        for group in self.fGroupList:
-            if group[iGroupName] == groupName:
-                groupId = group[iGroupId]
-                self.fGroupList.remove(group)
-                break
-        else:
+        group = self.fPortModel.removeGroup(groupName)
+
+        if group is None:
             print("Catia - remove group failed")
             return
 
-        patchcanvas.removeGroup(groupId)
+        patchcanvas.removeGroup(group.group_id)
 
     def canvas_addAlsaPort(self, groupId, groupName, portName, portNameR, isPortInput):
         portId   = self.fLastPortId
@@ -754,39 +852,29 @@ class CatiaMainW(AbstractCanvasJackClass):
 
         patchcanvas.addPort(groupId, portId, portName, portMode, portType)
 
-        portObj = [None, None, None, None]
-        portObj[iPortId]    = portId
-        portObj[iPortName]  = portName
-        portObj[iPortNameR] = "[ALSA-%s] %s" % ("Input" if isPortInput else "Output", portNameR)
-        portObj[iPortGroupName] = groupName
-
-        self.fPortList.append(portObj)
+        self.fPortModel.addPort(portId, portName, "[ALSA-%s] %s" % ("Input" if isPortInput else "Output", portNameR), groupName)
         self.fLastPortId += 1
 
         return portId
 
-    def canvas_addJackPort(self, portPtr, portName):
+    def canvas_getJackPortData(self, portInfo):
         global gA2JClientName
 
-        portId  = self.fLastPortId
-        groupId = -1
-
-        portNameR = portName
+        portName = portInfo.name
+        aliases  = portInfo.aliases
 
         aliasN = self.fSavedSettings["Main/JackPortAlias"]
         if aliasN in (1, 2):
-            aliases = jacklib.port_get_aliases(portPtr)
             if aliases[0] == 2 and aliasN == 2:
                 portName = aliases[2]
             elif aliases[0] >= 1 and aliasN == 1:
                 portName = aliases[1]
 
-        portFlags = jacklib.port_flags(portPtr)
         groupName = portName.split(":", 1)[0]
 
-        if portFlags & jacklib.JackPortIsInput:
+        if portInfo.flags & jacklib.JackPortIsInput:
             portMode = patchcanvas.PORT_MODE_INPUT
-        elif portFlags & jacklib.JackPortIsOutput:
+        elif portInfo.flags & jacklib.JackPortIsOutput:
             portMode = patchcanvas.PORT_MODE_OUTPUT
         else:
             portMode = patchcanvas.PORT_MODE_NULL
@@ -799,57 +887,57 @@ class CatiaMainW(AbstractCanvasJackClass):
         else:
             portShortName = portName.replace("%s:" % groupName, "", 1)
 
-            portTypeStr = str(jacklib.port_type(portPtr), encoding="utf-8")
-            if portTypeStr == jacklib.JACK_DEFAULT_AUDIO_TYPE:
+            if portInfo.type_str == jacklib.JACK_DEFAULT_AUDIO_TYPE:
                 portType = patchcanvas.PORT_TYPE_AUDIO_JACK
-            elif portTypeStr == jacklib.JACK_DEFAULT_MIDI_TYPE:
+            elif portInfo.type_str == jacklib.JACK_DEFAULT_MIDI_TYPE:
                 portType = patchcanvas.PORT_TYPE_MIDI_JACK
             else:
                 portType = patchcanvas.PORT_TYPE_NULL
 
-        for group in self.fGroupList:
-            if group[iGroupName] == groupName:
-                groupId = group[iGroupId]
-                break
+        return (groupName, portName, portShortName, portMode, portType)
+
+    def canvas_addJackPort(self, portPtr, portName):
+        portInfo = get_port_info(gJack.client, portPtr, portName, self.fSavedSettings["Main/JackPortAlias"] in (1, 2))
+        portData = self.canvas_getJackPortData(portInfo)
+        return self.canvas_addJackPortData(portInfo, portData, bool(portInfo.flags & jacklib.JackPortIsPhysical))
+
+    def canvas_addJackPortData(self, portInfo, portData, groupIsPhysical):
+        groupName, portName, portShortName, portMode, portType = portData
+
+        portId = self.fLastPortId
+        group  = self.fPortModel.getGroupByName(groupName)
+
+        if group is not None:
+            groupId = group.group_id
         else:
             # For ports with no group
-            groupId = self.canvas_addJackGroup(groupName)
+            groupId = self.canvas_addJackGroup(groupName, groupIsPhysical)
 
         patchcanvas.addPort(groupId, portId, portShortName, portMode, portType)
 
-        portObj = [None, None, None, None]
-        portObj[iPortId]    = portId
-        portObj[iPortName]  = portName
-        portObj[iPortNameR] = portNameR
-        portObj[iPortGroupName] = groupName
-
-        self.fPortList.append(portObj)
+        self.fPortModel.addPort(portId, portName, portInfo.name, groupName)
         self.fLastPortId += 1
 
-        if groupId not in self.fGroupSplitList and (portFlags & jacklib.JackPortIsPhysical) > 0:
+        if groupId not in self.fGroupSplitList and (portInfo.flags & jacklib.JackPortIsPhysical) > 0:
             patchcanvas.splitGroup(groupId)
             patchcanvas.setGroupIcon(groupId, patchcanvas.ICON_HARDWARE)
-            self.fGroupSplitList.append(groupId)
+            self.fGroupSplitList.add(groupId)
 
         return portId
 
     def canvas_removeJackPort(self, portId):
         patchcanvas.removePort(portId)
 
-        for port in self.fPortList:
-            if port[iPortId] == portId:
-                groupName = port[iPortGroupName]
-                self.fPortList.remove(port)
-                break
-        else:
+        port = self.fPortModel.removePort(portId)
+
+        if port is None:
             return
 
         # Check if group has no more ports; if yes remove it
-        for port in self.fPortList:
-            if port[iPortGroupName] == groupName:
-                break
-        else:
-            self.canvas_removeGroup(groupName)
+        group = self.fPortModel.getGroupByName(port.group_name)
+
+        if group is not None and group.port_count <= 0:
+            self.canvas_removeGroup(port.group_name)
 
     def canvas_renamePort(self, portId, portShortName):
         patchcanvas.renamePort(portId, portShortName)
@@ -858,57 +946,36 @@ class CatiaMainW(AbstractCanvasJackClass):
         connectionId = self.fLastConnectionId
         patchcanvas.connectPorts(connectionId, portOutId, portInId)
 
-        connObj = [None, None, None]
-        connObj[iConnId]     = connectionId
-        connObj[iConnOutput] = portOutId
-        connObj[iConnInput]  = portInId
-
-        self.fConnectionList.append(connObj)
+        self.fPortModel.addConnection(connectionId, portOutId, portInId)
         self.fLastConnectionId += 1
 
         return connectionId
 
     def canvas_connectPortsByName(self, portOutName, portInName):
-        portOutId = -1
-        portInId  = -1
-
-        for port in self.fPortList:
-            if port[iPortNameR] == portOutName:
-                portOutId = port[iPortId]
-            elif port[iPortNameR] == portInName:
-                portInId = port[iPortId]
+        portOut = self.fPortModel.getPortByNameR(portOutName)
+        portIn  = self.fPortModel.getPortByNameR(portInName)
 
-            if portOutId >= 0 and portInId >= 0:
-                break
-
-        else:
+        if portOut is None or portIn is None or portOut is portIn:
             print("Catia - connect jack ports failed")
             return -1
 
-        return self.canvas_connectPorts(portOutId, portInId)
+        return self.canvas_connectPorts(portOut.port_id, portIn.port_id)
 
     def canvas_disconnectPorts(self, portOutId, portInId):
-        for connection in self.fConnectionList:
-            if connection[iConnOutput] == portOutId and connection[iConnInput] == portInId:
-                patchcanvas.disconnectPorts(connection[iConnId])
-                self.fConnectionList.remove(connection)
-                break
+        connection = self.fPortModel.removeConnection(portOutId, portInId)
 
-    def canvas_disconnectPortsByName(self, portOutName, portInName):
-        portOutId = -1
-        portInId  = -1
+        if connection is not None:
+            patchcanvas.disconnectPorts(connection.connection_id)
 
-        for port in self.fPortList:
-            if port[iPortNameR] == portOutName:
-                portOutId = port[iPortId]
-            elif port[iPortNameR] == portInName:
-                portInId = port[iPortId]
+    def canvas_disconnectPortsByName(self, portOutName, portInName):
+        portOut = self.fPortModel.getPortByNameR(portOutName)
+        portIn  = self.fPortModel.getPortByNameR(portInName)
 
-        if portOutId == -1 or portInId == -1:
+        if portOut is None or portIn is None:
             print("Catia - disconnect ports failed")
             return
 
-        self.canvas_disconnectPorts(portOutId, portInId)
+        self.canvas_disconnectPorts(portOut.port_id, portIn.port_id)
 
     def jackStarted(self):
         if not gJack.client:
@@ -1196,14 +1263,12 @@ class CatiaMainW(AbstractCanvasJackClass):
         if registerYesNo:
             self.canvas_addJackPort(portPtr, portNameR)
         else:
-            for port in self.fPortList:
-                if port[iPortNameR] == portNameR:
-                    portIdCanvas = port[iPortId]
-                    break
-            else:
+            port = self.fPortModel.getPortByNameR(portNameR)
+
+            if port is None:
                 return
 
-            self.canvas_removeJackPort(portIdCanvas)
+            self.canvas_removeJackPort(port.port_id)
 
     @pyqtSlot(int, int, bool)
     def slot_PortConnectCallback(self, portIdJackA, portIdJackB, connectYesNo):
@@ -1222,14 +1287,14 @@ class CatiaMainW(AbstractCanvasJackClass):
         portPtr = jacklib.port_by_id(gJack.client, portIdJack)
         portShortName = str(jacklib.port_short_name(portPtr), encoding="utf-8")
 
-        for port in self.fPortList:
-            if port[iPortNameR] == oldName:
-                portIdCanvas = port[iPortId]
-                port[iPortNameR] = newName
-                break
-        else:
+        port = self.fPortModel.getPortByNameR(oldName)
+
+        if port is None:
             return
 
+        portIdCanvas = port.port_id
+        self.fPortModel.renamePort(port, newName)
+
         # Only set new name in canvas if no alias is active for this port
         aliases = jacklib.port_get_aliases(portPtr)
         if aliases[0] == 1 and self.fSavedSettings["Main/JackPortAlias"] == 1:
@@ -1304,6 +1369,9 @@ class CatiaMainW(AbstractCanvasJackClass):
             pOptions.use_bezier_lines = self.fSavedSettings["Canvas/UseBezierLines"]
             pOptions.antialiasing     = self.fSavedSettings["Canvas/Antialiasing"]
             pOptions.eyecandy         = self.fSavedSettings["Canvas/EyeCandy"]
+            pOptions.use_item_cache   = self.fSavedSettings["Canvas/UseItemCache"]
+            pOptions.virtualize_groups = self.fSavedSettings["Canvas/VirtualizeGroups"]
+            pOptions.bundle_connections = self.fSavedSettings["Canvas/BundleConnections"]
 
             pFeatures = patchcanvas.features_t()
             pFeatures.group_info   = False
@@ -1362,6 +1430,9 @@ class CatiaMainW(AbstractCanvasJackClass):
             "Canvas/AutoHideGroups": settings.value("Canvas/AutoHideGroups", False, type=bool),
             "Canvas/UseBezierLines": settings.value("Canvas/UseBezierLines", True, type=bool),
             "Canvas/EyeCandy": settings.value("Canvas/EyeCandy", patchcanvas.EYECANDY_SMALL, type=int),
+            "Canvas/UseItemCache": settings.value("Canvas/UseItemCache", False, type=bool),
+            "Canvas/VirtualizeGroups": settings.value("Canvas/VirtualizeGroups", False, type=bool),
+            "Canvas/BundleConnections": settings.value("Canvas/BundleConnections", False, type=bool),
             "Canvas/UseOpenGL": settings.value("Canvas/UseOpenGL", False, type=bool),
             "Canvas/Antialiasing": settings.value("Canvas/Antialiasing", patchcanvas.ANTIALIASING_SMALL, type=int),
             "Canvas/HighQualityAntialiasing": settings.value("Canvas/HighQualityAntialiasing", False, type=bool)
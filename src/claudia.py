@@ -762,6 +762,9 @@ class ClaudiaMainW(AbstractCanvasJackClass):
         pOptions.use_bezier_lines = self.fSavedSettings["Canvas/UseBezierLines"]
         pOptions.antialiasing     = self.fSavedSettings["Canvas/Antialiasing"]
         pOptions.eyecandy         = self.fSavedSettings["Canvas/EyeCandy"]
+        pOptions.use_item_cache   = self.fSavedSettings["Canvas/UseItemCache"]
+        pOptions.virtualize_groups = self.fSavedSettings["Canvas/VirtualizeGroups"]
+        pOptions.bundle_connections = self.fSavedSettings["Canvas/BundleConnections"]
 
         pFeatures = patchcanvas.features_t()
         pFeatures.group_info   = False
@@ -786,6 +789,12 @@ class ClaudiaMainW(AbstractCanvasJackClass):
         self.ui.miniCanvasPreview.init(self.scene, DEFAULT_CANVAS_WIDTH, DEFAULT_CANVAS_HEIGHT)
         QTimer.singleShot(100, self.slot_miniCanvasInit)
 
+        # Merges preview updates requested by canvas changes, one per event loop iteration
+        self.fMiniCanvasUpdateTimer = QTimer(self)
+        self.fMiniCanvasUpdateTimer.setSingleShot(True)
+        self.fMiniCanvasUpdateTimer.setInterval(0)
+        self.fMiniCanvasUpdateTimer.timeout.connect(self.ui.miniCanvasPreview.update)
+
         # -------------------------------------------------------------
         # Check DBus
 
@@ -1161,37 +1170,38 @@ class ClaudiaMainW(AbstractCanvasJackClass):
 
         version, groups, conns = gDBus.patchbay.GetGraph(0)
 
-        # Graph Ports
-        for group in groups:
-            group_id, group_name, ports = group
-            self.canvas_add_group(int(group_id), str(group_name))
-
-            for port in ports:
-                port_id, port_name, port_flags, port_type_jack = port
+        with patchcanvas.batch():
+            # Graph Ports
+            for group in groups:
+                group_id, group_name, ports = group
+                self.canvas_add_group(int(group_id), str(group_name))
 
-                if port_flags & JACKDBUS_PORT_FLAG_INPUT:
-                    port_mode = patchcanvas.PORT_MODE_INPUT
-                elif port_flags & JACKDBUS_PORT_FLAG_OUTPUT:
-                    port_mode = patchcanvas.PORT_MODE_OUTPUT
-                else:
-                    port_mode = patchcanvas.PORT_MODE_NULL
+                for port in ports:
+                    port_id, port_name, port_flags, port_type_jack = port
 
-                if port_type_jack == JACKDBUS_PORT_TYPE_AUDIO:
-                    port_type = patchcanvas.PORT_TYPE_AUDIO_JACK
-                elif port_type_jack == JACKDBUS_PORT_TYPE_MIDI:
-                    if gDBus.ladish_graph.Get(GRAPH_DICT_OBJECT_TYPE_PORT, port_id, URI_A2J_PORT) == "yes":
-                        port_type = patchcanvas.PORT_TYPE_MIDI_A2J
+                    if port_flags & JACKDBUS_PORT_FLAG_INPUT:
+                        port_mode = patchcanvas.PORT_MODE_INPUT
+                    elif port_flags & JACKDBUS_PORT_FLAG_OUTPUT:
+                        port_mode = patchcanvas.PORT_MODE_OUTPUT
                     else:
-                        port_type = patchcanvas.PORT_TYPE_MIDI_JACK
-                else:
-                    port_type = patchcanvas.PORT_TYPE_NULL
+                        port_mode = patchcanvas.PORT_MODE_NULL
+
+                    if port_type_jack == JACKDBUS_PORT_TYPE_AUDIO:
+                        port_type = patchcanvas.PORT_TYPE_AUDIO_JACK
+                    elif port_type_jack == JACKDBUS_PORT_TYPE_MIDI:
+                        if gDBus.ladish_graph.Get(GRAPH_DICT_OBJECT_TYPE_PORT, port_id, URI_A2J_PORT) == "yes":
+                            port_type = patchcanvas.PORT_TYPE_MIDI_A2J
+                        else:
+                            port_type = patchcanvas.PORT_TYPE_MIDI_JACK
+                    else:
+                        port_type = patchcanvas.PORT_TYPE_NULL
 
-                self.canvas_add_port(int(group_id), int(port_id), str(port_name), port_mode, port_type)
+                    self.canvas_add_port(int(group_id), int(port_id), str(port_name), port_mode, port_type)
 
-        # Graph Connections
-        for conn in conns:
-            source_group_id, source_group_name, source_port_id, source_port_name, target_group_id, target_group_name, target_port_id, target_port_name, conn_id = conn
-            self.canvas_connect_ports(int(conn_id), int(source_port_id), int(target_port_id))
+            # Graph Connections
+            for conn in conns:
+                source_group_id, source_group_name, source_port_id, source_port_name, target_group_id, target_group_name, target_port_id, target_port_name, conn_id = conn
+                self.canvas_connect_ports(int(conn_id), int(source_port_id), int(target_port_id))
 
         QTimer.singleShot(1000 if (self.fSavedSettings['Canvas/EyeCandy']) else 0, self.ui.miniCanvasPreview.update)
 
@@ -1286,35 +1296,39 @@ class ClaudiaMainW(AbstractCanvasJackClass):
             if y2 is None: y2 = "%f" % (float(y) + 50)
             patchcanvas.setGroupPosFull(groupId, float(x), float(y), float(x2), float(y2))
 
-        QTimer.singleShot(0, self.ui.miniCanvasPreview.update)
+        self.canvas_update_preview()
+
+    def canvas_update_preview(self):
+        if not self.fMiniCanvasUpdateTimer.isActive():
+            self.fMiniCanvasUpdateTimer.start()
 
     def canvas_remove_group(self, group_id):
         patchcanvas.removeGroup(group_id)
-        QTimer.singleShot(0, self.ui.miniCanvasPreview.update)
+        self.canvas_update_preview()
 
     def canvas_rename_group(self, group_id, new_group_name):
         patchcanvas.renameGroup(group_id, new_group_name)
-        QTimer.singleShot(0, self.ui.miniCanvasPreview.update)
+        self.canvas_update_preview()
 
     def canvas_add_port(self, group_id, port_id, port_name, port_mode, port_type):
         patchcanvas.addPort(group_id, port_id, port_name, port_mode, port_type)
-        QTimer.singleShot(0, self.ui.miniCanvasPreview.update)
+        self.canvas_update_preview()
 
     def canvas_remove_port(self, port_id):
         patchcanvas.removePort(port_id)
-        QTimer.singleShot(0, self.ui.miniCanvasPreview.update)
+        self.canvas_update_preview()
 
     def canvas_rename_port(self, port_id, new_port_name):
         patchcanvas.renamePort(port_id, new_port_name)
-        QTimer.singleShot(0, self.ui.miniCanvasPreview.update)
+        self.canvas_update_preview()
 
     def canvas_connect_ports(self, connection_id, port_a, port_b):
         patchcanvas.connectPorts(connection_id, port_a, port_b)
-        QTimer.singleShot(0, self.ui.miniCanvasPreview.update)
+        self.canvas_update_preview()
 
     def canvas_disconnect_ports(self, connection_id):
         patchcanvas.disconnectPorts(connection_id)
-        QTimer.singleShot(0, self.ui.miniCanvasPreview.update)
+        self.canvas_update_preview()
 
     def jackStarted(self):
         if jacksettings.needsInit():
@@ -2633,6 +2647,9 @@ class ClaudiaMainW(AbstractCanvasJackClass):
             pOptions.use_bezier_lines = self.fSavedSettings["Canvas/UseBezierLines"]
             pOptions.antialiasing     = self.fSavedSettings["Canvas/Antialiasing"]
             pOptions.eyecandy         = self.fSavedSettings["Canvas/EyeCandy"]
+            pOptions.use_item_cache   = self.fSavedSettings["Canvas/UseItemCache"]
+            pOptions.virtualize_groups = self.fSavedSettings["Canvas/VirtualizeGroups"]
+            pOptions.bundle_connections = self.fSavedSettings["Canvas/BundleConnections"]
 
             pFeatures = patchcanvas.features_t()
             pFeatures.group_info   = False
@@ -2665,6 +2682,7 @@ class ClaudiaMainW(AbstractCanvasJackClass):
         settings.setValue("ShowToolbar", self.ui.frame_toolbar.isEnabled())
         settings.setValue("ShowStatusbar", self.ui.frame_statusbar.isEnabled())
         settings.setValue("TransportView", self.fCurTransportView)
+        settings.setValue("MiniCanvasBoxesOnly", self.ui.miniCanvasPreview.isBoxesOnly())
         settings.setValue("HorizontalScrollBarValue", self.ui.graphicsView.horizontalScrollBar().value())
         settings.setValue("VerticalScrollBarValue", self.ui.graphicsView.verticalScrollBar().value())
 
@@ -2689,6 +2707,7 @@ class ClaudiaMainW(AbstractCanvasJackClass):
             self.ui.frame_statusbar.setVisible(showStatusbar)
 
             self.setTransportView(settings.value("TransportView", TRANSPORT_VIEW_HMS, type=int))
+            self.ui.miniCanvasPreview.setBoxesOnly(settings.value("MiniCanvasBoxesOnly", False, type=bool))
 
         self.fSavedSettings = {
             "Main/DefaultProjectFolder": settings.value("Main/DefaultProjectFolder", DEFAULT_PROJECT_FOLDER, type=str),
@@ -2699,6 +2718,9 @@ class ClaudiaMainW(AbstractCanvasJackClass):
             "Canvas/AutoHideGroups": settings.value("Canvas/AutoHideGroups", False, type=bool),
             "Canvas/UseBezierLines": settings.value("Canvas/UseBezierLines", True, type=bool),
             "Canvas/EyeCandy": settings.value("Canvas/EyeCandy", patchcanvas.EYECANDY_SMALL, type=int),
+            "Canvas/UseItemCache": settings.value("Canvas/UseItemCache", False, type=bool),
+            "Canvas/VirtualizeGroups": settings.value("Canvas/VirtualizeGroups", False, type=bool),
+            "Canvas/BundleConnections": settings.value("Canvas/BundleConnections", False, type=bool),
             "Canvas/UseOpenGL": settings.value("Canvas/UseOpenGL", False, type=bool),
             "Canvas/Antialiasing": settings.value("Canvas/Antialiasing", patchcanvas.ANTIALIASING_SMALL, type=int),
             "Canvas/HighQualityAntialiasing": settings.value("Canvas/HighQualityAntialiasing", False, type=bool)
@@ -115,3 +115,46 @@ def translate_midi_event_buffer(void_p, size):
         return (void_p[0], void_p[1], void_p[2], void_p[3])
     else:
         return ()
+
+# ------------------------------------------------------------------------------------------------------------
+# Port snapshot, used to read the whole JACK graph in one go
+
+class jack_port_info_t(object):
+    __slots__ = [
+        'name',
+        'ptr',
+        'flags',
+        'type_str',
+        'aliases',
+        'connections'
+    ]
+
+def get_port_info(client, portPtr, portName, withAliases=True, withConnections=False):
+    portInfo = jack_port_info_t()
+    portInfo.name  = portName
+    portInfo.ptr   = portPtr
+    portInfo.flags = jacklib.port_flags(portPtr)
+    portInfo.type_str = str(jacklib.port_type(portPtr), encoding="utf-8")
+    portInfo.aliases  = jacklib.port_get_aliases(portPtr) if withAliases else (0, "", "")
+
+    # Connections are only needed from one side, use the outputs
+    if withConnections and portInfo.flags & jacklib.JackPortIsOutput:
+        portInfo.connections = c_char_p_p_to_list(jacklib.port_get_all_connections(client, portPtr))
+    else:
+        portInfo.connections = []
+
+    return portInfo
+
+def get_ports_snapshot(client, withAliases=True):
+    snapshot = []
+
+    for portName in c_char_p_p_to_list(jacklib.get_ports(client, "", "", 0)):
+        portPtr = jacklib.port_by_name(client, portName)
+
+        # Port might have been unregistered meanwhile
+        if not portPtr:
+            continue
+
+        snapshot.append(get_port_info(client, portPtr, portName, withAliases, True))
+
+    return snapshot
@@ -19,12 +19,14 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
+import codecs
+
 if True:
-    from PyQt5.QtCore import pyqtSlot, Qt, QFile, QIODevice, QMutex, QMutexLocker, QTextStream, QThread, QSettings
+    from PyQt5.QtCore import pyqtSlot, Qt, QFileSystemWatcher, QObject, QThread, QTimer, QSettings
     from PyQt5.QtGui import QPalette, QSyntaxHighlighter
     from PyQt5.QtWidgets import QDialog
 else:
-    from PyQt4.QtCore import pyqtSlot, Qt, QFile, QIODevice, QMutex, QMutexLocker, QTextStream, QThread, QSettings
+    from PyQt4.QtCore import pyqtSlot, Qt, QFileSystemWatcher, QObject, QThread, QTimer, QSettings
     from PyQt4.QtGui import QPalette, QSyntaxHighlighter
     from PyQt4.QtGui import QDialog
 
@@ -119,150 +121,224 @@ class SyntaxHighlighter_LADISH(QSyntaxHighlighter):
             self.setFormat(text.find(" -------"), len(text), self.fPalette.color(QPalette.Active, QPalette.Mid))
 
 # ------------------------------------------------------------------------------------------------------------
-# Lock-less file read thread
+# Log file tail, reading only what was appended since the last read
 
-class LogsReadThread(QThread):
-    MAX_INITIAL_SIZE = 2*1024*1024 # 2Mb
+class LogFileTail(object):
+    READ_SIZE = 1024*1024 # 1Mb
 
-    updateLogs = pyqtSignal()
+    def __init__(self, filename, maxInitialSize):
+        self.fFilename = filename
+        self.fFd       = -1
+        self.fFileId   = None
+        self.fOffset   = 0
+        self.fDecoder  = None
 
-    def __init__(self, parent):
-        QThread.__init__(self, parent)
+        self.reopen(maxInitialSize)
 
-        self.fCloseNow   = False
-        self.fPurgeLogs  = False
-        self.fRealParent = parent
+    def reopen(self, maxInitialSize=0):
+        self.close()
 
-        # -------------------------------------------------------------
-        # Take some values from Logs Window
+        try:
+            self.fFd = os.open(self.fFilename, os.O_RDONLY)
+        except OSError:
+            return
 
-        self.LOG_FILE_JACK   = LogsW.LOG_FILE_JACK
-        self.LOG_FILE_A2J    = LogsW.LOG_FILE_A2J
-        self.LOG_FILE_LASH   = LogsW.LOG_FILE_LASH
-        self.LOG_FILE_LADISH = LogsW.LOG_FILE_LADISH
+        fileStat = os.fstat(self.fFd)
 
-        # -------------------------------------------------------------
-        # Init logs
+        self.fFileId  = (fileStat.st_dev, fileStat.st_ino)
+        self.fOffset  = max(0, fileStat.st_size - maxInitialSize) if maxInitialSize else 0
+        self.fDecoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+    def close(self):
+        if self.fFd >= 0:
+            os.close(self.fFd)
+            self.fFd = -1
+
+    def filename(self):
+        return self.fFilename
+
+    # Text appended since the last read, following the log file when replaced by a new one
+    def read(self):
+        text = self.readAppended()
+
+        try:
+            fileStat = os.stat(self.fFilename)
+        except OSError:
+            # Removed, a new one will come with a directory change
+            return text
+
+        if (fileStat.st_dev, fileStat.st_ino) != self.fFileId:
+            self.reopen()
+            text += self.readAppended()
+
+        return text
+
+    def readAppended(self):
+        if self.fFd < 0:
+            return ""
+
+        size = os.fstat(self.fFd).st_size
+
+        # Truncated, start over
+        if size < self.fOffset:
+            self.fOffset = 0
+            self.fDecoder.reset()
+
+        chunks = []
+
+        while self.fOffset < size:
+            data = os.pread(self.fFd, min(size - self.fOffset, self.READ_SIZE), self.fOffset)
+
+            if not data:
+                break
+
+            self.fOffset += len(data)
+            chunks.append(self.fDecoder.decode(data))
+
+        return "".join(chunks)
+
+    def purge(self):
+        try:
+            os.truncate(self.fFilename, 0)
+        except OSError:
+            return
+
+        if self.fDecoder is not None:
+            self.fOffset = 0
+            self.fDecoder.reset()
+
+# ------------------------------------------------------------------------------------------------------------
+# Log files tailer, woken up by file system changes only
+
+class LogsTailer(QObject):
+    UPDATE_DELAY = 200 # ms
+
+    # log index, new text
+    updateLog = pyqtSignal(int, str)
+
+    def __init__(self, filenames, maxInitialSize):
+        QObject.__init__(self)
+
+        self.fTails   = {}
+        self.fPending = set()
+
+        for index, filename in enumerate(filenames):
+            if filename:
+                self.fTails[index] = LogFileTail(filename, maxInitialSize)
+
+        # Changes are read together a bit later, so busy logs don't wake the GUI for every write
+        self.fTimer = QTimer(self)
+        self.fTimer.setInterval(self.UPDATE_DELAY)
+        self.fTimer.setSingleShot(True)
+        self.fTimer.timeout.connect(self.slot_readPending)
+
+        self.fWatcher = QFileSystemWatcher(self)
+        self.fWatcher.fileChanged.connect(self.slot_fileChanged)
+        self.fWatcher.directoryChanged.connect(self.slot_directoryChanged)
+        self.watchFiles()
+
+    def close(self):
+        for tail in self.fTails.values():
+            tail.close()
+
+    # Watches the log files, and their directories to see rotated files coming back
+    def watchFiles(self):
+        watched = set(self.fWatcher.files() + self.fWatcher.directories())
+        paths   = set()
+
+        for tail in self.fTails.values():
+            paths.add(tail.filename())
+            paths.add(os.path.dirname(tail.filename()))
 
-        if self.LOG_FILE_JACK is not None:
-            self.fLogFileJACK = QFile(self.LOG_FILE_JACK)
-            self.fLogFileJACK.open(QIODevice.ReadOnly)
-            self.fLogStreamJACK = QTextStream(self.fLogFileJACK)
-            self.fLogStreamJACK.setCodec("UTF-8")
+        paths = [path for path in paths if path not in watched and os.path.exists(path)]
 
-            if self.fLogFileJACK.size() > self.MAX_INITIAL_SIZE:
-                self.fLogStreamJACK.seek(self.fLogFileJACK.size() - self.MAX_INITIAL_SIZE)
+        if paths:
+            self.fWatcher.addPaths(paths)
 
-        if self.LOG_FILE_A2J is not None:
-            self.fLogFileA2J = QFile(self.LOG_FILE_A2J)
-            self.fLogFileA2J.open(QIODevice.ReadOnly)
-            self.fLogStreamA2J = QTextStream(self.fLogFileA2J)
-            self.fLogStreamA2J.setCodec("UTF-8")
+    # All logs have their first update, even if empty
+    def readInitial(self):
+        for index, tail in self.fTails.items():
+            self.updateLog.emit(index, fixLogText(tail.read()).strip())
 
-            if self.fLogFileA2J.size() > self.MAX_INITIAL_SIZE:
-                self.fLogStreamA2J.seek(self.fLogFileA2J.size() - self.MAX_INITIAL_SIZE)
+    def schedule(self, indexes):
+        self.fPending.update(indexes)
 
-        if self.LOG_FILE_LASH is not None:
-            self.fLogFileLASH = QFile(self.LOG_FILE_LASH)
-            self.fLogFileLASH.open(QIODevice.ReadOnly)
-            self.fLogStreamLASH = QTextStream(self.fLogFileLASH)
-            self.fLogStreamLASH.setCodec("UTF-8")
+        if self.fPending and not self.fTimer.isActive():
+            self.fTimer.start()
 
-            if self.fLogFileLASH.size() > self.MAX_INITIAL_SIZE:
-                self.fLogStreamLASH.seek(self.fLogFileLASH.size() - self.MAX_INITIAL_SIZE)
+    @pyqtSlot(str)
+    def slot_fileChanged(self, path):
+        self.schedule(index for index, tail in self.fTails.items() if tail.filename() == path)
 
-        if self.LOG_FILE_LADISH is not None:
-            self.fLogFileLADISH = QFile(self.LOG_FILE_LADISH)
-            self.fLogFileLADISH.open(QIODevice.ReadOnly)
-            self.fLogStreamLADISH = QTextStream(self.fLogFileLADISH)
-            self.fLogStreamLADISH.setCodec("UTF-8")
+    @pyqtSlot(str)
+    def slot_directoryChanged(self, path):
+        self.schedule(index for index, tail in self.fTails.items() if os.path.dirname(tail.filename()) == path)
 
-            if self.fLogFileLADISH.size() > self.MAX_INITIAL_SIZE:
-                self.fLogStreamLADISH.seek(self.fLogFileLADISH.size() - self.MAX_INITIAL_SIZE)
+    @pyqtSlot()
+    def slot_readPending(self):
+        pending = sorted(self.fPending)
+        self.fPending.clear()
+
+        for index in pending:
+            text = fixLogText(self.fTails[index].read()).strip()
+
+            if text:
+                self.updateLog.emit(index, text)
+
+        self.watchFiles()
+
+    @pyqtSlot()
+    def slot_purgeLogs(self):
+        self.fPending.clear()
+
+        for tail in self.fTails.values():
+            tail.purge()
+
+# ------------------------------------------------------------------------------------------------------------
+# File read thread, running the tailer in its event loop
+
+class LogsReadThread(QThread):
+    MAX_INITIAL_SIZE = 2*1024*1024 # 2Mb
+
+    updateLog      = pyqtSignal(int, str)
+    purgeRequested = pyqtSignal()
+
+    def __init__(self, parent):
+        QThread.__init__(self, parent)
+
+        # -------------------------------------------------------------
+        # Take some values from Logs Window
+
+        self.LOG_FILE_JACK   = LogsW.LOG_FILE_JACK
+        self.LOG_FILE_A2J    = LogsW.LOG_FILE_A2J
+        self.LOG_FILE_LASH   = LogsW.LOG_FILE_LASH
+        self.LOG_FILE_LADISH = LogsW.LOG_FILE_LADISH
 
     def closeNow(self):
-        self.fCloseNow = True
+        self.quit()
 
     def purgeLogs(self):
-        self.fPurgeLogs = True
+        self.purgeRequested.emit()
 
     def run(self):
         # -------------------------------------------------------------
-        # Read logs and set text in main thread
-
-        while not self.fCloseNow:
-            if self.fPurgeLogs:
-                if self.LOG_FILE_JACK:
-                    self.fLogStreamJACK.flush()
-                    self.fLogFileJACK.close()
-                    self.fLogFileJACK.open(QIODevice.WriteOnly)
-                    self.fLogFileJACK.close()
-                    self.fLogFileJACK.open(QIODevice.ReadOnly)
-
-                if self.LOG_FILE_A2J:
-                    self.fLogStreamA2J.flush()
-                    self.fLogFileA2J.close()
-                    self.fLogFileA2J.open(QIODevice.WriteOnly)
-                    self.fLogFileA2J.close()
-                    self.fLogFileA2J.open(QIODevice.ReadOnly)
-
-                if self.LOG_FILE_LASH:
-                    self.fLogStreamLASH.flush()
-                    self.fLogFileLASH.close()
-                    self.fLogFileLASH.open(QIODevice.WriteOnly)
-                    self.fLogFileLASH.close()
-                    self.fLogFileLASH.open(QIODevice.ReadOnly)
-
-                if self.LOG_FILE_LADISH:
-                    self.fLogStreamLADISH.flush()
-                    self.fLogFileLADISH.close()
-                    self.fLogFileLADISH.open(QIODevice.WriteOnly)
-                    self.fLogFileLADISH.close()
-                    self.fLogFileLADISH.open(QIODevice.ReadOnly)
-
-                self.fPurgeLogs = False
-
-            else:
-                if self.LOG_FILE_JACK:
-                    textJACK = fixLogText(self.fLogStreamJACK.readAll()).strip()
-                else:
-                    textJACK = ""
-
-                if self.LOG_FILE_A2J:
-                    textA2J = fixLogText(self.fLogStreamA2J.readAll()).strip()
-                else:
-                    textA2J = ""
-
-                if self.LOG_FILE_LASH:
-                    textLASH = fixLogText(self.fLogStreamLASH.readAll()).strip()
-                else:
-                    textLASH = ""
-
-                if self.LOG_FILE_LADISH:
-                    textLADISH = fixLogText(self.fLogStreamLADISH.readAll()).strip()
-                else:
-                    textLADISH = ""
-
-                self.fRealParent.setLogsText(textJACK, textA2J, textLASH, textLADISH)
-                self.updateLogs.emit()
-
-            if not self.fCloseNow:
-                self.sleep(1)
+        # Init logs, the tailer lives in this thread
 
-        # -------------------------------------------------------------
-        # Close logs before closing thread
+        tailer = LogsTailer((self.LOG_FILE_JACK, self.LOG_FILE_A2J, self.LOG_FILE_LASH, self.LOG_FILE_LADISH), self.MAX_INITIAL_SIZE)
+        tailer.updateLog.connect(self.updateLog)
+        self.purgeRequested.connect(tailer.slot_purgeLogs)
 
-        if self.LOG_FILE_JACK:
-            self.fLogFileJACK.close()
+        # -------------------------------------------------------------
+        # Read logs as they change and send new text to main thread
 
-        if self.LOG_FILE_A2J:
-            self.fLogFileA2J.close()
+        tailer.readInitial()
+        self.exec_()
 
-        if self.LOG_FILE_LASH:
-            self.fLogFileLASH.close()
+        # -------------------------------------------------------------
+        # Close logs before closing thread
 
-        if self.LOG_FILE_LADISH:
-            self.fLogFileLADISH.close()
+        self.purgeRequested.disconnect(tailer.slot_purgeLogs)
+        tailer.close()
 
 # ------------------------------------------------------------------------------------------------------------
 # Logs Window
@@ -298,13 +374,7 @@ class LogsW(QDialog):
 
         self.loadSettings()
 
-        self.fFirstRun = True
-        self.fTextLock = QMutex()
-
-        self.fTextJACK   = ""
-        self.fTextA2J    = ""
-        self.fTextLASH   = ""
-        self.fTextLADISH = ""
+        self.fLoadedLogs = set()
 
         # -------------------------------------------------------------
         # Set-up GUI
@@ -355,57 +425,35 @@ class LogsW(QDialog):
         # -------------------------------------------------------------
         # Init file read thread
 
+        # Same order as the log files given to the tailer
+        self.fLogViews = (self.ui.pte_jack, self.ui.pte_a2j, self.ui.pte_lash, self.ui.pte_ladish)
+
         self.fReadThread = LogsReadThread(self)
-        self.fReadThread.start(QThread.IdlePriority)
 
         # -------------------------------------------------------------
         # Set-up connections
 
         self.ui.b_purge.clicked.connect(self.slot_purgeLogs)
-        self.fReadThread.updateLogs.connect(self.slot_updateLogs)
+        self.fReadThread.updateLog.connect(self.slot_updateLogs)
 
         # -------------------------------------------------------------
 
-    def setLogsText(self, textJACK, textA2J, textLASH, textLADISH):
-        QMutexLocker(self.fTextLock)
+        self.fReadThread.start(QThread.IdlePriority)
 
-        self.fTextJACK   = textJACK
-        self.fTextA2J    = textA2J
-        self.fTextLASH   = textLASH
-        self.fTextLADISH = textLADISH
+    @pyqtSlot(int, str)
+    def slot_updateLogs(self, index, text):
+        logView = self.fLogViews[index]
 
-    @pyqtSlot()
-    def slot_updateLogs(self):
-        QMutexLocker(self.fTextLock)
-
-        if self.fFirstRun:
-            self.ui.pte_jack.clear()
-            self.ui.pte_a2j.clear()
-            self.ui.pte_lash.clear()
-            self.ui.pte_ladish.clear()
-
-        if self.LOG_FILE_JACK and self.fTextJACK:
-            self.ui.pte_jack.appendPlainText(self.fTextJACK)
-
-        if self.LOG_FILE_A2J and self.fTextA2J:
-            self.ui.pte_a2j.appendPlainText(self.fTextA2J)
-
-        if self.LOG_FILE_LASH and self.fTextLASH:
-            self.ui.pte_lash.appendPlainText(self.fTextLASH)
-
-        if self.LOG_FILE_LADISH and self.fTextLADISH:
-            self.ui.pte_ladish.appendPlainText(self.fTextLADISH)
-
-        if self.fFirstRun:
-            self.ui.pte_jack.horizontalScrollBar().setValue(0)
-            self.ui.pte_jack.verticalScrollBar().setValue(self.ui.pte_jack.verticalScrollBar().maximum())
-            self.ui.pte_a2j.horizontalScrollBar().setValue(0)
-            self.ui.pte_a2j.verticalScrollBar().setValue(self.ui.pte_a2j.verticalScrollBar().maximum())
-            self.ui.pte_lash.horizontalScrollBar().setValue(0)
-            self.ui.pte_lash.verticalScrollBar().setValue(self.ui.pte_lash.verticalScrollBar().maximum())
-            self.ui.pte_ladish.horizontalScrollBar().setValue(0)
-            self.ui.pte_ladish.verticalScrollBar().setValue(self.ui.pte_ladish.verticalScrollBar().maximum())
-            self.fFirstRun = False
+        if index not in self.fLoadedLogs:
+            logView.clear()
+
+        if text:
+            logView.appendPlainText(text)
+
+        if index not in self.fLoadedLogs:
+            logView.horizontalScrollBar().setValue(0)
+            logView.verticalScrollBar().setValue(logView.verticalScrollBar().maximum())
+            self.fLoadedLogs.add(index)
 
     @pyqtSlot()
     def slot_purgeLogs(self):
@@ -17,26 +17,30 @@
 # For a full copy of the GNU General Public License see the GPL.txt file
 
 # Imports (Global)
+from contextlib import contextmanager
+from math import ceil
+
 if True:
     from PyQt5.QtCore import pyqtSignal, pyqtSlot, qDebug, qCritical, qFatal, qWarning, Qt, QObject
-    from PyQt5.QtCore import QAbstractAnimation, QLineF, QPointF, QRectF, QSizeF, QSettings, QTimer
-    from PyQt5.QtGui import QColor, QLinearGradient, QPen, QPolygonF, QPainter, QPainterPath
-    from PyQt5.QtGui import QCursor, QFont, QFontMetrics
+    from PyQt5.QtCore import QAbstractAnimation, QLineF, QPointF, QRectF, QSizeF, QSettings, QThread, QTimer
+    from PyQt5.QtGui import QColor, QGradient, QLinearGradient, QPen, QPolygonF, QPainter, QPainterPath
+    from PyQt5.QtGui import QCursor, QFont, QFontMetrics, QImage, QPixmap
     from PyQt5.QtWidgets import QGraphicsScene, QGraphicsItem, QGraphicsLineItem, QGraphicsPathItem
-    from PyQt5.QtWidgets import QGraphicsColorizeEffect, QGraphicsDropShadowEffect
-    from PyQt5.QtWidgets import QInputDialog, QLineEdit, QMenu
+    from PyQt5.QtWidgets import QGraphicsDropShadowEffect
+    from PyQt5.QtWidgets import QInputDialog, QLineEdit, QMenu, QStyleOptionGraphicsItem
     from PyQt5.QtSvg import QGraphicsSvgItem, QSvgRenderer
 else:
     from PyQt4.QtCore import pyqtSignal, pyqtSlot, qDebug, qCritical, qFatal, qWarning, Qt, QObject
-    from PyQt4.QtCore import QAbstractAnimation, QLineF, QPointF, QRectF, QSizeF, QSettings, QTimer
-    from PyQt4.QtGui import QColor, QLinearGradient, QPen, QPolygonF, QPainter, QPainterPath
-    from PyQt4.QtGui import QCursor, QFont, QFontMetrics
+    from PyQt4.QtCore import QAbstractAnimation, QLineF, QPointF, QRectF, QSizeF, QSettings, QThread, QTimer
+    from PyQt4.QtGui import QColor, QGradient, QLinearGradient, QPen, QPolygonF, QPainter, QPainterPath
+    from PyQt4.QtGui import QCursor, QFont, QFontMetrics, QImage, QPixmap
     from PyQt4.QtGui import QGraphicsScene, QGraphicsItem, QGraphicsLineItem, QGraphicsPathItem
-    from PyQt4.QtGui import QGraphicsColorizeEffect, QGraphicsDropShadowEffect
-    from PyQt4.QtGui import QInputDialog, QLineEdit, QMenu
+    from PyQt4.QtGui import QGraphicsDropShadowEffect
+    from PyQt4.QtGui import QInputDialog, QLineEdit, QMenu, QStyleOptionGraphicsItem
     from PyQt4.QtSvg import QGraphicsSvgItem, QSvgRenderer
 
 # Imports (Theme)
+from patchcanvas_arrange import *
 from patchcanvas_theme import *
 
 from properties_helper import GroupPropertiesHelper
@@ -56,6 +60,17 @@ PORT_TYPE_MIDI_JACK  = 2
 PORT_TYPE_MIDI_A2J   = 3
 PORT_TYPE_MIDI_ALSA  = 4
 
+# Port Type order, as placed inside a box
+PORT_TYPE_ORDER = (PORT_TYPE_AUDIO_JACK, PORT_TYPE_MIDI_JACK, PORT_TYPE_MIDI_A2J, PORT_TYPE_MIDI_ALSA)
+
+# name of each port type in the theme attributes
+PORT_TYPE_THEME_NAMES = {
+    PORT_TYPE_AUDIO_JACK: "audio_jack",
+    PORT_TYPE_MIDI_JACK:  "midi_jack",
+    PORT_TYPE_MIDI_A2J:   "midi_a2j",
+    PORT_TYPE_MIDI_ALSA:  "midi_alsa"
+}
+
 # Callback Action
 ACTION_GROUP_INFO       = 0 # group_id, N, N
 ACTION_GROUP_RENAME     = 1 # group_id, N, new_name
@@ -89,6 +104,10 @@ EYECANDY_NONE  = 0
 EYECANDY_SMALL = 1
 EYECANDY_FULL  = 2
 
+# Level of Detail, zoom levels below which the canvas is drawn simpler
+LOD_TEXT_MIN   = 0.5 # no port names
+LOD_SIMPLE_MIN = 0.3 # flat ports, solid boxes and straight lines
+
 # Canvas options
 class options_t(object):
     __slots__ = [
@@ -96,7 +115,12 @@ class options_t(object):
         'auto_hide_groups',
         'use_bezier_lines',
         'antialiasing',
-        'eyecandy'
+        'eyecandy',
+        'use_item_cache',
+        'lod_text',
+        'lod_simple',
+        'virtualize_groups',
+        'bundle_connections'
     ]
 
 # Canvas features
@@ -121,6 +145,32 @@ CanvasLineType          = QGraphicsItem.UserType + 4
 CanvasBezierLineType    = QGraphicsItem.UserType + 5
 CanvasLineMovType       = QGraphicsItem.UserType + 6
 CanvasBezierLineMovType = QGraphicsItem.UserType + 7
+CanvasBundleLineType    = QGraphicsItem.UserType + 8
+
+# lines less tall than this don't use the shared line pens
+LINE_FLAT_HEIGHT = 8
+
+# icons are not rasterized beyond this scale
+ICON_PIXEL_RATIO_MAX = 8.0
+
+# grid cell size of the port index used while dragging a new connection
+PORT_DRAG_CELL_SIZE = 64
+
+# fades started while this many are running snap to their final state
+FADE_MAX_ACTIVE = 256
+
+# virtualized boxes this far outside the view, relative to the view size, still get their ports
+VIRTUAL_MARGIN = 0.5
+
+# Lines re-pathed at the end of a batch above which the scene index is rebuilt once instead
+BATCH_INDEX_MIN_LINES = 64
+
+# connections between the same two boxes are drawn as one bundle from this many on
+BUNDLE_MIN_CONNECTIONS = 2
+BUNDLE_LINE_WIDTH_MAX  = 8
+
+# groups added after an arrange are placed once their ports and connections had this long to show up (ms)
+ARRANGE_NEW_GROUPS_DELAY = 500
 
 # object lists
 class group_dict_t(object):
@@ -129,7 +179,8 @@ class group_dict_t(object):
         'group_name',
         'split',
         'icon',
-        'widgets'
+        'widgets',
+        'ray_client'
     ]
 
 class port_dict_t(object):
@@ -150,10 +201,12 @@ class connection_dict_t(object):
         'widget'
     ]
 
-class animation_dict_t(object):
+class fade_state_t(object):
     __slots__ = [
-        'animation',
-        'item'
+        'show',
+        'destroy',
+        'start_time',
+        'duration'
     ]
 
 # Main Canvas object
@@ -166,10 +219,40 @@ class Canvas(object):
         'last_connection_id',
         'initial_pos',
         'size_rect',
-        'group_list',
-        'port_list',
-        'connection_list',
-        'animation_list',
+        'groups',
+        'ports',
+        'connections',
+        'port_connections',
+        'group_connections',
+        'layout_boxes',
+        'layout_scheduled',
+        'real_boxes',
+        'virtualize_scheduled',
+        'bundles',
+        'bundle_connections',
+        'box_index',
+        'text_widths',
+        'line_pens',
+        'line_batches',
+        'icon_renderers',
+        'icon_pixmaps',
+        'update_timer',
+        'update_full',
+        'update_rect',
+        'update_requests',
+        'update_count',
+        'batch_level',
+        'batch_lines',
+        'batch_z_items',
+        'batch_fades',
+        'index_suspended',
+        'index_method',
+        'arrange_thread',
+        'arrange_state',
+        'arrange_pending',
+        'arrange_scheduled',
+        'arrange_old_threads',
+        'fade_animation',
         'qobject',
         'settings',
         'theme',
@@ -183,29 +266,28 @@ class CanvasObject(QObject):
     def __init__(self, parent=None):
         QObject.__init__(self, parent)
 
-    @pyqtSlot()
-    def AnimationIdle(self):
-        animation = self.sender()
-        if animation:
-            CanvasRemoveAnimation(animation)
+        self.m_ray_connected = False
 
     @pyqtSlot()
-    def AnimationHide(self):
-        animation = self.sender()
-        if animation:
-            item = animation.item()
-            if item:
-                item.hide()
-            CanvasRemoveAnimation(animation)
+    def ArrangeFinished(self):
+        thread = self.sender()
 
-    @pyqtSlot()
-    def AnimationDestroy(self):
-        animation = self.sender()
-        if animation:
-            item = animation.item()
-            if item:
-                CanvasRemoveItemFX(item)
-            CanvasRemoveAnimation(animation)
+        # Ignore results from before a clear()
+        if thread in canvas.arrange_old_threads:
+            canvas.arrange_old_threads.discard(thread)
+            return
+
+        if thread and thread is canvas.arrange_thread:
+            result = thread.result()
+
+            # Only new boxes were to be placed, but too many of them
+            if result is not None:
+                CanvasApplyArrange(result)
+
+            if canvas.arrange_pending is not None:
+                incremental = canvas.arrange_pending
+                canvas.arrange_pending = None
+                arrange(incremental)
 
     @pyqtSlot()
     def PortContextMenuDisconnect(self):
@@ -216,6 +298,15 @@ class CanvasObject(QObject):
 
         CanvasCallback(ACTION_PORTS_DISCONNECT, connectionId, 0, "")
 
+    # Groups whose client joined or left RaySession get their "Go to app" menu back or lose it
+    @pyqtSlot(dict)
+    def RayClientsChanged(self, changes):
+        snapshot = GroupPropertiesHelper.instance().snapshot
+
+        for group in canvas.groups.values():
+            if snapshot.lookup(group.group_name)[0] in changes:
+                group.ray_client = CanvasIsRayClient(group.group_name)
+
     @pyqtSlot()
     def GroupContextMenuGoToApp(self):
         try:
@@ -224,6 +315,79 @@ class CanvasObject(QObject):
         except:
             pass
 
+# Grid of box scene rects, to find boxes by position without going through all scene items
+class CanvasBoxIndex(object):
+    def __init__(self, cell_size=256):
+        self.m_cell_size = cell_size
+        self.m_cells = {}
+        self.m_rects = {}
+
+    def cellsForRect(self, rect):
+        x1 = int(rect.left() // self.m_cell_size)
+        x2 = int(rect.right() // self.m_cell_size)
+        y1 = int(rect.top() // self.m_cell_size)
+        y2 = int(rect.bottom() // self.m_cell_size)
+        return [(x, y) for x in range(x1, x2+1) for y in range(y1, y2+1)]
+
+    def clear(self):
+        self.m_cells = {}
+        self.m_rects = {}
+
+    def updateBox(self, box):
+        rect = box.sceneBoundingRect()
+        old_rect = self.m_rects.get(box)
+
+        if old_rect is not None:
+            if old_rect == rect:
+                return
+            self.removeBox(box)
+
+        self.m_rects[box] = rect
+
+        for cell in self.cellsForRect(rect):
+            if cell in self.m_cells:
+                self.m_cells[cell].add(box)
+            else:
+                self.m_cells[cell] = set((box,))
+
+    def removeBox(self, box):
+        rect = self.m_rects.pop(box, None)
+
+        if rect is None:
+            return
+
+        for cell in self.cellsForRect(rect):
+            boxes = self.m_cells.get(cell)
+            if boxes is not None:
+                boxes.discard(box)
+                if not boxes:
+                    del self.m_cells[cell]
+
+    def boxes(self):
+        return self.m_rects.items()
+
+    def boxesAt(self, point):
+        cell = (int(point.x() // self.m_cell_size), int(point.y() // self.m_cell_size))
+        return [box for box in self.m_cells.get(cell, ()) if self.m_rects[box].contains(point)]
+
+    def boxesIn(self, rect):
+        found = set()
+
+        for cell in self.cellsForRect(rect):
+            for box in self.m_cells.get(cell, ()):
+                if box not in found and self.m_rects[box].intersects(rect):
+                    found.add(box)
+
+        return found
+
+    def topBoxAt(self, point):
+        top_box = None
+
+        for box in self.boxesAt(point):
+            if top_box is None or box.zValue() > top_box.zValue():
+                top_box = box
+
+        return top_box
 
 # Global objects
 canvas = Canvas()
@@ -231,10 +395,40 @@ canvas.qobject    = None
 canvas.settings   = None
 canvas.theme      = None
 canvas.initiated  = False
-canvas.group_list = []
-canvas.port_list  = []
-canvas.connection_list = []
-canvas.animation_list  = []
+canvas.groups = {}
+canvas.ports  = {}
+canvas.connections = {}
+canvas.port_connections  = {}
+canvas.group_connections = {}
+canvas.layout_boxes = set()
+canvas.layout_scheduled = False
+canvas.real_boxes   = set()
+canvas.virtualize_scheduled = False
+canvas.bundles = {}
+canvas.bundle_connections = {}
+canvas.box_index    = CanvasBoxIndex()
+canvas.text_widths  = {}
+canvas.line_pens    = {}
+canvas.line_batches = None
+canvas.icon_renderers = {}
+canvas.icon_pixmaps   = {}
+canvas.update_timer = None
+canvas.update_full  = False
+canvas.update_rect  = QRectF()
+canvas.update_requests = 0
+canvas.update_count    = 0
+canvas.batch_level   = 0
+canvas.index_suspended = 0
+canvas.index_method    = None
+canvas.batch_lines   = set()
+canvas.batch_z_items = {}
+canvas.batch_fades   = {}
+canvas.arrange_thread  = None
+canvas.arrange_state   = None
+canvas.arrange_pending = None
+canvas.arrange_scheduled   = False
+canvas.arrange_old_threads = set()
+canvas.fade_animation  = None
 
 options = options_t()
 options.theme_name = getDefaultThemeName()
@@ -242,6 +436,11 @@ options.auto_hide_groups = False
 options.use_bezier_lines = True
 options.antialiasing = ANTIALIASING_SMALL
 options.eyecandy     = EYECANDY_SMALL
+options.use_item_cache = False
+options.lod_text     = LOD_TEXT_MIN
+options.lod_simple   = LOD_SIMPLE_MIN
+options.virtualize_groups = False
+options.bundle_connections = False
 
 features = features_t()
 features.group_info   = False
@@ -307,6 +506,11 @@ def setOptions(new_options):
     options.use_bezier_lines = new_options.use_bezier_lines
     options.antialiasing = new_options.antialiasing
     options.eyecandy     = new_options.eyecandy
+    options.use_item_cache = getattr(new_options, 'use_item_cache', False)
+    options.lod_text     = getattr(new_options, 'lod_text', LOD_TEXT_MIN)
+    options.lod_simple   = getattr(new_options, 'lod_simple', LOD_SIMPLE_MIN)
+    options.virtualize_groups = getattr(new_options, 'virtualize_groups', False)
+    options.bundle_connections = getattr(new_options, 'bundle_connections', False)
 
 def setFeatures(new_features):
     if canvas.initiated: return
@@ -337,9 +541,28 @@ def init(appName, scene, callback, debug=False):
     canvas.last_connection_id = 0
     canvas.initial_pos = QPointF(0, 0)
     canvas.size_rect = QRectF()
+    canvas.text_widths = {}
+    canvas.line_pens = {}
+    canvas.line_batches = None
 
     if not canvas.qobject:  canvas.qobject = CanvasObject()
     if not canvas.settings: canvas.settings = QSettings("falkTX", appName)
+    if not canvas.fade_animation: canvas.fade_animation = CanvasFadeAnimation()
+
+    if features.group_go_to_app and not canvas.qobject.m_ray_connected:
+        GroupPropertiesHelper.instance().jackClientsChanged.connect(canvas.qobject.RayClientsChanged)
+        canvas.qobject.m_ray_connected = True
+
+    if not canvas.update_timer:
+        canvas.update_timer = QTimer()
+        canvas.update_timer.setSingleShot(True)
+        canvas.update_timer.setInterval(0)
+        canvas.update_timer.timeout.connect(CanvasProcessUpdate)
+
+    canvas.update_full = False
+    canvas.update_rect = QRectF()
+    canvas.update_requests = 0
+    canvas.update_count    = 0
 
     if canvas.theme:
         del canvas.theme
@@ -353,8 +576,17 @@ def init(appName, scene, callback, debug=False):
 
     if not canvas.theme:
         canvas.theme = Theme(getDefaultTheme())
-    
+
+    canvas.theme.buildRenderCache(PORT_TYPE_THEME_NAMES)
     canvas.scene.updateTheme()
+
+    # Virtual scenes are small and change on every scroll, the bsp index doesn't pay off there.
+    # It also keeps stale entries for port items, whose effective rect grows with the box shadow
+    # and so changes with the view zoom, which go dangling once ports are deleted.
+    if options.virtualize_groups:
+        canvas.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+    else:
+        canvas.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
     
     canvas.initiated = True
 
@@ -362,36 +594,50 @@ def clear():
     if canvas.debug:
         qDebug("PatchCanvas::clear()")
 
-    group_list_ids = []
-    port_list_ids  = []
-    connection_list_ids = []
-    
-    for group in canvas.group_list:
-        group_list_ids.append(group.group_id)
-
-    for port in canvas.port_list:
-        port_list_ids.append(port.port_id)
+    # Save all group positions at once
+    if features.handle_group_pos and canvas.groups:
+        canvas.settings.beginGroup("CanvasPositions")
 
-    for connection in canvas.connection_list:
-        connection_list_ids.append(connection.connection_id)
+        for group in canvas.groups.values():
+            CanvasSaveGroupPos(group)
 
-    for idx in connection_list_ids:
-        disconnectPorts(idx)
+        canvas.settings.endGroup()
+        canvas.settings.sync()
 
-    for idx in port_list_ids:
-        removePort(idx)
-
-    for idx in group_list_ids:
-        removeGroup(idx)
+    # Running fades would act on items about to be deleted
+    if canvas.fade_animation:
+        canvas.fade_animation.clear()
 
     canvas.last_z_value = 0
     canvas.last_connection_id = 0
 
-    canvas.group_list = []
-    canvas.port_list = []
-    canvas.connection_list = []
-
+    canvas.groups = {}
+    canvas.ports  = {}
+    canvas.connections = {}
+    canvas.port_connections  = {}
+    canvas.group_connections = {}
+    canvas.layout_boxes  = set()
+    canvas.real_boxes    = set()
+    canvas.bundles = {}
+    canvas.bundle_connections = {}
+    canvas.box_index.clear()
+
+    # A running layout can't be stopped, keep it alive until it finishes
+    if canvas.arrange_thread and canvas.arrange_thread.isRunning():
+        canvas.arrange_old_threads.add(canvas.arrange_thread)
+
+    canvas.arrange_thread  = None
+    canvas.arrange_state   = None
+    canvas.arrange_pending = None
+    canvas.batch_level   = 0
+    canvas.batch_lines   = set()
+    canvas.batch_z_items = {}
+    canvas.batch_fades   = {}
+    canvas.line_batches  = None
+
+    # Deletes all boxes, ports, lines and icons in one go
     canvas.scene.clear()
+    CanvasRequestUpdate()
 
     canvas.initiated = False
 
@@ -415,10 +661,9 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
     if canvas.debug:
         qDebug("PatchCanvas::addGroup(%i, %s, %s, %s)" % (group_id, group_name.encode(), split2str(split), icon2str(icon)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            qWarning("PatchCanvas::addGroup(%i, %s, %s, %s) - group already exists" % (group_id, group_name.encode(), split2str(split), icon2str(icon)))
-            return
+    if group_id in canvas.groups:
+        qWarning("PatchCanvas::addGroup(%i, %s, %s, %s) - group already exists" % (group_id, group_name.encode(), split2str(split), icon2str(icon)))
+        return
 
     if split == SPLIT_UNDEF and features.handle_group_pos:
         split = canvas.settings.value("CanvasPositions/%s_SPLIT" % group_name, split, type=int)
@@ -431,12 +676,13 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
     group_dict.split = bool(split == SPLIT_YES)
     group_dict.icon = icon
     group_dict.widgets = [group_box, None]
+    group_dict.ray_client = CanvasIsRayClient(group_name)
 
     if split == SPLIT_YES:
         group_box.setSplit(True, PORT_MODE_OUTPUT)
 
         if features.handle_group_pos:
-            group_box.setPos(canvas.settings.value("CanvasPositions/%s_OUTPUT" % group_name, CanvasGetNewGroupPos(), type=QPointF))
+            group_box.setPos(CanvasGetSavedGroupPos("CanvasPositions/%s_OUTPUT" % group_name))
         else:
             group_box.setPos(CanvasGetNewGroupPos())
 
@@ -446,12 +692,11 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
         group_dict.widgets[1] = group_sbox
 
         if features.handle_group_pos:
-            group_sbox.setPos(canvas.settings.value("CanvasPositions/%s_INPUT" % group_name, CanvasGetNewGroupPos(True), type=QPointF))
+            group_sbox.setPos(CanvasGetSavedGroupPos("CanvasPositions/%s_INPUT" % group_name, True))
         else:
             group_sbox.setPos(CanvasGetNewGroupPos(True))
 
-        canvas.last_z_value += 1
-        group_sbox.setZValue(canvas.last_z_value)
+        CanvasRaiseItem(group_sbox)
 
         if options.eyecandy == EYECANDY_FULL and not options.auto_hide_groups:
             CanvasItemFX(group_sbox, True)
@@ -462,7 +707,7 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
         group_box.setSplit(False)
 
         if features.handle_group_pos:
-            group_box.setPos(canvas.settings.value("CanvasPositions/%s" % group_name, CanvasGetNewGroupPos(), type=QPointF))
+            group_box.setPos(CanvasGetSavedGroupPos("CanvasPositions/%s" % group_name))
         else:
             # Special ladish fake-split groups
             horizontal = bool(icon == ICON_HARDWARE or icon == ICON_LADISH_ROOM)
@@ -470,174 +715,167 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
 
     group_box.checkItemPos()
 
-    canvas.last_z_value += 1
-    group_box.setZValue(canvas.last_z_value)
+    CanvasRaiseItem(group_box)
 
-    canvas.group_list.append(group_dict)
+    canvas.groups[group_id] = group_dict
 
     if options.eyecandy == EYECANDY_FULL and not options.auto_hide_groups:
         CanvasItemFX(group_box, True)
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasScheduleVirtualize()
+    CanvasScheduleArrangeNewGroups()
+    CanvasRequestUpdate()
 
 def removeGroup(group_id):
     if canvas.debug:
         qDebug("PatchCanvas::removeGroup(%i)" % group_id)
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            item = group.widgets[0]
-            group_name = group.group_name
+    group = canvas.groups.pop(group_id, None)
 
-            if group.split:
-                s_item = group.widgets[1]
+    if not group:
+        qCritical("PatchCanvas::removeGroup(%i) - unable to find group to remove" % group_id)
+        return
 
-                if features.handle_group_pos:
-                    canvas.settings.setValue("CanvasPositions/%s_OUTPUT" % group_name, item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_INPUT" % group_name, s_item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_YES)
+    item = group.widgets[0]
 
-                if options.eyecandy == EYECANDY_FULL:
-                    CanvasItemFX(s_item, False, True)
-                else:
-                    s_item.removeIconFromScene()
-                    canvas.scene.removeItem(s_item)
-                    del s_item
+    canvas.layout_boxes.difference_update(group.widgets)
+    canvas.real_boxes.difference_update(group.widgets)
+    canvas.box_index.removeBox(item)
 
-            else:
-                if features.handle_group_pos:
-                    canvas.settings.setValue("CanvasPositions/%s" % group_name, item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_NO)
+    if group.widgets[1]:
+        canvas.box_index.removeBox(group.widgets[1])
 
-            if options.eyecandy == EYECANDY_FULL:
-                CanvasItemFX(item, False, True)
-            else:
-                item.removeIconFromScene()
-                canvas.scene.removeItem(item)
-                del item
+    if features.handle_group_pos:
+        canvas.settings.beginGroup("CanvasPositions")
+        CanvasSaveGroupPos(group)
+        canvas.settings.endGroup()
 
-            canvas.group_list.remove(group)
+    if group.split:
+        s_item = group.widgets[1]
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+        if options.eyecandy == EYECANDY_FULL:
+            CanvasItemFX(s_item, False, True)
+        else:
+            s_item.removeIconFromScene()
+            canvas.scene.removeItem(s_item)
+            del s_item
+
+    if options.eyecandy == EYECANDY_FULL:
+        CanvasItemFX(item, False, True)
+    else:
+        item.removeIconFromScene()
+        canvas.scene.removeItem(item)
+        del item
 
-    qCritical("PatchCanvas::removeGroup(%i) - unable to find group to remove" % group_id)
+    canvas.group_connections.pop(group_id, None)
+
+    CanvasRequestUpdate()
 
 def renameGroup(group_id, new_group_name):
     if canvas.debug:
         qDebug("PatchCanvas::renameGroup(%i, %s)" % (group_id, new_group_name.encode()))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.group_name = new_group_name
-            group.widgets[0].setGroupName(new_group_name)
+    group = canvas.groups.get(group_id)
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setGroupName(new_group_name)
+    if not group:
+        qCritical("PatchCanvas::renameGroup(%i, %s) - unable to find group to rename" % (group_id, new_group_name.encode()))
+        return
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    group.group_name = new_group_name
+    group.widgets[0].setGroupName(new_group_name)
 
-    qCritical("PatchCanvas::renameGroup(%i, %s) - unable to find group to rename" % (group_id, new_group_name.encode()))
+    if group.split and group.widgets[1]:
+        group.widgets[1].setGroupName(new_group_name)
 
+    CanvasRequestUpdate()
 
 def splitGroup(group_id):
     if canvas.debug:
         qDebug("PatchCanvas::splitGroup(%i)" % group_id)
 
-    item = None
-    group_name = ""
-    group_icon = ICON_APPLICATION
     ports_data = []
     conns_data = []
 
     # Step 1 - Store all Item data
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if group.split:
-                qCritical("PatchCanvas::splitGroup(%i) - group is already splitted" % group_id)
-                return
-
-            item = group.widgets[0]
-            group_name = group.group_name
-            group_icon = group.icon
-            break
+    group = canvas.groups.get(group_id)
 
-    if not item:
+    if not group:
         qCritical("PatchCanvas::splitGroup(%i) - unable to find group to split" % group_id)
         return
 
-    port_list_ids = list(item.getPortList())
+    if group.split:
+        qCritical("PatchCanvas::splitGroup(%i) - group is already splitted" % group_id)
+        return
 
-    for port in canvas.port_list:
-        if port.port_id in port_list_ids:
-            port_dict = port_dict_t()
-            port_dict.group_id = port.group_id
-            port_dict.port_id = port.port_id
-            port_dict.port_name = port.port_name
-            port_dict.port_mode = port.port_mode
-            port_dict.port_type = port.port_type
-            port_dict.widget = None
-            ports_data.append(port_dict)
-
-    for connection in canvas.connection_list:
-        if connection.port_out_id in port_list_ids or connection.port_in_id in port_list_ids:
-            connection_dict = connection_dict_t()
-            connection_dict.connection_id = connection.connection_id
-            connection_dict.port_in_id = connection.port_in_id
-            connection_dict.port_out_id = connection.port_out_id
-            connection_dict.widget = None
-            conns_data.append(connection_dict)
+    item = group.widgets[0]
+    group_name = group.group_name
+    group_icon = group.icon
 
-    # Step 2 - Remove Item and Children
-    for conn in conns_data:
-        disconnectPorts(conn.connection_id)
+    port_list_ids = list(item.getPortList())
 
     for port_id in port_list_ids:
-        removePort(port_id)
+        port = canvas.ports[port_id]
+        port_dict = port_dict_t()
+        port_dict.group_id = port.group_id
+        port_dict.port_id = port.port_id
+        port_dict.port_name = port.port_name
+        port_dict.port_mode = port.port_mode
+        port_dict.port_type = port.port_type
+        port_dict.widget = None
+        ports_data.append(port_dict)
+
+    for connection_id in sorted(canvas.group_connections.get(group_id, ())):
+        connection = canvas.connections[connection_id]
+        connection_dict = connection_dict_t()
+        connection_dict.connection_id = connection.connection_id
+        connection_dict.port_in_id = connection.port_in_id
+        connection_dict.port_out_id = connection.port_out_id
+        connection_dict.widget = None
+        conns_data.append(connection_dict)
+
+    # Step 2 - Remove Item and Children
+    with batch():
+        for conn in conns_data:
+            disconnectPorts(conn.connection_id)
 
-    removeGroup(group_id)
+        for port_id in port_list_ids:
+            removePort(port_id)
 
-    # Step 3 - Re-create Item, now splitted
-    addGroup(group_id, group_name, SPLIT_YES, group_icon)
+        removeGroup(group_id)
 
-    for port in ports_data:
-        addPort(group_id, port.port_id, port.port_name, port.port_mode, port.port_type)
+        # Step 3 - Re-create Item, now splitted
+        addGroup(group_id, group_name, SPLIT_YES, group_icon)
 
-    for conn in conns_data:
-        connectPorts(conn.connection_id, conn.port_out_id, conn.port_in_id)
+        for port in ports_data:
+            addPort(group_id, port.port_id, port.port_name, port.port_mode, port.port_type)
 
-    QTimer.singleShot(0, canvas.scene.update)
+        for conn in conns_data:
+            connectPorts(conn.connection_id, conn.port_out_id, conn.port_in_id)
 
 def joinGroup(group_id):
     if canvas.debug:
         qDebug("PatchCanvas::joinGroup(%i)" % group_id)
 
-    item   = None
-    s_item = None
-    group_name = ""
-    group_icon = ICON_APPLICATION
     ports_data = []
     conns_data = []
 
     # Step 1 - Store all Item data
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if not group.split:
-                qCritical("PatchCanvas::joinGroup(%i) - group is not splitted" % group_id)
-                return
+    group = canvas.groups.get(group_id)
 
-            item = group.widgets[0]
-            s_item = group.widgets[1]
-            group_name = group.group_name
-            group_icon = group.icon
-            break
+    if group and not group.split:
+        qCritical("PatchCanvas::joinGroup(%i) - group is not splitted" % group_id)
+        return
 
     # FIXME
-    if not (item and s_item):
+    if not (group and group.widgets[0] and group.widgets[1]):
         qCritical("PatchCanvas::joinGroup(%i) - unable to find groups to join" % group_id)
         return
 
+    item   = group.widgets[0]
+    s_item = group.widgets[1]
+    group_name = group.group_name
+    group_icon = group.icon
+
     port_list_ids = list(item.getPortList())
     port_list_idss = s_item.getPortList()
 
@@ -645,64 +883,64 @@ def joinGroup(group_id):
         if port_id not in port_list_ids:
             port_list_ids.append(port_id)
 
-    for port in canvas.port_list:
-        if port.port_id in port_list_ids:
-            port_dict = port_dict_t()
-            port_dict.group_id = port.group_id
-            port_dict.port_id = port.port_id
-            port_dict.port_name = port.port_name
-            port_dict.port_mode = port.port_mode
-            port_dict.port_type = port.port_type
-            port_dict.widget = None
-            ports_data.append(port_dict)
-
-    for connection in canvas.connection_list:
-        if connection.port_out_id in port_list_ids or connection.port_in_id in port_list_ids:
-            connection_dict = connection_dict_t()
-            connection_dict.connection_id = connection.connection_id
-            connection_dict.port_in_id = connection.port_in_id
-            connection_dict.port_out_id = connection.port_out_id
-            connection_dict.widget = None
-            conns_data.append(connection_dict)
+    for port_id in port_list_ids:
+        port = canvas.ports[port_id]
+        port_dict = port_dict_t()
+        port_dict.group_id = port.group_id
+        port_dict.port_id = port.port_id
+        port_dict.port_name = port.port_name
+        port_dict.port_mode = port.port_mode
+        port_dict.port_type = port.port_type
+        port_dict.widget = None
+        ports_data.append(port_dict)
+
+    for connection_id in sorted(canvas.group_connections.get(group_id, ())):
+        connection = canvas.connections[connection_id]
+        connection_dict = connection_dict_t()
+        connection_dict.connection_id = connection.connection_id
+        connection_dict.port_in_id = connection.port_in_id
+        connection_dict.port_out_id = connection.port_out_id
+        connection_dict.widget = None
+        conns_data.append(connection_dict)
 
     # Step 2 - Remove Item and Children
-    for conn in conns_data:
-        disconnectPorts(conn.connection_id)
-
-    for port_id in port_list_ids:
-        removePort(port_id)
+    with batch():
+        for conn in conns_data:
+            disconnectPorts(conn.connection_id)
 
-    removeGroup(group_id)
+        for port_id in port_list_ids:
+            removePort(port_id)
 
-    # Step 3 - Re-create Item, now together
-    addGroup(group_id, group_name, SPLIT_NO, group_icon)
+        removeGroup(group_id)
 
-    for port in ports_data:
-        addPort(group_id, port.port_id, port.port_name, port.port_mode, port.port_type)
+        # Step 3 - Re-create Item, now together
+        addGroup(group_id, group_name, SPLIT_NO, group_icon)
 
-    for conn in conns_data:
-        connectPorts(conn.connection_id, conn.port_out_id, conn.port_in_id)
+        for port in ports_data:
+            addPort(group_id, port.port_id, port.port_name, port.port_mode, port.port_type)
 
-    QTimer.singleShot(0, canvas.scene.update)
+        for conn in conns_data:
+            connectPorts(conn.connection_id, conn.port_out_id, conn.port_in_id)
 
 def getGroupPos(group_id, port_mode=PORT_MODE_OUTPUT):
     if canvas.debug:
         qDebug("PatchCanvas::getGroupPos(%i, %s)" % (group_id, port_mode2str(port_mode)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if group.split:
-                if port_mode == PORT_MODE_OUTPUT:
-                    return group.widgets[0].pos()
-                elif port_mode == PORT_MODE_INPUT:
-                    return group.widgets[1].pos()
-                else:
-                    return QPointF(0, 0)
-            else:
-                return group.widgets[0].pos()
+    group = canvas.groups.get(group_id)
 
-    qCritical("PatchCanvas::getGroupPos(%i, %s) - unable to find group" % (group_id, port_mode2str(port_mode)))
-    return QPointF(0, 0)
+    if not group:
+        qCritical("PatchCanvas::getGroupPos(%i, %s) - unable to find group" % (group_id, port_mode2str(port_mode)))
+        return QPointF(0, 0)
+
+    if group.split:
+        if port_mode == PORT_MODE_OUTPUT:
+            return group.widgets[0].pos()
+        elif port_mode == PORT_MODE_INPUT:
+            return group.widgets[1].pos()
+        else:
+            return QPointF(0, 0)
+    else:
+        return group.widgets[0].pos()
 
 def setGroupPos(group_id, group_pos_x, group_pos_y):
     setGroupPosFull(group_id, group_pos_x, group_pos_y, group_pos_x, group_pos_y)
@@ -711,63 +949,61 @@ def setGroupPosFull(group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group
     if canvas.debug:
         qDebug("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i)" % (group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.widgets[0].setPos(group_pos_x_o, group_pos_y_o)
+    group = canvas.groups.get(group_id)
+
+    if not group:
+        qCritical("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i) - unable to find group to reposition" % (group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
+        return
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setPos(group_pos_x_i, group_pos_y_i)
+    group.widgets[0].setPos(group_pos_x_o, group_pos_y_o)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    if group.split and group.widgets[1]:
+        group.widgets[1].setPos(group_pos_x_i, group_pos_y_i)
 
-    qCritical("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i) - unable to find group to reposition" % (group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
+    CanvasRequestUpdate()
 
 def setGroupIcon(group_id, icon):
     if canvas.debug:
         qDebug("PatchCanvas::setGroupIcon(%i, %s)" % (group_id, icon2str(icon)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.icon = icon
-            group.widgets[0].setIcon(icon)
+    group = canvas.groups.get(group_id)
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setIcon(icon)
+    if not group:
+        qCritical("PatchCanvas::setGroupIcon(%i, %s) - unable to find group to change icon" % (group_id, icon2str(icon)))
+        return
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    group.icon = icon
+    group.widgets[0].setIcon(icon)
 
-    qCritical("PatchCanvas::setGroupIcon(%i, %s) - unable to find group to change icon" % (group_id, icon2str(icon)))
+    if group.split and group.widgets[1]:
+        group.widgets[1].setIcon(icon)
 
-def addPort(group_id, port_id, port_name, port_mode, port_type):
+    CanvasRequestUpdate()
+
+def setGroupCollapsed(group_id, yesno):
     if canvas.debug:
-        qDebug("PatchCanvas::addPort(%i, %i, %s, %s, %s)" % (group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
+        qDebug("PatchCanvas::setGroupCollapsed(%i, %s)" % (group_id, bool2str(yesno)))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            qWarning("PatchCanvas::addPort(%i, %i, %s, %s, %s) - port already exists" % (group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
-            return
+    group = canvas.groups.get(group_id)
 
-    box_widget  = None
-    port_widget = None
+    if not group:
+        qCritical("PatchCanvas::setGroupCollapsed(%i, %s) - unable to find group to collapse" % (group_id, bool2str(yesno)))
+        return
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if group.split and group.widgets[0].getSplittedMode() != port_mode and group.widgets[1]:
-                n = 1
-            else:
-                n = 0
-            box_widget  = group.widgets[n]
-            port_widget = box_widget.addPortFromGroup(port_id, port_mode, port_type, port_name)
-            break
+    group.widgets[0].setCollapsed(yesno)
 
-    if not (box_widget and port_widget):
-        qCritical("PatchCanvas::addPort(%i, %i, %s, %s, %s) - Unable to find parent group" % (group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
-        return
+    if group.split and group.widgets[1]:
+        group.widgets[1].setCollapsed(yesno)
 
-    if options.eyecandy == EYECANDY_FULL:
-        CanvasItemFX(port_widget, True)
+    CanvasRequestUpdate()
+
+def addPort(group_id, port_id, port_name, port_mode, port_type):
+    if canvas.debug:
+        qDebug("PatchCanvas::addPort(%i, %i, %s, %s, %s)" % (group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
+
+    if port_id in canvas.ports:
+        qWarning("PatchCanvas::addPort(%i, %i, %s, %s, %s) - port already exists" % (group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
+        return
 
     port_dict = port_dict_t()
     port_dict.group_id  = group_id
@@ -775,182 +1011,263 @@ def addPort(group_id, port_id, port_name, port_mode, port_type):
     port_dict.port_name = port_name
     port_dict.port_mode = port_mode
     port_dict.port_type = port_type
-    port_dict.widget = port_widget
-    canvas.port_list.append(port_dict)
+    port_dict.widget = None
+
+    box_widget = CanvasGetPortBox(port_dict)
+
+    if not box_widget:
+        qCritical("PatchCanvas::addPort(%i, %i, %s, %s, %s) - Unable to find parent group" % (group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
+        return
+
+    canvas.ports[port_id] = port_dict
 
-    box_widget.updatePositions()
+    # Virtual and collapsed boxes don't create port widgets
+    port_dict.widget = box_widget.addPortFromGroup(port_dict)
 
-    QTimer.singleShot(0, canvas.scene.update)
+    if port_dict.widget and options.eyecandy == EYECANDY_FULL:
+        CanvasItemFX(port_dict.widget, True)
+
+    box_widget.scheduleLayout()
+
+    CanvasRequestUpdate()
 
 def hidePort(port_id):
     if canvas.debug:
         qDebug("PatchCanvas::hidePort(%i)" % port_id)
 
-    for port in canvas.port_list:
-        if port.port_id == port_id:
-            port.widget.setVisible(False)
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    port = canvas.ports.get(port_id)
+
+    if not port:
+        qCritical("PatchCanvas::hiePort(%i) - Unable to find port to remove" % port_id)
+        return
 
-    qCritical("PatchCanvas::hiePort(%i) - Unable to find port to remove" % port_id)
+    CanvasGetPortBox(port).setPortHidden(port_id, True)
+    CanvasRequestUpdate()
 
 def showPort(port_id):
     if canvas.debug:
         qDebug("PatchCanvas::showPort(%i)" % port_id)
 
-    for port in canvas.port_list:
-        if port.port_id == port_id:
-            port.widget.setVisible(True)
-            QTimer.singleShot(0, canvas.scene.update)
-            return
-
-    qCritical("PatchCanvas::showPort(%i) - Unable to find port to remove" % port_id)
+    port = canvas.ports.get(port_id)
 
+    if not port:
+        qCritical("PatchCanvas::showPort(%i) - Unable to find port to remove" % port_id)
+        return
 
+    CanvasGetPortBox(port).setPortHidden(port_id, False)
+    CanvasRequestUpdate()
 
 def removePort(port_id):
     if canvas.debug:
         qDebug("PatchCanvas::removePort(%i)" % port_id)
 
-    for port in canvas.port_list:
-        if port.port_id == port_id:
-            item = port.widget
-            item.parentItem().removePortFromGroup(port_id)
-            canvas.scene.removeItem(item)
-            del item
+    port = canvas.ports.pop(port_id, None)
 
-            canvas.port_list.remove(port)
+    if not port:
+        qCritical("PatchCanvas::removePort(%i) - Unable to find port to remove" % port_id)
+        return
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    CanvasGetPortBox(port).removePortFromGroup(port_id)
+
+    if port.widget:
+        item = port.widget
+        port.widget = None
+        canvas.fade_animation.removeFade(item)
+        canvas.scene.removeItem(item)
+        del item
+
+    port_conns  = canvas.port_connections.pop(port_id, None)
+    group_conns = canvas.group_connections.get(port.group_id)
 
-    qCritical("PatchCanvas::removePort(%i) - Unable to find port to remove" % port_id)
+    if port_conns and group_conns:
+        group_conns.difference_update(port_conns)
+
+    CanvasRequestUpdate()
 
 def renamePort(port_id, new_port_name):
     if canvas.debug:
         qDebug("PatchCanvas::renamePort(%i, %s)" % (port_id, new_port_name.encode()))
 
-    for port in canvas.port_list:
-        if port.port_id == port_id:
-            port.port_name = new_port_name
-            port.widget.setPortName(new_port_name)
-            port.widget.parentItem().updatePositions()
+    port = canvas.ports.get(port_id)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    if not port:
+        qCritical("PatchCanvas::renamePort(%i, %s) - Unable to find port to rename" % (port_id, new_port_name.encode()))
+        return
+
+    port.port_name = new_port_name
+
+    if port.widget:
+        port.widget.setPortName(new_port_name)
+
+    CanvasGetPortBox(port).scheduleLayout()
 
-    qCritical("PatchCanvas::renamePort(%i, %s) - Unable to find port to rename" % (port_id, new_port_name.encode()))
+    CanvasRequestUpdate()
 
 def connectPorts(connection_id, port_out_id, port_in_id):
     if canvas.debug:
         qDebug("PatchCanvas::connectPorts(%i, %i, %i)" % (connection_id, port_out_id, port_in_id))
 
-    port_out = None
-    port_in  = None
-    port_out_parent = None
-    port_in_parent  = None
-
-    for port in canvas.port_list:
-        if port.port_id == port_out_id:
-            port_out = port.widget
-            port_out_parent = port_out.parentItem()
-        elif port.port_id == port_in_id:
-            port_in = port.widget
-            port_in_parent = port_in.parentItem()
+    port_out_dict = canvas.ports.get(port_out_id)
+    port_in_dict  = canvas.ports.get(port_in_id)
 
     # FIXME
-    if not (port_out and port_in):
+    if not (port_out_dict and port_in_dict) or port_out_id == port_in_id:
         qCritical("PatchCanvas::connectPorts(%i, %i, %i) - unable to find ports to connect" % (connection_id, port_out_id, port_in_id))
         return
 
+    port_out_parent = CanvasGetPortBox(port_out_dict)
+    port_in_parent  = CanvasGetPortBox(port_in_dict)
+
     connection_dict = connection_dict_t()
     connection_dict.connection_id = connection_id
     connection_dict.port_out_id = port_out_id
     connection_dict.port_in_id = port_in_id
+    connection_dict.widget = None
 
-    if options.use_bezier_lines:
-        connection_dict.widget = CanvasBezierLine(port_out, port_in, None)
-    else:
-        connection_dict.widget = CanvasLine(port_out, port_in, None)
+    CanvasRaiseItem(port_out_parent)
+    CanvasRaiseItem(port_in_parent)
 
-    canvas.scene.addItem(connection_dict.widget)
+    CanvasAddConnectionIndex(connection_dict, port_out_dict.group_id, port_in_dict.group_id)
 
-    port_out_parent.addLineFromGroup(connection_dict.widget, connection_id)
-    port_in_parent.addLineFromGroup(connection_dict.widget, connection_id)
+    if options.bundle_connections:
+        CanvasAddBundleConnection(connection_dict, port_out_parent, port_in_parent)
 
-    canvas.last_z_value += 1
-    port_out_parent.setZValue(canvas.last_z_value)
-    port_in_parent.setZValue(canvas.last_z_value)
-
-    canvas.last_z_value += 1
-    connection_dict.widget.setZValue(canvas.last_z_value)
+    CanvasUpdateLine(connection_dict, port_out_parent, port_in_parent)
 
-    canvas.connection_list.append(connection_dict)
+    if connection_dict.widget:
+        CanvasRaiseItem(connection_dict.widget)
 
-    if options.eyecandy == EYECANDY_FULL:
-        item = connection_dict.widget
-        CanvasItemFX(item, True)
+        if options.eyecandy == EYECANDY_FULL:
+            CanvasItemFX(connection_dict.widget, True)
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasRequestUpdate()
 
 def disconnectPorts(connection_id):
     if canvas.debug:
         qDebug("PatchCanvas::disconnectPorts(%i)" % connection_id)
 
-    port_1_id = port_2_id = 0
-    line = None
-    item1 = None
-    item2 = None
-
-    for connection in canvas.connection_list:
-        if connection.connection_id == connection_id:
-            port_1_id = connection.port_out_id
-            port_2_id = connection.port_in_id
-            line = connection.widget
-            canvas.connection_list.remove(connection)
-            break
+    connection = canvas.connections.get(connection_id)
 
-    if not line:
+    if not connection:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find connection ports" % connection_id)
         return
 
-    for port in canvas.port_list:
-        if port.port_id == port_1_id:
-            item1 = port.widget
-            break
+    line = connection.widget
+    port_1 = canvas.ports.get(connection.port_out_id)
+    port_2 = canvas.ports.get(connection.port_in_id)
 
-    if not item1:
+    CanvasRemoveConnectionIndex(connection)
+
+    if not port_1:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find output port" % connection_id)
         return
 
-    for port in canvas.port_list:
-        if port.port_id == port_2_id:
-            item2 = port.widget
-            break
-
-    if not item2:
+    if not port_2:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find input port" % connection_id)
         return
 
-    item1.parentItem().removeLineFromGroup(connection_id)
-    item2.parentItem().removeLineFromGroup(connection_id)
+    # Connections between two virtual boxes, or inside a bundle, have no line
+    if line:
+        connection.widget = None
+        line.getBoxOut().removeLineFromGroup(connection_id)
+        line.getBoxIn().removeLineFromGroup(connection_id)
 
-    if options.eyecandy == EYECANDY_FULL:
-        CanvasItemFX(line, False, True)
-    else:
-        line.deleteFromScene()
+        if options.eyecandy == EYECANDY_FULL:
+            CanvasItemFX(line, False, True)
+        else:
+            line.deleteFromScene()
+
+    if options.bundle_connections:
+        CanvasRemoveBundleConnection(connection, CanvasGetPortBox(port_1), CanvasGetPortBox(port_2))
 
-    QTimer.singleShot(0, canvas.scene.update)
+    CanvasRequestUpdate()
 
-def arrange():
+def arrange(incremental=False):
     if canvas.debug:
-        qDebug("PatchCanvas::arrange()")
+        qDebug("PatchCanvas::arrange(%s)" % bool2str(incremental))
+
+    # Run again once the current one is done
+    if canvas.arrange_thread and canvas.arrange_thread.isRunning():
+        canvas.arrange_pending = bool(incremental and canvas.arrange_pending is not False)
+        return
+
+    CanvasStartArrange(canvas.arrange_state if incremental else None, True)
+
+# Canvas changes inside are applied at once when leaving it, even on exceptions
+@contextmanager
+def batch():
+    beginBatch()
+
+    try:
+        yield
+    finally:
+        endBatch()
+
+def beginBatch():
+    if canvas.debug:
+        qDebug("PatchCanvas::beginBatch()")
+
+    canvas.batch_level += 1
+
+def endBatch():
+    if canvas.debug:
+        qDebug("PatchCanvas::endBatch()")
+
+    if canvas.batch_level == 0:
+        qCritical("PatchCanvas::endBatch() - not in a batch")
+        return
+
+    if canvas.batch_level > 1:
+        canvas.batch_level -= 1
+        return
+
+    # Box layouts first, line updates are still collected meanwhile
+    CanvasProcessLayouts()
+
+    canvas.batch_level = 0
+
+    batch_lines   = canvas.batch_lines
+    batch_z_items = canvas.batch_z_items
+    batch_fades   = canvas.batch_fades
+
+    canvas.batch_lines   = set()
+    canvas.batch_z_items = {}
+    canvas.batch_fades   = {}
+
+    # Updating the BSP index for each new path costs far more than building it again
+    suspend_index = len(batch_lines) >= BATCH_INDEX_MIN_LINES
+
+    if suspend_index:
+        CanvasSuspendIndex()
+
+    # Items removed during the batch are no longer part of the scene
+    for line in batch_lines:
+        if line.scene() is not None:
+            line.updateLinePos()
+
+    if suspend_index:
+        CanvasResumeIndex()
+
+    for item in batch_z_items:
+        if item.scene() is not None:
+            canvas.last_z_value += 1
+            item.setZValue(canvas.last_z_value)
+
+    for item in batch_fades:
+        if item.scene() is not None:
+            CanvasItemFX(item, True)
+
+    CanvasScheduleVirtualize()
+    CanvasRequestUpdate()
+
+def getUpdateCounters():
+    return (canvas.update_requests, canvas.update_count)
 
 def updateZValues():
     if canvas.debug:
         qDebug("PatchCanvas::updateZValues()")
 
-    for group in canvas.group_list:
+    for group in canvas.groups.values():
         group.widgets[0].resetLinesZValue()
 
         if group.split and group.widgets[1]:
@@ -958,13 +1275,47 @@ def updateZValues():
 
 # Extra Internal functions
 
+def CanvasAddConnectionIndex(connection, group_out_id, group_in_id):
+    connection_id = connection.connection_id
+    canvas.connections[connection_id] = connection
+
+    for port_id in (connection.port_out_id, connection.port_in_id):
+        if port_id in canvas.port_connections:
+            canvas.port_connections[port_id].add(connection_id)
+        else:
+            canvas.port_connections[port_id] = set((connection_id,))
+
+    for group_id in (group_out_id, group_in_id):
+        if group_id in canvas.group_connections:
+            canvas.group_connections[group_id].add(connection_id)
+        else:
+            canvas.group_connections[group_id] = set((connection_id,))
+
+def CanvasRemoveConnectionIndex(connection):
+    connection_id = connection.connection_id
+    canvas.connections.pop(connection_id, None)
+
+    for port_id in (connection.port_out_id, connection.port_in_id):
+        port_conns = canvas.port_connections.get(port_id)
+        if port_conns is not None:
+            port_conns.discard(connection_id)
+
+        port = canvas.ports.get(port_id)
+        if port is None:
+            continue
+
+        group_conns = canvas.group_connections.get(port.group_id)
+        if group_conns is not None:
+            group_conns.discard(connection_id)
+
 def CanvasGetGroupName(group_id):
     if canvas.debug:
         qDebug("PatchCanvas::CanvasGetGroupName(%i)" % group_id)
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            return group.group_name
+    group = canvas.groups.get(group_id)
+
+    if group:
+        return group.group_name
 
     qCritical("PatchCanvas::CanvasGetGroupName(%i) - unable to find group" % group_id)
     return ""
@@ -973,10 +1324,15 @@ def CanvasGetGroupPortCount(group_id):
     if canvas.debug:
         qDebug("PatchCanvas::CanvasGetGroupPortCount(%i)" % group_id)
 
-    port_count = 0
-    for port in canvas.port_list:
-        if port.group_id == group_id:
-            port_count += 1
+    group = canvas.groups.get(group_id)
+
+    if not group:
+        return 0
+
+    port_count = group.widgets[0].getPortCount()
+
+    if group.split and group.widgets[1]:
+        port_count += group.widgets[1].getPortCount()
 
     return port_count
 
@@ -984,39 +1340,541 @@ def CanvasGetNewGroupPos(horizontal=False):
     if canvas.debug:
         qDebug("PatchCanvas::CanvasGetNewGroupPos(%s)" % bool2str(horizontal))
 
+    # Existing boxes need their final size
+    CanvasProcessLayouts()
+
     new_pos = QPointF(canvas.initial_pos.x(), canvas.initial_pos.y())
-    items = canvas.scene.items()
-
-    break_loop = False
-    while not break_loop:
-        break_for = False
-        for i in range(len(items)):
-            item = items[i]
-            if item and item.type() == CanvasBoxType:
-                if item.sceneBoundingRect().contains(new_pos):
-                    if horizontal:
-                        new_pos += QPointF(item.boundingRect().width() + 15, 0)
-                    else:
-                        new_pos += QPointF(0, item.boundingRect().height() + 15)
-                    break_for = True
-                    break
 
-            if i >= len(items) - 1 and not break_for:
-                break_loop = True
+    # Skip over boxes until reaching a free spot
+    while True:
+        item = canvas.box_index.topBoxAt(new_pos)
+
+        if item is None:
+            break
+
+        if horizontal:
+            new_pos += QPointF(item.boundingRect().width() + 15, 0)
+        else:
+            new_pos += QPointF(0, item.boundingRect().height() + 15)
 
     return new_pos
 
+def CanvasRequestUpdate(rect=None):
+    canvas.update_requests += 1
+
+    if rect is None:
+        canvas.update_full = True
+    elif not canvas.update_full:
+        canvas.update_rect = canvas.update_rect.united(rect)
+
+    if canvas.batch_level > 0:
+        return
+
+    if canvas.update_timer and not canvas.update_timer.isActive():
+        canvas.update_timer.start()
+
+# Nested, only the outermost calls change the index method
+def CanvasSuspendIndex():
+    if canvas.index_suspended == 0:
+        canvas.index_method = canvas.scene.itemIndexMethod()
+
+        if canvas.index_method != QGraphicsScene.NoIndex:
+            canvas.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+
+    canvas.index_suspended += 1
+
+def CanvasResumeIndex():
+    canvas.index_suspended -= 1
+
+    if canvas.index_suspended == 0 and canvas.index_method != QGraphicsScene.NoIndex:
+        canvas.scene.setItemIndexMethod(canvas.index_method)
+
+def CanvasProcessUpdate():
+    if canvas.update_full:
+        canvas.scene.update()
+    elif not canvas.update_rect.isNull():
+        canvas.scene.update(canvas.update_rect)
+    else:
+        return
+
+    canvas.update_full = False
+    canvas.update_rect = QRectF()
+    canvas.update_count += 1
+
+def CanvasGetBoxKey(group, box):
+    return (group.group_id, box.getSplittedMode() if group.split else PORT_MODE_NULL)
+
+def CanvasGetBoxByKey(key):
+    group_id, port_mode = key
+    group = canvas.groups.get(group_id)
+
+    if not group:
+        return None
+
+    if not group.split:
+        return group.widgets[0] if port_mode == PORT_MODE_NULL else None
+
+    for box in group.widgets:
+        if box and box.getSplittedMode() == port_mode:
+            return box
+
+    return None
+
+def CanvasGetArrangeSnapshot():
+    # Existing boxes need their final size
+    CanvasProcessLayouts()
+
+    boxes = []
+    edges = {}
+    keys  = {}
+
+    for group in canvas.groups.values():
+        for box in group.widgets:
+            if box is None:
+                continue
+
+            rect = box.sceneBoundingRect()
+
+            arrange_box = arrange_box_t()
+            arrange_box.key    = CanvasGetBoxKey(group, box)
+            arrange_box.kind   = ARRANGE_CLIENT
+            arrange_box.x      = rect.x()
+            arrange_box.y      = rect.y()
+            arrange_box.width  = rect.width()
+            arrange_box.height = rect.height()
+
+            # Hardware boxes with only outputs are capture, with only inputs are playback
+            if group.icon == ICON_HARDWARE:
+                has_ins  = box.hasPortMode(PORT_MODE_INPUT)
+                has_outs = box.hasPortMode(PORT_MODE_OUTPUT)
+
+                if has_outs and not has_ins:
+                    arrange_box.kind = ARRANGE_SOURCE
+                elif has_ins and not has_outs:
+                    arrange_box.kind = ARRANGE_SINK
+
+            boxes.append(arrange_box)
+            keys[box] = arrange_box.key
+
+    for connection in canvas.connections.values():
+        port_out = canvas.ports.get(connection.port_out_id)
+        port_in  = canvas.ports.get(connection.port_in_id)
+
+        if not (port_out and port_in):
+            continue
+
+        edge = (keys.get(CanvasGetPortBox(port_out)), keys.get(CanvasGetPortBox(port_in)))
+        edges[edge] = edges.get(edge, 0) + 1
+
+    return (boxes, edges)
+
+def CanvasStartArrange(previous, allow_full):
+    boxes, edges = CanvasGetArrangeSnapshot()
+
+    canvas.arrange_thread = CanvasArrangeThread(boxes, edges, previous, allow_full)
+    canvas.arrange_thread.finished.connect(canvas.qobject.ArrangeFinished)
+    canvas.arrange_thread.start()
+
+# Once arranged, new groups are placed next to their connections, the rest of the graph stays as it is
+def CanvasScheduleArrangeNewGroups():
+    if canvas.arrange_state is None or canvas.arrange_scheduled:
+        return
+
+    canvas.arrange_scheduled = True
+    QTimer.singleShot(ARRANGE_NEW_GROUPS_DELAY, CanvasProcessArrangeNewGroups)
+
+def CanvasProcessArrangeNewGroups():
+    canvas.arrange_scheduled = False
+
+    # Cleared in the meantime
+    if canvas.arrange_state is None:
+        return
+
+    if canvas.arrange_thread and canvas.arrange_thread.isRunning():
+        CanvasScheduleArrangeNewGroups()
+        return
+
+    CanvasStartArrange(canvas.arrange_state, False)
+
+def CanvasApplyArrange(result):
+    if canvas.debug:
+        qDebug("PatchCanvas::CanvasApplyArrange(%i)" % len(result.positions))
+
+    boxes = {}
+
+    for key in result.positions:
+        box = CanvasGetBoxByKey(key)
+
+        # Removed in the meantime
+        if box is not None:
+            boxes[key] = box
+
+    offset_x = offset_y = 0
+
+    # A full layout is centered around the initial position, inside the canvas size
+    if not result.incremental and boxes:
+        min_x = min(result.positions[key][0] for key in boxes)
+        min_y = min(result.positions[key][1] for key in boxes)
+        max_x = max(result.positions[key][0] + box.boundingRect().width()  for key, box in boxes.items())
+        max_y = max(result.positions[key][1] + box.boundingRect().height() for key, box in boxes.items())
+
+        offset_x = canvas.initial_pos.x() - (min_x + max_x) / 2
+        offset_y = canvas.initial_pos.y() - (min_y + max_y) / 2
+
+        if not canvas.size_rect.isNull():
+            offset_x = max(offset_x, canvas.size_rect.x() - min_x)
+            offset_y = max(offset_y, canvas.size_rect.y() - min_y)
+
+        result.state.columns = [x + offset_x for x in result.state.columns]
+
+    # Moving a box moves all its ports in the index too
+    CanvasSuspendIndex()
+
+    try:
+        with batch():
+            for key, box in boxes.items():
+                x, y = result.positions[key]
+                box.setPos(x + offset_x, y + offset_y)
+                box.checkItemPos()
+    finally:
+        CanvasResumeIndex()
+
+    canvas.arrange_state = result.state
+
+    for box in boxes.values():
+        canvas.scene.sceneGroupMoved.emit(box.getGroupId(), box.getSplittedMode(), box.scenePos())
+
+def CanvasSaveGroupPos(group):
+    # Keys are relative to the "CanvasPositions" settings group
+    if group.split:
+        canvas.settings.setValue("%s_OUTPUT" % group.group_name, group.widgets[0].pos())
+        canvas.settings.setValue("%s_INPUT" % group.group_name, group.widgets[1].pos())
+        canvas.settings.setValue("%s_SPLIT" % group.group_name, SPLIT_YES)
+    else:
+        canvas.settings.setValue(group.group_name, group.widgets[0].pos())
+        canvas.settings.setValue("%s_SPLIT" % group.group_name, SPLIT_NO)
+
+def CanvasRaiseItem(item):
+    if canvas.batch_level > 0:
+        # Keep the last raise order, applied at the end of the batch
+        canvas.batch_z_items.pop(item, None)
+        canvas.batch_z_items[item] = None
+        return
+
+    canvas.last_z_value += 1
+    item.setZValue(canvas.last_z_value)
+
+def CanvasScheduleLayout(box):
+    canvas.layout_boxes.add(box)
+
+    if not (canvas.layout_scheduled or canvas.batch_level > 0):
+        canvas.layout_scheduled = True
+        QTimer.singleShot(0, CanvasProcessLayouts)
+
+def CanvasProcessLayouts():
+    canvas.layout_scheduled = False
+
+    while canvas.layout_boxes:
+        canvas.layout_boxes.pop().updatePositions()
+
+def CanvasScheduleVirtualize():
+    if not options.virtualize_groups:
+        return
+
+    if not (canvas.virtualize_scheduled or canvas.batch_level > 0):
+        canvas.virtualize_scheduled = True
+        QTimer.singleShot(0, CanvasProcessVirtualize)
+
+# Boxes near the view get their port items and lines, all others are kept virtual.
+# Lines stay while either end box is real, so connections leaving the view are still drawn.
+def CanvasProcessVirtualize():
+    canvas.virtualize_scheduled = False
+
+    if not options.virtualize_groups or canvas.batch_level > 0 or not canvas.scene:
+        return
+
+    views = canvas.scene.views()
+
+    # Not while dragging from a port, its item must stay around
+    if not views or isinstance(canvas.scene.mouseGrabberItem(), CanvasPort):
+        return
+
+    # Box sizes are needed for the index
+    CanvasProcessLayouts()
+
+    view = views[0]
+    rect = view.mapToScene(view.viewport().rect()).boundingRect()
+    margin = max(rect.width(), rect.height()) * VIRTUAL_MARGIN
+    rect.adjust(-margin, -margin, margin, margin)
+
+    in_view = canvas.box_index.boxesIn(rect)
+
+    for box in in_view - canvas.real_boxes:
+        box.setVirtual(False)
+
+    for box in canvas.real_boxes - in_view:
+        box.setVirtual(True)
+
+def CanvasGetPortBox(port):
+    group = canvas.groups.get(port.group_id)
+
+    if not group:
+        return None
+
+    if group.split and group.widgets[1] and group.widgets[0].getSplittedMode() != port.port_mode:
+        return group.widgets[1]
+
+    return group.widgets[0]
+
+# Lines exist while one of their boxes is real, and their bundle (if any) is expanded
+def CanvasUpdateLine(connection, box_out, box_in):
+    bundle = canvas.bundles.get((box_out, box_in))
+
+    if (box_out.isVirtual() and box_in.isVirtual()) or (bundle is not None and not bundle.isExpanded()):
+        CanvasRemoveLine(connection)
+
+    elif connection.widget is None:
+        CanvasAddLine(connection)
+
+        # Keep the line right above its boxes, not on top of everything
+        connection.widget.setZValue(max(box_out.zValue(), box_in.zValue()))
+
+def CanvasAddBundleConnection(connection, box_out, box_in):
+    key = (box_out, box_in)
+
+    if key in canvas.bundle_connections:
+        canvas.bundle_connections[key].add(connection.connection_id)
+    else:
+        canvas.bundle_connections[key] = set((connection.connection_id,))
+
+    CanvasUpdateBundle(box_out, box_in)
+
+def CanvasRemoveBundleConnection(connection, box_out, box_in):
+    key = (box_out, box_in)
+    connection_ids = canvas.bundle_connections.get(key)
+
+    if connection_ids is None:
+        return
+
+    connection_ids.discard(connection.connection_id)
+
+    if not connection_ids:
+        del canvas.bundle_connections[key]
+
+    CanvasUpdateBundle(box_out, box_in)
+
+# Creates or removes the bundle of two boxes to match their connections.
+# Member lines are only updated when the bundle comes or goes, single connections are up to the caller.
+def CanvasUpdateBundle(box_out, box_in):
+    key = (box_out, box_in)
+    connection_ids = canvas.bundle_connections.get(key, ())
+    bundle = canvas.bundles.get(key)
+
+    bundled = len(connection_ids) >= BUNDLE_MIN_CONNECTIONS and not (box_out.isVirtual() and box_in.isVirtual())
+
+    if bundled and bundle is None:
+        bundle = CanvasBundleLine(box_out, box_in, None)
+        canvas.scene.addItem(bundle)
+        canvas.bundles[key] = bundle
+
+        box_out.addBundleFromGroup(bundle)
+        box_in.addBundleFromGroup(bundle)
+
+        CanvasRaiseItem(bundle)
+
+    elif not bundled and bundle is not None:
+        del canvas.bundles[key]
+
+        box_out.removeBundleFromGroup(bundle)
+        box_in.removeBundleFromGroup(bundle)
+
+        bundle.deleteFromScene()
+
+    else:
+        if bundle is not None:
+            bundle.updateLinePos()
+        return
+
+    for connection_id in list(connection_ids):
+        CanvasUpdateLine(canvas.connections[connection_id], box_out, box_in)
+
+def CanvasAddLine(connection):
+    port_out = canvas.ports[connection.port_out_id]
+    port_in  = canvas.ports[connection.port_in_id]
+
+    if options.use_bezier_lines:
+        line = CanvasBezierLine(port_out, port_in, None)
+    else:
+        line = CanvasLine(port_out, port_in, None)
+
+    canvas.scene.addItem(line)
+    connection.widget = line
+
+    line.getBoxOut().addLineFromGroup(line, connection.connection_id)
+    line.getBoxIn().addLineFromGroup(line, connection.connection_id)
+
+def CanvasRemoveLine(connection):
+    line = connection.widget
+
+    if line is None:
+        return
+
+    connection.widget = None
+    canvas.fade_animation.removeFade(line)
+
+    line.getBoxOut().removeLineFromGroup(connection.connection_id)
+    line.getBoxIn().removeLineFromGroup(connection.connection_id)
+    line.deleteFromScene()
+
+def CanvasGetTextWidth(font, text):
+    key = (font.key(), text)
+    width = canvas.text_widths.get(key)
+
+    if width is None:
+        font_metrics = canvas.theme.font_metrics.get(key[0])
+        width = (font_metrics or QFontMetrics(font)).width(text)
+        canvas.text_widths[key] = width
+
+    return width
+
+def CanvasGetLineColor(port_type, selected):
+    return canvas.theme.line_colors.get((port_type, selected))
+
+def CanvasSetLineGradientColors(gradient, port_type1, port_type2, selected, downwards):
+    color1 = CanvasGetLineColor(port_type1, selected)
+    color2 = CanvasGetLineColor(port_type2, selected)
+
+    if color1 is not None:
+        gradient.setColorAt(0 if downwards else 1, color1)
+    if color2 is not None:
+        gradient.setColorAt(1 if downwards else 0, color2)
+
+# Line pens are shared between lines, the gradient follows each line's bounding rect.
+# Nearly flat lines have no height to spread a relative gradient on, those get their own.
+# No rect for lines known to be taller than LINE_FLAT_HEIGHT
+def CanvasGetLinePen(port_type1, port_type2, downwards, selected, rect=None):
+    if rect is not None and rect.height() < LINE_FLAT_HEIGHT:
+        port_gradient = QLinearGradient(0, rect.top(), 0, rect.bottom())
+        CanvasSetLineGradientColors(port_gradient, port_type1, port_type2, selected, downwards)
+        return QPen(port_gradient, 2)
+
+    key = (port_type1, port_type2, selected, downwards)
+    pen = canvas.line_pens.get(key)
+
+    if pen is None:
+        port_gradient = QLinearGradient(0, 0, 0, 1)
+        port_gradient.setCoordinateMode(QGradient.ObjectBoundingMode)
+        CanvasSetLineGradientColors(port_gradient, port_type1, port_type2, selected, downwards)
+        pen = canvas.line_pens[key] = QPen(port_gradient, 2)
+
+    return pen
+
+# The bounding rect of a line is at least as tall as its ends are apart, skip getting it when enough
+def CanvasGetFlatLineRect(line):
+    if line.m_line_points is not None and abs(line.m_line_points[3] - line.m_line_points[1]) >= LINE_FLAT_HEIGHT:
+        return None
+    return line.boundingRect()
+
+# Zoomed out, connections are drawn by the scene as straight lines, grouped by pen
+def CanvasGetLineBatches():
+    if canvas.line_batches is None:
+        canvas.line_batches = {}
+
+        for connection in canvas.connections.values():
+            line = connection.widget
+
+            if line is None or line.m_line_points is None or not line.isVisible():
+                continue
+
+            key = (line.port_out.port_type, line.isLineSelected())
+            canvas.line_batches.setdefault(key, []).append(QLineF(*line.m_line_points))
+
+    return canvas.line_batches
+
+def CanvasDrawLineBatches(painter):
+    painter.save()
+    painter.setRenderHint(QPainter.Antialiasing, False)
+
+    for (port_type, selected), lines in CanvasGetLineBatches().items():
+        color = CanvasGetLineColor(port_type, selected)
+        painter.setPen(QPen(color, 2) if color is not None else QPen(Qt.black))
+        painter.drawLines(lines)
+
+    painter.restore()
+
+# Icons are shared by all boxes, kept for the whole process
+def CanvasGetIconRenderer(icon_path):
+    renderer = canvas.icon_renderers.get(icon_path)
+
+    if renderer is None:
+        renderer = canvas.icon_renderers[icon_path] = QSvgRenderer(icon_path, canvas.qobject)
+
+    return renderer
+
+def CanvasGetIconPixmap(icon_path, size, color, pixel_ratio):
+    key = (icon_path, size.width(), size.height(), color.rgba(), pixel_ratio)
+    pixmap = canvas.icon_pixmaps.get(key)
+
+    if pixmap is not None:
+        return pixmap
+
+    width  = int(ceil(size.width() * pixel_ratio))
+    height = int(ceil(size.height() * pixel_ratio))
+
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing, False)
+    painter.setRenderHint(QPainter.TextAntialiasing, False)
+    CanvasGetIconRenderer(icon_path).render(painter, QRectF(0, 0, width, height))
+    painter.end()
+
+    # Tint the same way as QGraphicsColorizeEffect: grayscale, screen with color, keep the icon alpha.
+    # Grayscale8 has no alpha, it's put back before and after the screen.
+    tinted = image.convertToFormat(QImage.Format_ARGB32).convertToFormat(QImage.Format_Grayscale8)
+    tinted = tinted.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+    painter = QPainter(tinted)
+    painter.setCompositionMode(QPainter.CompositionMode_DestinationIn)
+    painter.drawImage(0, 0, image)
+    painter.setCompositionMode(QPainter.CompositionMode_Screen)
+    painter.fillRect(tinted.rect(), color)
+    painter.setCompositionMode(QPainter.CompositionMode_DestinationIn)
+    painter.drawImage(0, 0, image)
+    painter.end()
+
+    pixmap = QPixmap.fromImage(tinted)
+    pixmap.setDevicePixelRatio(pixel_ratio)
+
+    canvas.icon_pixmaps[key] = pixmap
+    return pixmap
+
+# Only clients of a RaySession have apps to go to
+def CanvasIsRayClient(group_name):
+    if not features.group_go_to_app:
+        return False
+
+    snapshot = GroupPropertiesHelper.instance().snapshot
+    return snapshot.lookup(group_name)[0] in snapshot.clients
+
+def CanvasGetSavedGroupPos(key, horizontal=False):
+    # Only look for a free spot if there's no saved position
+    if canvas.settings.contains(key):
+        return canvas.settings.value(key, type=QPointF)
+
+    return CanvasGetNewGroupPos(horizontal)
+
 def CanvasGetFullPortName(port_id):
     if canvas.debug:
         qDebug("PatchCanvas::CanvasGetFullPortName(%i)" % port_id)
 
-    for port in canvas.port_list:
-        if port.port_id == port_id:
-            group_id = port.group_id
-            for group in canvas.group_list:
-                if group.group_id == group_id:
-                    return group.group_name + ":" + port.port_name
-            break
+    port = canvas.ports.get(port_id)
+
+    if port:
+        group = canvas.groups.get(port.group_id)
+        if group:
+            return group.group_name + ":" + port.port_name
 
     qCritical("PatchCanvas::CanvasGetFullPortName(%i) - unable to find port" % port_id)
     return ""
@@ -1025,38 +1883,23 @@ def CanvasGetPortConnectionList(port_id):
     if canvas.debug:
         qDebug("PatchCanvas::CanvasGetPortConnectionList(%i)" % port_id)
 
-    port_con_list = []
-
-    for connection in canvas.connection_list:
-        if connection.port_out_id == port_id or connection.port_in_id == port_id:
-            port_con_list.append(connection.connection_id)
-
-    return port_con_list
+    return sorted(canvas.port_connections.get(port_id, ()))
 
 def CanvasGetConnectedPort(connection_id, port_id):
     if canvas.debug:
         qDebug("PatchCanvas::CanvasGetConnectedPort(%i, %i)" % (connection_id, port_id))
 
-    for connection in canvas.connection_list:
-        if connection.connection_id == connection_id:
-            if connection.port_out_id == port_id:
-                return connection.port_in_id
-            else:
-                return connection.port_out_id
+    connection = canvas.connections.get(connection_id)
+
+    if connection:
+        if connection.port_out_id == port_id:
+            return connection.port_in_id
+        else:
+            return connection.port_out_id
 
     qCritical("PatchCanvas::CanvasGetConnectedPort(%i, %i) - unable to find connection" % (connection_id, port_id))
     return 0
 
-def CanvasRemoveAnimation(f_animation):
-    if canvas.debug:
-        qDebug("PatchCanvas::CanvasRemoveAnimation(%s)" % f_animation)
-
-    for animation in canvas.animation_list:
-        if animation.animation == f_animation:
-            canvas.animation_list.remove(animation)
-            del animation.animation
-            break
-
 def CanvasCallback(action, value1, value2, value_str):
     if canvas.debug:
         qDebug("PatchCanvas::CanvasCallback(%i, %i, %i, %s)" % (action, value1, value2, value_str.encode()))
@@ -1067,31 +1910,36 @@ def CanvasItemFX(item, show, destroy=False):
     if canvas.debug:
         qDebug("PatchCanvas::CanvasItemFX(%s, %s, %s)" % (item, bool2str(show), bool2str(destroy)))
 
-    # Check if item already has an animationItemFX
-    for animation in canvas.animation_list:
-        if animation.item == item:
-            animation.animation.stop()
-            canvas.animation_list.remove(animation)
-            del animation.animation
-            break
+    # Drop any fade the item already has
+    canvas.fade_animation.removeFade(item)
 
-    animation = CanvasFadeAnimation(item, show)
-    animation.setDuration(750 if show else 500)
+    if canvas.batch_level > 0:
+        canvas.batch_fades.pop(item, None)
 
-    animation_dict = animation_dict_t()
-    animation_dict.animation = animation
-    animation_dict.item = item
-    canvas.animation_list.append(animation_dict)
+        if show:
+            canvas.batch_fades[item] = None
+        elif not destroy:
+            item.hide()
+        elif item.type() in (CanvasLineType, CanvasBezierLineType):
+            item.deleteFromScene()
+        else:
+            CanvasRemoveItemFX(item)
+        return
 
-    if show:
-        animation.finished.connect(canvas.qobject.AnimationIdle)
-    else:
+    canvas.fade_animation.addFade(item, show, destroy)
+
+def CanvasFinishFade(item, show, destroy):
+    value = 1.0 if show else 0.0
+    item.setOpacity(value)
+
+    if item.type() == CanvasBoxType:
+        item.setShadowOpacity(value)
+
+    if not show:
         if destroy:
-            animation.finished.connect(canvas.qobject.AnimationDestroy)
+            CanvasRemoveItemFX(item)
         else:
-            animation.finished.connect(canvas.qobject.AnimationHide)
-
-    animation.start()
+            item.hide()
 
 def CanvasRemoveItemFX(item):
     if canvas.debug:
@@ -1105,12 +1953,31 @@ def CanvasRemoveItemFX(item):
         canvas.scene.removeItem(item)
 
     elif item.type() in (CanvasLineType, CanvasBezierLineType):
-        pass #item.deleteFromScene()
+        item.deleteFromScene()
 
     # Force deletion of item if needed
     if item.type() in (CanvasBoxType, CanvasPortType):
         del item
 
+# ------------------------------------------------------------------------------
+# Auto-arrange, the layout is computed outside the GUI thread on a snapshot
+
+class CanvasArrangeThread(QThread):
+    def __init__(self, boxes, edges, previous, allow_full, parent=None):
+        QThread.__init__(self, parent)
+
+        self.m_boxes = boxes
+        self.m_edges = edges
+        self.m_previous = previous
+        self.m_allow_full = allow_full
+        self.m_result = None
+
+    def result(self):
+        return self.m_result
+
+    def run(self):
+        self.m_result = arrangeGraph(self.m_boxes, self.m_edges, self.m_previous, self.m_allow_full)
+
 # ------------------------------------------------------------------------------
 # patchscene.cpp
 
@@ -1131,6 +1998,13 @@ class PatchScene(QGraphicsScene):
         if not self.m_view:
             qFatal("PatchCanvas::PatchScene() - invalid view")
 
+        # Virtual boxes follow the visible area
+        for scrollbar in (self.m_view.horizontalScrollBar(), self.m_view.verticalScrollBar()):
+            scrollbar.valueChanged.connect(CanvasScheduleVirtualize)
+            scrollbar.rangeChanged.connect(CanvasScheduleVirtualize)
+
+        self.scaleChanged.connect(CanvasScheduleVirtualize)
+
     def addRubberBand(self):
         self.m_rubberband = self.addRect(QRectF(0, 0, 0, 0))
         self.m_rubberband.setZValue(-1)
@@ -1144,6 +2018,12 @@ class PatchScene(QGraphicsScene):
         # Re-add rubberband, that just got deleted
         self.addRubberBand()
 
+    def drawBackground(self, painter, rect):
+        QGraphicsScene.drawBackground(self, painter, rect)
+
+        if QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < options.lod_simple:
+            CanvasDrawLineBatches(painter)
+
     def fixScaleFactor(self):
         scale = self.m_view.transform().m11()
         if scale > 3.0:
@@ -1163,39 +2043,35 @@ class PatchScene(QGraphicsScene):
         min_x = min_y = max_x = max_y = None
         first_value = True
 
-        items_list = self.items()
-
-        if len(items_list) > 0:
-            for item in items_list:
-                if item and item.isVisible() and item.type() == CanvasBoxType:
-                    pos = item.scenePos()
-                    rect = item.boundingRect()
+        CanvasProcessLayouts()
 
-                    if first_value:
-                        min_x = pos.x()
-                    elif pos.x() < min_x:
-                        min_x = pos.x()
+        for item, rect in canvas.box_index.boxes():
+            if item.isVisible():
+                if first_value:
+                    min_x = rect.left()
+                elif rect.left() < min_x:
+                    min_x = rect.left()
 
-                    if first_value:
-                        min_y = pos.y()
-                    elif pos.y() < min_y:
-                        min_y = pos.y()
+                if first_value:
+                    min_y = rect.top()
+                elif rect.top() < min_y:
+                    min_y = rect.top()
 
-                    if first_value:
-                        max_x = pos.x() + rect.width()
-                    elif pos.x() + rect.width() > max_x:
-                        max_x = pos.x() + rect.width()
+                if first_value:
+                    max_x = rect.right()
+                elif rect.right() > max_x:
+                    max_x = rect.right()
 
-                    if first_value:
-                        max_y = pos.y() + rect.height()
-                    elif pos.y() + rect.height() > max_y:
-                        max_y = pos.y() + rect.height()
+                if first_value:
+                    max_y = rect.bottom()
+                elif rect.bottom() > max_y:
+                    max_y = rect.bottom()
 
-                    first_value = False
+                first_value = False
 
-            if not first_value:
-                self.m_view.fitInView(min_x, min_y, abs(max_x - min_x), abs(max_y - min_y), Qt.KeepAspectRatio)
-                self.fixScaleFactor()
+        if not first_value:
+            self.m_view.fitInView(min_x, min_y, abs(max_x - min_x), abs(max_y - min_y), Qt.KeepAspectRatio)
+            self.fixScaleFactor()
 
     def zoom_in(self):
         if self.m_view.transform().m11() < 3.0:
@@ -1275,20 +2151,18 @@ class PatchScene(QGraphicsScene):
 
     def mouseReleaseEvent(self, event):
         if self.m_rubberband_selection:
-            items_list = self.items()
-            if len(items_list) > 0:
-                for item in items_list:
-                    if item and item.isVisible() and item.type() == CanvasBoxType:
-                        item_rect = item.sceneBoundingRect()
-                        item_top_left = QPointF(item_rect.x(), item_rect.y())
-                        item_bottom_right = QPointF(item_rect.x() + item_rect.width(), item_rect.y() + item_rect.height())
+            for item in canvas.box_index.boxesIn(self.m_rubberband.rect()):
+                if item.isVisible():
+                    item_rect = item.sceneBoundingRect()
+                    item_top_left = QPointF(item_rect.x(), item_rect.y())
+                    item_bottom_right = QPointF(item_rect.x() + item_rect.width(), item_rect.y() + item_rect.height())
 
-                        if self.m_rubberband.contains(item_top_left) and self.m_rubberband.contains(item_bottom_right):
-                            item.setSelected(True)
+                    if self.m_rubberband.contains(item_top_left) and self.m_rubberband.contains(item_bottom_right):
+                        item.setSelected(True)
 
-                self.m_rubberband.hide()
-                self.m_rubberband.setRect(0, 0, 0, 0)
-                self.m_rubberband_selection = False
+            self.m_rubberband.hide()
+            self.m_rubberband.setRect(0, 0, 0, 0)
+            self.m_rubberband_selection = False
 
         else:
             items_list = self.selectedItems()
@@ -1320,67 +2194,105 @@ class PatchScene(QGraphicsScene):
 # ------------------------------------------------------------------------------
 # canvasfadeanimation.cpp
 
+# A single animation steps all running fades, once per animation frame
 class CanvasFadeAnimation(QAbstractAnimation):
-    def __init__(self, item, show, parent=None):
+    def __init__(self, parent=None):
         QAbstractAnimation.__init__(self, parent)
 
-        self.m_show = show
-        self.m_duration = 0
-        self.m_item = item
+        self.m_fades = {}
 
-    def item(self):
-        return self.m_item
+    def fadeCount(self):
+        return len(self.m_fades)
 
-    def setDuration(self, time):
-        if self.m_item.opacity() == 0 and not self.m_show:
-            self._duration = 0
-        else:
-            self.m_item.show()
-            self.m_duration = time
+    def addFade(self, item, show, destroy):
+        self.m_fades.pop(item, None)
+
+        if show:
+            item.show()
+
+        # Nothing to fade, or too many fades at once
+        if (not show and item.opacity() == 0) or len(self.m_fades) >= FADE_MAX_ACTIVE:
+            CanvasFinishFade(item, show, destroy)
+            return
+
+        running = bool(self.state() == QAbstractAnimation.Running)
+
+        fade = fade_state_t()
+        fade.show = show
+        fade.destroy = destroy
+        fade.start_time = self.currentTime() if running else 0
+        fade.duration = 750 if show else 500
+        self.m_fades[item] = fade
+
+        if not running:
+            self.start()
+
+    def removeFade(self, item):
+        self.m_fades.pop(item, None)
+
+    def clear(self):
+        self.m_fades = {}
+        self.stop()
 
     def duration(self):
-        return self.m_duration
+        return -1
 
     def updateCurrentTime(self, time):
-        if self.m_duration == 0:
-            return
+        finished = []
 
-        if self.m_show:
-            value = float(time) / self.m_duration
-        else:
-            value = 1.0 - (float(time) / self.m_duration)
+        for item, fade in self.m_fades.items():
+            value = float(time - fade.start_time) / fade.duration
+
+            if value >= 1.0:
+                finished.append((item, fade))
+                continue
 
-        self.m_item.setOpacity(value)
+            if not fade.show:
+                value = 1.0 - value
 
-        if self.m_item.type() == CanvasBoxType:
-            self.m_item.setShadowOpacity(value)
+            item.setOpacity(value)
 
-    def updateDirection(self, direction):
-        pass
+            if item.type() == CanvasBoxType:
+                item.setShadowOpacity(value)
 
-    def updateState(self, oldState, newState):
-        pass
+        for item, fade in finished:
+            del self.m_fades[item]
+            CanvasFinishFade(item, fade.show, fade.destroy)
+
+        if len(self.m_fades) == 0:
+            self.stop()
 
 # ------------------------------------------------------------------------------
 # canvasline.cpp
 
 class CanvasLine(QGraphicsLineItem):
-    def __init__(self, item1, item2, parent):
+    def __init__(self, port_out, port_in, parent):
         QGraphicsLineItem.__init__(self, parent)
 
-        self.item1 = item1
-        self.item2 = item2
+        # Lines follow the boxes, port items might not exist
+        self.port_out = port_out
+        self.port_in  = port_in
+        self.box_out  = CanvasGetPortBox(port_out)
+        self.box_in   = CanvasGetPortBox(port_in)
 
         self.m_locked = False
         self.m_lineSelected = False
+        self.m_line_points = None
 
         self.setGraphicsEffect(None)
         self.updateLinePos()
 
     def deleteFromScene(self):
         canvas.scene.removeItem(self)
+        canvas.line_batches = None
         del self
 
+    def getBoxOut(self):
+        return self.box_out
+
+    def getBoxIn(self):
+        return self.box_in
+
     def isLocked(self):
         return self.m_locked
 
@@ -1396,172 +2308,333 @@ class CanvasLine(QGraphicsLineItem):
 
         if options.eyecandy == EYECANDY_FULL:
             if yesno:
-                self.setGraphicsEffect(CanvasPortGlow(self.item1.getPortType(), self.toGraphicsObject()))
+                self.setGraphicsEffect(CanvasPortGlow(self.port_out.port_type, self.toGraphicsObject()))
             else:
                 self.setGraphicsEffect(None)
 
         self.m_lineSelected = yesno
         self.updateLineGradient()
 
+        canvas.line_batches = None
+
     def updateLinePos(self):
-        if self.item1.getPortMode() == PORT_MODE_OUTPUT:
-            line = QLineF(self.item1.scenePos().x() + self.item1.getPortWidth() + 12,
-                          self.item1.scenePos().y() + float(canvas.theme.port_height)/2,
-                          self.item2.scenePos().x(),
-                          self.item2.scenePos().y() + float(canvas.theme.port_height)/2)
-            self.setLine(line)
-
-            self.m_lineSelected = False
-            self.updateLineGradient()
+        if canvas.batch_level > 0:
+            canvas.batch_lines.add(self)
+            return
+
+        item1_x, item1_y = self.box_out.getPortAnchor(self.port_out)
+        item2_x, item2_y = self.box_in.getPortAnchor(self.port_in)
+
+        # Nothing to do if neither port moved
+        line_points = (item1_x, item1_y, item2_x, item2_y)
+        if line_points == self.m_line_points:
+            return
+
+        self.m_line_points = line_points
+        canvas.line_batches = None
+        self.setLine(QLineF(item1_x, item1_y, item2_x, item2_y))
+
+        self.m_lineSelected = False
+        self.updateLineGradient()
+
+    def type(self):
+        return CanvasLineType
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemVisibleHasChanged:
+            canvas.line_batches = None
+
+        return QGraphicsLineItem.itemChange(self, change, value)
+
+    def updateLineGradient(self):
+        downwards = self.m_line_points is None or self.m_line_points[3] >= self.m_line_points[1]
+        self.setPen(CanvasGetLinePen(self.port_out.port_type, self.port_in.port_type, downwards, self.m_lineSelected, CanvasGetFlatLineRect(self)))
+
+    def paint(self, painter, option, widget):
+        # Drawn by the scene in line batches
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < options.lod_simple:
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing))
+        QGraphicsLineItem.paint(self, painter, option, widget)
+        painter.restore()
+
+# ------------------------------------------------------------------------------
+# canvasbezierline.cpp
+
+class CanvasBezierLine(QGraphicsPathItem):
+    def __init__(self, port_out, port_in, parent):
+        QGraphicsPathItem.__init__(self, parent)
+
+        # Lines follow the boxes, port items might not exist
+        self.port_out = port_out
+        self.port_in  = port_in
+        self.box_out  = CanvasGetPortBox(port_out)
+        self.box_in   = CanvasGetPortBox(port_in)
+
+        self.m_locked = False
+        self.m_lineSelected = False
+        self.m_line_points = None
+
+        self.setBrush(QColor(0, 0, 0, 0))
+        self.setGraphicsEffect(None)
+        self.updateLinePos()
+
+    def deleteFromScene(self):
+        canvas.scene.removeItem(self)
+        canvas.line_batches = None
+        del self
+
+    def getBoxOut(self):
+        return self.box_out
+
+    def getBoxIn(self):
+        return self.box_in
+
+    def isLocked(self):
+        return self.m_locked
+
+    def setLocked(self, yesno):
+        self.m_locked = yesno
+
+    def isLineSelected(self):
+        return self.m_lineSelected
+
+    def setLineSelected(self, yesno):
+        if self.m_locked:
+            return
+
+        if options.eyecandy == EYECANDY_FULL:
+            if yesno:
+                self.setGraphicsEffect(CanvasPortGlow(self.port_out.port_type, self.toGraphicsObject()))
+            else:
+                self.setGraphicsEffect(None)
+
+        self.m_lineSelected = yesno
+        self.updateLineGradient()
+
+        canvas.line_batches = None
+
+    def updateLinePos(self):
+        if canvas.batch_level > 0:
+            canvas.batch_lines.add(self)
+            return
+
+        item1_x, item1_y = self.box_out.getPortAnchor(self.port_out)
+        item2_x, item2_y = self.box_in.getPortAnchor(self.port_in)
+
+        # Nothing to do if neither port moved
+        line_points = (item1_x, item1_y, item2_x, item2_y)
+        if line_points == self.m_line_points:
+            return
+
+        self.m_line_points = line_points
+        canvas.line_batches = None
+
+        item1_mid_x = abs(item1_x - item2_x) / 2
+        item1_new_x = item1_x + item1_mid_x
+
+        item2_mid_x = abs(item1_x - item2_x) / 2
+        item2_new_x = item2_x - item2_mid_x
+
+        path = QPainterPath(QPointF(item1_x, item1_y))
+        path.cubicTo(item1_new_x, item1_y, item2_new_x, item2_y, item2_x, item2_y)
+        self.setPath(path)
+
+        self.m_lineSelected = False
+        self.updateLineGradient()
+
+    def type(self):
+        return CanvasBezierLineType
 
-    def type(self):
-        return CanvasLineType
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemVisibleHasChanged:
+            canvas.line_batches = None
+
+        return QGraphicsPathItem.itemChange(self, change, value)
 
     def updateLineGradient(self):
-        pos_top = self.boundingRect().top()
-        pos_bot = self.boundingRect().bottom()
-        if self.item2.scenePos().y() >= self.item1.scenePos().y():
-            pos1 = 0
-            pos2 = 1
-        else:
-            pos1 = 1
-            pos2 = 0
-
-        port_type1 = self.item1.getPortType()
-        port_type2 = self.item2.getPortType()
-        port_gradient = QLinearGradient(0, pos_top, 0, pos_bot)
-
-        if port_type1 == PORT_TYPE_AUDIO_JACK:
-            port_gradient.setColorAt(pos1, canvas.theme.line_audio_jack_sel if self.m_lineSelected else canvas.theme.line_audio_jack)
-        elif port_type1 == PORT_TYPE_MIDI_JACK:
-            port_gradient.setColorAt(pos1, canvas.theme.line_midi_jack_sel if self.m_lineSelected else canvas.theme.line_midi_jack)
-        elif port_type1 == PORT_TYPE_MIDI_A2J:
-            port_gradient.setColorAt(pos1, canvas.theme.line_midi_a2j_sel if self.m_lineSelected else canvas.theme.line_midi_a2j)
-        elif port_type1 == PORT_TYPE_MIDI_ALSA:
-            port_gradient.setColorAt(pos1, canvas.theme.line_midi_alsa_sel if self.m_lineSelected else canvas.theme.line_midi_alsa)
-
-        if port_type2 == PORT_TYPE_AUDIO_JACK:
-            port_gradient.setColorAt(pos2, canvas.theme.line_audio_jack_sel if self.m_lineSelected else canvas.theme.line_audio_jack)
-        elif port_type2 == PORT_TYPE_MIDI_JACK:
-            port_gradient.setColorAt(pos2, canvas.theme.line_midi_jack_sel if self.m_lineSelected else canvas.theme.line_midi_jack)
-        elif port_type2 == PORT_TYPE_MIDI_A2J:
-            port_gradient.setColorAt(pos2, canvas.theme.line_midi_a2j_sel if self.m_lineSelected else canvas.theme.line_midi_a2j)
-        elif port_type2 == PORT_TYPE_MIDI_ALSA:
-            port_gradient.setColorAt(pos2, canvas.theme.line_midi_alsa_sel if self.m_lineSelected else canvas.theme.line_midi_alsa)
-
-        self.setPen(QPen(port_gradient, 2))
+        downwards = self.m_line_points is None or self.m_line_points[3] >= self.m_line_points[1]
+        self.setPen(CanvasGetLinePen(self.port_out.port_type, self.port_in.port_type, downwards, self.m_lineSelected, CanvasGetFlatLineRect(self)))
 
     def paint(self, painter, option, widget):
+        # Drawn by the scene in line batches
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < options.lod_simple:
+            return
+
         painter.save()
         painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing))
-        QGraphicsLineItem.paint(self, painter, option, widget)
+        QGraphicsPathItem.paint(self, painter, option, widget)
         painter.restore()
 
 # ------------------------------------------------------------------------------
-# canvasbezierline.cpp
+# canvasbundleline.cpp
 
-class CanvasBezierLine(QGraphicsPathItem):
-    def __init__(self, item1, item2, parent):
+class CanvasBundleLine(QGraphicsPathItem):
+    def __init__(self, box_out, box_in, parent):
         QGraphicsPathItem.__init__(self, parent)
 
-        self.item1 = item1
-        self.item2 = item2
+        self.box_out = box_out
+        self.box_in  = box_in
 
-        self.m_locked = False
-        self.m_lineSelected = False
+        self.m_hovered  = False
+        self.m_expanded = False
+        self.m_line_state = None
+        self.m_port_type  = PORT_TYPE_NULL
+        self.m_count_text = ""
+        self.m_count_rect = QRectF()
+
+        self.m_font = canvas.theme.port_font
 
         self.setBrush(QColor(0, 0, 0, 0))
-        self.setGraphicsEffect(None)
+        self.setFlags(QGraphicsItem.ItemIsSelectable)
+        self.setAcceptHoverEvents(True)
         self.updateLinePos()
 
     def deleteFromScene(self):
         canvas.scene.removeItem(self)
         del self
 
-    def isLocked(self):
-        return self.m_locked
+    def getBoxOut(self):
+        return self.box_out
 
-    def setLocked(self, yesno):
-        self.m_locked = yesno
+    def getBoxIn(self):
+        return self.box_in
 
-    def isLineSelected(self):
-        return self.m_lineSelected
+    def getConnectionIds(self):
+        return canvas.bundle_connections.get((self.box_out, self.box_in), ())
 
-    def setLineSelected(self, yesno):
-        if self.m_locked:
+    def isExpanded(self):
+        return self.m_expanded
+
+    # Single lines are shown while hovering or selecting the bundle, or one of its boxes
+    def updateExpanded(self):
+        expanded = self.m_hovered or self.isSelected() or self.box_out.isSelected() or self.box_in.isSelected()
+
+        if expanded == self.m_expanded:
             return
 
-        if options.eyecandy == EYECANDY_FULL:
-            if yesno:
-                self.setGraphicsEffect(CanvasPortGlow(self.item1.getPortType(), self.toGraphicsObject()))
-            else:
-                self.setGraphicsEffect(None)
+        self.m_expanded = expanded
 
-        self.m_lineSelected = yesno
-        self.updateLineGradient()
+        for connection_id in list(self.getConnectionIds()):
+            CanvasUpdateLine(canvas.connections[connection_id], self.box_out, self.box_in)
+
+        self.update()
 
     def updateLinePos(self):
-        if self.item1.getPortMode() == PORT_MODE_OUTPUT:
-            item1_x = self.item1.scenePos().x() + self.item1.getPortWidth() + 12
-            item1_y = self.item1.scenePos().y() + float(canvas.theme.port_height)/2
+        if canvas.batch_level > 0:
+            canvas.batch_lines.add(self)
+            return
 
-            item2_x = self.item2.scenePos().x()
-            item2_y = self.item2.scenePos().y() + float(canvas.theme.port_height)/2
+        connection_ids = self.getConnectionIds()
 
-            item1_mid_x = abs(item1_x - item2_x) / 2
-            item1_new_x = item1_x + item1_mid_x
+        if not connection_ids:
+            return
 
-            item2_mid_x = abs(item1_x - item2_x) / 2
-            item2_new_x = item2_x - item2_mid_x
+        # From the middle of all output ports to the middle of all input ports
+        item1_x = item2_x = 0.0
+        item1_y = item2_y = 0.0
+        port_type = None
 
-            path = QPainterPath(QPointF(item1_x, item1_y))
-            path.cubicTo(item1_new_x, item1_y, item2_new_x, item2_y, item2_x, item2_y)
-            self.setPath(path)
+        for connection_id in connection_ids:
+            connection = canvas.connections[connection_id]
+            port_out = canvas.ports[connection.port_out_id]
 
-            self.m_lineSelected = False
-            self.updateLineGradient()
+            item1_x, port_y = self.box_out.getPortAnchor(port_out)
+            item1_y += port_y
+
+            item2_x, port_y = self.box_in.getPortAnchor(canvas.ports[connection.port_in_id])
+            item2_y += port_y
+
+            if port_type is None or port_out.port_type < port_type:
+                port_type = port_out.port_type
+
+        count = len(connection_ids)
+        item1_y /= count
+        item2_y /= count
+
+        # Nothing to do if neither the ends nor the channel count changed
+        line_state = (item1_x, item1_y, item2_x, item2_y, count, port_type)
+        if line_state == self.m_line_state:
+            return
+
+        self.m_line_state = line_state
+        self.m_port_type  = port_type
+
+        path = QPainterPath(QPointF(item1_x, item1_y))
+
+        if options.use_bezier_lines:
+            item_mid_x = abs(item1_x - item2_x) / 2
+            path.cubicTo(item1_x + item_mid_x, item1_y, item2_x - item_mid_x, item2_y, item2_x, item2_y)
+        else:
+            path.lineTo(item2_x, item2_y)
+
+        self.prepareGeometryChange()
+
+        self.m_count_text = str(count)
+        text_width  = CanvasGetTextWidth(self.m_font, self.m_count_text) + 6
+        text_height = canvas.theme.port_height
+        text_center = path.pointAtPercent(0.5)
+        self.m_count_rect = QRectF(text_center.x() - text_width/2, text_center.y() - text_height/2, text_width, text_height)
+
+        self.setPath(path)
+        self.updateLineGradient()
 
     def type(self):
-        return CanvasBezierLineType
+        return CanvasBundleLineType
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemSelectedHasChanged:
+            self.updateLineGradient()
+            self.updateExpanded()
+
+        return QGraphicsPathItem.itemChange(self, change, value)
+
+    def hoverEnterEvent(self, event):
+        self.m_hovered = True
+        self.updateExpanded()
+        QGraphicsPathItem.hoverEnterEvent(self, event)
+
+    def hoverLeaveEvent(self, event):
+        self.m_hovered = False
+        self.updateExpanded()
+        QGraphicsPathItem.hoverLeaveEvent(self, event)
 
     def updateLineGradient(self):
-        pos_top = self.boundingRect().top()
-        pos_bot = self.boundingRect().bottom()
-        if self.item2.scenePos().y() >= self.item1.scenePos().y():
-            pos1 = 0
-            pos2 = 1
-        else:
-            pos1 = 1
-            pos2 = 0
-
-        port_type1 = self.item1.getPortType()
-        port_type2 = self.item2.getPortType()
-        port_gradient = QLinearGradient(0, pos_top, 0, pos_bot)
-
-        if port_type1 == PORT_TYPE_AUDIO_JACK:
-            port_gradient.setColorAt(pos1, canvas.theme.line_audio_jack_sel if self.m_lineSelected else canvas.theme.line_audio_jack)
-        elif port_type1 == PORT_TYPE_MIDI_JACK:
-            port_gradient.setColorAt(pos1, canvas.theme.line_midi_jack_sel if self.m_lineSelected else canvas.theme.line_midi_jack)
-        elif port_type1 == PORT_TYPE_MIDI_A2J:
-            port_gradient.setColorAt(pos1, canvas.theme.line_midi_a2j_sel if self.m_lineSelected else canvas.theme.line_midi_a2j)
-        elif port_type1 == PORT_TYPE_MIDI_ALSA:
-            port_gradient.setColorAt(pos1, canvas.theme.line_midi_alsa_sel if self.m_lineSelected else canvas.theme.line_midi_alsa)
-
-        if port_type2 == PORT_TYPE_AUDIO_JACK:
-            port_gradient.setColorAt(pos2, canvas.theme.line_audio_jack_sel if self.m_lineSelected else canvas.theme.line_audio_jack)
-        elif port_type2 == PORT_TYPE_MIDI_JACK:
-            port_gradient.setColorAt(pos2, canvas.theme.line_midi_jack_sel if self.m_lineSelected else canvas.theme.line_midi_jack)
-        elif port_type2 == PORT_TYPE_MIDI_A2J:
-            port_gradient.setColorAt(pos2, canvas.theme.line_midi_a2j_sel if self.m_lineSelected else canvas.theme.line_midi_a2j)
-        elif port_type2 == PORT_TYPE_MIDI_ALSA:
-            port_gradient.setColorAt(pos2, canvas.theme.line_midi_alsa_sel if self.m_lineSelected else canvas.theme.line_midi_alsa)
-
-        self.setPen(QPen(port_gradient, 2))
+        width = min(len(self.getConnectionIds()) + 1, BUNDLE_LINE_WIDTH_MAX)
+        color = CanvasGetLineColor(self.m_port_type, self.isSelected())
+        self.setPen(QPen(color if color is not None else Qt.black, width, Qt.SolidLine, Qt.RoundCap))
+
+    def boundingRect(self):
+        return QGraphicsPathItem.boundingRect(self).united(self.m_count_rect)
+
+    def shape(self):
+        path = QGraphicsPathItem.shape(self)
+        path.addRect(self.m_count_rect)
+        return path
 
     def paint(self, painter, option, widget):
         painter.save()
         painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing))
-        QGraphicsPathItem.paint(self, painter, option, widget)
+
+        # Faded out below its single lines
+        if self.m_expanded:
+            painter.setOpacity(0.25)
+
+        painter.setPen(self.pen())
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(self.path())
+
+        if not self.m_expanded and option.levelOfDetailFromTransform(painter.worldTransform()) >= options.lod_text:
+            painter.setPen(canvas.theme.box_pen)
+            painter.setBrush(canvas.theme.box_bg_1)
+            painter.drawRect(self.m_count_rect)
+
+            painter.setFont(self.m_font)
+            painter.setPen(canvas.theme.port_text)
+            painter.drawText(self.m_count_rect, Qt.AlignCenter, self.m_count_text)
+
         painter.restore()
 
 # ------------------------------------------------------------------------------
@@ -1579,14 +2652,10 @@ class CanvasLineMov(QGraphicsLineItem):
         self.p_lineY = self.scenePos().y()
         self.p_width = self.parentItem().getPortWidth()
 
-        if port_type == PORT_TYPE_AUDIO_JACK:
-            pen = QPen(canvas.theme.line_audio_jack, 2)
-        elif port_type == PORT_TYPE_MIDI_JACK:
-            pen = QPen(canvas.theme.line_midi_jack, 2)
-        elif port_type == PORT_TYPE_MIDI_A2J:
-            pen = QPen(canvas.theme.line_midi_a2j, 2)
-        elif port_type == PORT_TYPE_MIDI_ALSA:
-            pen = QPen(canvas.theme.line_midi_alsa, 2)
+        color = CanvasGetLineColor(port_type, False)
+
+        if color is not None:
+            pen = QPen(color, 2)
         else:
             qWarning("PatchCanvas::CanvasLineMov(%s, %s, %s) - invalid port type" % (port_mode2str(port_mode), port_type2str(port_type), parent))
             pen = QPen(Qt.black)
@@ -1636,14 +2705,10 @@ class CanvasBezierLineMov(QGraphicsPathItem):
         self.p_itemY = self.scenePos().y()
         self.p_width = self.parentItem().getPortWidth()
 
-        if port_type == PORT_TYPE_AUDIO_JACK:
-            pen = QPen(canvas.theme.line_audio_jack, 2)
-        elif port_type == PORT_TYPE_MIDI_JACK:
-            pen = QPen(canvas.theme.line_midi_jack, 2)
-        elif port_type == PORT_TYPE_MIDI_A2J:
-            pen = QPen(canvas.theme.line_midi_a2j, 2)
-        elif port_type == PORT_TYPE_MIDI_ALSA:
-            pen = QPen(canvas.theme.line_midi_alsa, 2)
+        color = CanvasGetLineColor(port_type, False)
+
+        if color is not None:
+            pen = QPen(color, 2)
         else:
             qWarning("PatchCanvas::CanvasBezierLineMov(%s, %s, %s) - invalid port type" % (port_mode2str(port_mode), port_type2str(port_type), parent))
             pen = QPen(Qt.black)
@@ -1701,10 +2766,12 @@ class CanvasPort(QGraphicsItem):
         # Base Variables
         self.m_port_width  = 15
         self.m_port_height = canvas.theme.port_height
-        self.m_port_font = QFont(canvas.theme.port_font_name, canvas.theme.port_font_size, canvas.theme.port_font_state)
+        self.m_port_font = canvas.theme.port_font
+        self.m_port_polygon = None
 
         self.m_line_mov = None
         self.m_hover_item = None
+        self.m_hover_index = None
         self.m_last_selected_state = False
 
         self.m_mouse_down = False
@@ -1712,6 +2779,9 @@ class CanvasPort(QGraphicsItem):
 
         self.setFlags(QGraphicsItem.ItemIsSelectable)
 
+        if options.use_item_cache:
+            self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
     def getPortId(self):
         return self.m_port_id
 
@@ -1735,6 +2805,7 @@ class CanvasPort(QGraphicsItem):
 
     def setPortMode(self, port_mode):
         self.m_port_mode = port_mode
+        self.m_port_polygon = None
         self.update()
 
     def setPortType(self, port_type):
@@ -1742,22 +2813,102 @@ class CanvasPort(QGraphicsItem):
         self.update()
 
     def setPortName(self, port_name):
-        if QFontMetrics(self.m_port_font).width(port_name) < QFontMetrics(self.m_port_font).width(self.m_port_name):
-            QTimer.singleShot(0, canvas.scene.update)
+        if CanvasGetTextWidth(self.m_port_font, port_name) < CanvasGetTextWidth(self.m_port_font, self.m_port_name):
+            CanvasRequestUpdate(self.sceneBoundingRect())
 
         self.m_port_name = port_name
         self.update()
 
     def setPortWidth(self, port_width):
+        if port_width == self.m_port_width:
+            return
+
         if port_width < self.m_port_width:
-            QTimer.singleShot(0, canvas.scene.update)
+            CanvasRequestUpdate(self.sceneBoundingRect())
 
+        # The scene index needs to know about the new bounding rect
+        self.prepareGeometryChange()
         self.m_port_width = port_width
+        self.m_port_polygon = None
         self.update()
 
+    # Only depends on the port mode and width, built again when either changes
+    def getPortPolygon(self):
+        if self.m_port_polygon is not None:
+            return self.m_port_polygon
+
+        if self.m_port_mode == PORT_MODE_INPUT:
+            if canvas.theme.port_mode == Theme.THEME_PORT_POLYGON:
+                poly_locx = (0, self.m_port_width + 5, self.m_port_width + 12, self.m_port_width + 5, 0)
+            elif canvas.theme.port_mode == Theme.THEME_PORT_SQUARE:
+                poly_locx = (0, self.m_port_width + 5, self.m_port_width + 5, self.m_port_width + 5, 0)
+            else:
+                qCritical("PatchCanvas::CanvasPort.getPortPolygon() - invalid theme port mode '%s'" % canvas.theme.port_mode)
+                return None
+
+        elif self.m_port_mode == PORT_MODE_OUTPUT:
+            if canvas.theme.port_mode == Theme.THEME_PORT_POLYGON:
+                poly_locx = (self.m_port_width + 12, 7, 0, 7, self.m_port_width + 12)
+            elif canvas.theme.port_mode == Theme.THEME_PORT_SQUARE:
+                poly_locx = (self.m_port_width + 12, 5, 5, 5, self.m_port_width + 12)
+            else:
+                qCritical("PatchCanvas::CanvasPort.getPortPolygon() - invalid theme port mode '%s'" % canvas.theme.port_mode)
+                return None
+
+        else:
+            qCritical("PatchCanvas::CanvasPort.getPortPolygon() - invalid port mode '%s'" % port_mode2str(self.m_port_mode))
+            return None
+
+        polygon  = QPolygonF()
+        polygon += QPointF(poly_locx[0], 0)
+        polygon += QPointF(poly_locx[1], 0)
+        polygon += QPointF(poly_locx[2], float(canvas.theme.port_height)/2)
+        polygon += QPointF(poly_locx[3], canvas.theme.port_height)
+        polygon += QPointF(poly_locx[4], canvas.theme.port_height)
+
+        self.m_port_polygon = polygon
+        return polygon
+
     def type(self):
         return CanvasPortType
 
+    def canConnectTo(self, port_mode, port_type):
+        if port_mode == self.m_port_mode:
+            return False
+
+        if port_type == self.m_port_type:
+            return True
+
+        # a2j ports are jack midi ports too
+        return (port_type, self.m_port_type) in ((PORT_TYPE_MIDI_JACK, PORT_TYPE_MIDI_A2J), (PORT_TYPE_MIDI_A2J, PORT_TYPE_MIDI_JACK))
+
+    # Ports this one can connect to, indexed by position, for the duration of a drag
+    def buildHoverIndex(self):
+        self.m_hover_index = CanvasBoxIndex(PORT_DRAG_CELL_SIZE)
+
+        for port in canvas.ports.values():
+            if port.widget is None or port.widget is self:
+                continue
+
+            if port.widget.isVisible() and self.canConnectTo(port.port_mode, port.port_type):
+                self.m_hover_index.updateBox(port.widget)
+
+    def getHoverItemAt(self, scene_pos):
+        # Ports covered by another box can't be hovered
+        top_box = canvas.box_index.topBoxAt(scene_pos)
+
+        if top_box is None:
+            return None
+
+        for item in self.m_hover_index.boxesAt(scene_pos):
+            port = canvas.ports.get(item.getPortId())
+
+            # Skip ports removed during the drag
+            if port is not None and port.widget is item and item.parentItem() is top_box:
+                return item
+
+        return None
+
     def mousePressEvent(self, event):
         self.m_hover_item = None
         self.m_mouse_down = bool(event.button() == Qt.LeftButton)
@@ -1770,9 +2921,12 @@ class CanvasPort(QGraphicsItem):
                 self.setCursor(QCursor(Qt.CrossCursor))
                 self.m_cursor_moving = True
 
-                for connection in canvas.connection_list:
-                    if connection.port_out_id == self.m_port_id or connection.port_in_id == self.m_port_id:
-                        connection.widget.setLocked(True)
+                for connection_id in canvas.port_connections.get(self.m_port_id, ()):
+                    line = canvas.connections[connection_id].widget
+                    if line:
+                        line.setLocked(True)
+
+                self.buildHoverIndex()
 
             if not self.m_line_mov:
                 if options.use_bezier_lines:
@@ -1785,29 +2939,15 @@ class CanvasPort(QGraphicsItem):
                 canvas.last_z_value += 1
                 self.parentItem().setZValue(canvas.last_z_value)
 
-            item = None
-            items = canvas.scene.items(event.scenePos(), Qt.ContainsItemShape, Qt.AscendingOrder)
-            for i in range(len(items)):
-                if items[i].type() == CanvasPortType:
-                    if items[i] != self:
-                        if not item:
-                            item = items[i]
-                        elif items[i].parentItem().zValue() > item.parentItem().zValue():
-                            item = items[i]
+            item = self.getHoverItemAt(event.scenePos())
 
             if self.m_hover_item and self.m_hover_item != item:
                 self.m_hover_item.setSelected(False)
 
             if item:
-                a2j_connection = bool(item.getPortType() == PORT_TYPE_MIDI_JACK and self.m_port_type == PORT_TYPE_MIDI_A2J) or (item.getPortType() == PORT_TYPE_MIDI_A2J and self.m_port_type == PORT_TYPE_MIDI_JACK)
+                item.setSelected(True)
 
-                if item.getPortMode() != self.m_port_mode and (item.getPortType() == self.m_port_type or a2j_connection):
-                    item.setSelected(True)
-                    self.m_hover_item = item
-                else:
-                    self.m_hover_item = None
-            else:
-                self.m_hover_item = None
+            self.m_hover_item = item
 
             self.m_line_mov.updateLinePos(event.scenePos())
             return event.accept()
@@ -1820,16 +2960,18 @@ class CanvasPort(QGraphicsItem):
                 self.m_line_mov.deleteFromScene()
                 self.m_line_mov = None
 
-            for connection in canvas.connection_list:
-                if connection.port_out_id == self.m_port_id or connection.port_in_id == self.m_port_id:
-                    connection.widget.setLocked(False)
+            for connection_id in canvas.port_connections.get(self.m_port_id, ()):
+                line = canvas.connections[connection_id].widget
+                if line:
+                    line.setLocked(False)
 
             if self.m_hover_item:
                 check = False
-                for connection in canvas.connection_list:
-                    if ( (connection.port_out_id == self.m_port_id and connection.port_in_id == self.m_hover_item.getPortId()) or
-                         (connection.port_out_id == self.m_hover_item.getPortId() and connection.port_in_id == self.m_port_id) ):
-                        canvas.callback(ACTION_PORTS_DISCONNECT, connection.connection_id, 0, "")
+                hover_port_id = self.m_hover_item.getPortId()
+                for connection_id in canvas.port_connections.get(self.m_port_id, ()):
+                    connection = canvas.connections[connection_id]
+                    if hover_port_id in (connection.port_out_id, connection.port_in_id):
+                        canvas.callback(ACTION_PORTS_DISCONNECT, connection_id, 0, "")
                         check = True
                         break
 
@@ -1845,6 +2987,7 @@ class CanvasPort(QGraphicsItem):
             self.setCursor(QCursor(Qt.ArrowCursor))
 
         self.m_hover_item = None
+        self.m_hover_index = None
         self.m_mouse_down = False
         self.m_cursor_moving = False
         QGraphicsItem.mouseReleaseEvent(self, event)
@@ -1903,83 +3046,37 @@ class CanvasPort(QGraphicsItem):
         return QRectF(0, 0, self.m_port_width + 12, self.m_port_height)
 
     def paint(self, painter, option, widget):
-        painter.save()
-        painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing == ANTIALIASING_FULL))
+        polygon = self.getPortPolygon()
 
-        poly_locx = [0, 0, 0, 0, 0]
+        if polygon is None:
+            return
 
-        if self.m_port_mode == PORT_MODE_INPUT:
-            text_pos = QPointF(3, canvas.theme.port_text_ypos)
+        style = canvas.theme.port_styles.get((self.m_port_type, self.isSelected()))
 
-            if canvas.theme.port_mode == Theme.THEME_PORT_POLYGON:
-                poly_locx[0] = 0
-                poly_locx[1] = self.m_port_width + 5
-                poly_locx[2] = self.m_port_width + 12
-                poly_locx[3] = self.m_port_width + 5
-                poly_locx[4] = 0
-            elif canvas.theme.port_mode == Theme.THEME_PORT_SQUARE:
-                poly_locx[0] = 0
-                poly_locx[1] = self.m_port_width + 5
-                poly_locx[2] = self.m_port_width + 5
-                poly_locx[3] = self.m_port_width + 5
-                poly_locx[4] = 0
-            else:
-                qCritical("PatchCanvas::CanvasPort.paint() - invalid theme port mode '%s'" % canvas.theme.port_mode)
-                return
+        if style is None:
+            qCritical("PatchCanvas::CanvasPort.paint() - invalid port type '%s'" % port_type2str(self.m_port_type))
+            return
 
-        elif self.m_port_mode == PORT_MODE_OUTPUT:
-            text_pos = QPointF(9, canvas.theme.port_text_ypos)
+        poly_color, poly_pen, text_pen = style
 
-            if canvas.theme.port_mode == Theme.THEME_PORT_POLYGON:
-                poly_locx[0] = self.m_port_width + 12
-                poly_locx[1] = 7
-                poly_locx[2] = 0
-                poly_locx[3] = 7
-                poly_locx[4] = self.m_port_width + 12
-            elif canvas.theme.port_mode == Theme.THEME_PORT_SQUARE:
-                poly_locx[0] = self.m_port_width + 12
-                poly_locx[1] = 5
-                poly_locx[2] = 5
-                poly_locx[3] = 5
-                poly_locx[4] = self.m_port_width + 12
-            else:
-                qCritical("PatchCanvas::CanvasPort.paint() - invalid theme port mode '%s'" % canvas.theme.port_mode)
-                return
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing == ANTIALIASING_FULL))
 
-        else:
-            qCritical("PatchCanvas::CanvasPort.paint() - invalid port mode '%s'" % port_mode2str(self.m_port_mode))
-            return
+        if self.isSelected() != self.m_last_selected_state:
+            for connection_id in canvas.port_connections.get(self.m_port_id, ()):
+                line = canvas.connections[connection_id].widget
+                if line:
+                    line.setLineSelected(self.isSelected())
 
-        if self.m_port_type == PORT_TYPE_AUDIO_JACK:
-            poly_color = canvas.theme.port_audio_jack_bg_sel if self.isSelected() else canvas.theme.port_audio_jack_bg
-            poly_pen = canvas.theme.port_audio_jack_pen_sel  if self.isSelected() else canvas.theme.port_audio_jack_pen
-            text_pen = canvas.theme.port_audio_jack_text_sel if self.isSelected() else canvas.theme.port_audio_jack_text
-            conn_pen = canvas.theme.port_audio_jack_pen_sel
-        elif self.m_port_type == PORT_TYPE_MIDI_JACK:
-            poly_color = canvas.theme.port_midi_jack_bg_sel if self.isSelected() else canvas.theme.port_midi_jack_bg
-            poly_pen = canvas.theme.port_midi_jack_pen_sel  if self.isSelected() else canvas.theme.port_midi_jack_pen
-            text_pen = canvas.theme.port_midi_jack_text_sel if self.isSelected() else canvas.theme.port_midi_jack_text
-            conn_pen = canvas.theme.port_midi_jack_pen_sel
-        elif self.m_port_type == PORT_TYPE_MIDI_A2J:
-            poly_color = canvas.theme.port_midi_a2j_bg_sel if self.isSelected() else canvas.theme.port_midi_a2j_bg
-            poly_pen = canvas.theme.port_midi_a2j_pen_sel  if self.isSelected() else canvas.theme.port_midi_a2j_pen
-            text_pen = canvas.theme.port_midi_a2j_text_sel if self.isSelected() else canvas.theme.port_midi_a2j_text
-            conn_pen = canvas.theme.port_midi_a2j_pen_sel
-        elif self.m_port_type == PORT_TYPE_MIDI_ALSA:
-            poly_color = canvas.theme.port_midi_alsa_bg_sel if self.isSelected() else canvas.theme.port_midi_alsa_bg
-            poly_pen = canvas.theme.port_midi_alsa_pen_sel  if self.isSelected() else canvas.theme.port_midi_alsa_pen
-            text_pen = canvas.theme.port_midi_alsa_text_sel if self.isSelected() else canvas.theme.port_midi_alsa_text
-            conn_pen = canvas.theme.port_midi_alsa_pen_sel
-        else:
-            qCritical("PatchCanvas::CanvasPort.paint() - invalid port type '%s'" % port_type2str(self.m_port_type))
-            return
+        self.m_last_selected_state = self.isSelected()
 
-        polygon  = QPolygonF()
-        polygon += QPointF(poly_locx[0], 0)
-        polygon += QPointF(poly_locx[1], 0)
-        polygon += QPointF(poly_locx[2], float(canvas.theme.port_height)/2)
-        polygon += QPointF(poly_locx[3], canvas.theme.port_height)
-        polygon += QPointF(poly_locx[4], canvas.theme.port_height)
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+
+        # Zoomed out, a flat bar is enough
+        if lod < options.lod_simple:
+            painter.fillRect(polygon.boundingRect(), poly_color)
+            painter.restore()
+            return
 
         if canvas.theme.port_bg_pixmap:
             portRect = polygon.boundingRect()
@@ -1991,16 +3088,14 @@ class CanvasPort(QGraphicsItem):
         painter.setPen(poly_pen)
         painter.drawPolygon(polygon)
 
-        painter.setPen(text_pen)
-        painter.setFont(self.m_port_font)
-        painter.drawText(text_pos, self.m_port_name)
-
-        if self.isSelected() != self.m_last_selected_state:
-            for connection in canvas.connection_list:
-                if connection.port_out_id == self.m_port_id or connection.port_in_id == self.m_port_id:
-                    connection.widget.setLineSelected(self.isSelected())
+        if lod >= options.lod_text:
+            text_x = 3 if self.m_port_mode == PORT_MODE_INPUT else 9
+            painter.setPen(text_pen)
+            painter.setFont(self.m_port_font)
+            painter.drawText(QPointF(text_x, canvas.theme.port_text_ypos), self.m_port_name)
 
         if canvas.theme.idx == Theme.THEME_OOSTUDIO and canvas.theme.port_bg_pixmap:
+            conn_pen = canvas.theme.port_styles[(self.m_port_type, True)][1]
             painter.setPen(Qt.NoPen)
             painter.setBrush(conn_pen.brush())
 
@@ -2011,19 +3106,11 @@ class CanvasPort(QGraphicsItem):
 
             painter.drawRect(connRect)
 
-        self.m_last_selected_state = self.isSelected()
-
         painter.restore()
 
 # ------------------------------------------------------------------------------
 # canvasbox.cpp
 
-class cb_line_t(object):
-    __slots__ = [
-        'line',
-        'connection_id'
-    ]
-
 class CanvasBox(QGraphicsItem):
     def __init__(self, group_id, group_name, icon, parent=None):
         QGraphicsItem.__init__(self, parent)
@@ -2045,11 +3132,23 @@ class CanvasBox(QGraphicsItem):
         self.m_mouse_down = False
 
         self.m_port_list_ids = []
-        self.m_connection_lines = []
+        self.m_port_buckets  = {}
+        self.m_port_layout   = {}
+        self.m_hidden_port_ids = set()
+        self.m_connection_lines = {}
+        self.m_bundles = set()
+
+        # Virtual boxes keep their size but have no port items, collapsed ones only show the header
+        self.m_virtual   = options.virtualize_groups
+        self.m_collapsed = False
+
+        # Connections with both ports in this box, all others are external
+        self.m_connections_internal = set()
+        self.m_connections_external = set()
 
         # Set Font
-        self.m_font_name = QFont(canvas.theme.box_font_name, canvas.theme.box_font_size, canvas.theme.box_font_state)
-        self.m_font_port = QFont(canvas.theme.port_font_name, canvas.theme.port_font_size, canvas.theme.port_font_state)
+        self.m_font_name = canvas.theme.box_font
+        self.m_font_port = canvas.theme.port_font
 
         # Icon
         if canvas.theme.box_use_icon:
@@ -2066,7 +3165,11 @@ class CanvasBox(QGraphicsItem):
             self.shadow = None
 
         # Final touches
-        self.setFlags(QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable)
+        self.setFlags(QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable | QGraphicsItem.ItemSendsGeometryChanges)
+
+        # Only repainted on rename, selection, resize and port changes, all of which call update()
+        if options.use_item_cache:
+            self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
         # Wait for at least 1 port
         if options.auto_hide_groups:
@@ -2094,6 +3197,12 @@ class CanvasBox(QGraphicsItem):
     def getPortList(self):
         return self.m_port_list_ids
 
+    def hasPortMode(self, port_mode):
+        for (bucket_mode, bucket_type), bucket in self.m_port_buckets.items():
+            if bucket_mode == port_mode and len(bucket) > 0:
+                return True
+        return False
+
     def setIcon(self, icon):
         if self.icon_svg:
             self.icon_svg.setIcon(icon, self.m_group_name)
@@ -2104,32 +3213,128 @@ class CanvasBox(QGraphicsItem):
 
     def setGroupName(self, group_name):
         self.m_group_name = group_name
-        self.updatePositions()
+        self.scheduleLayout()
 
     def setShadowOpacity(self, opacity):
         if self.shadow:
             self.shadow.setOpacity(opacity)
 
-    def addPortFromGroup(self, port_id, port_mode, port_type, port_name):
+    def isVirtual(self):
+        return self.m_virtual
+
+    def setVirtual(self, yesno):
+        self.m_virtual = yesno
+
+        if yesno:
+            canvas.real_boxes.discard(self)
+        else:
+            canvas.real_boxes.add(self)
+
+        self.updatePortWidgets()
+
+        if yesno and not (self.m_connection_lines or self.m_bundles):
+            return
+
+        bundle_keys = set()
+
+        for connection_id in list(canvas.group_connections.get(self.m_group_id, ())):
+            connection = canvas.connections[connection_id]
+            box_out = CanvasGetPortBox(canvas.ports[connection.port_out_id])
+            box_in  = CanvasGetPortBox(canvas.ports[connection.port_in_id])
+
+            # Other half of a split group
+            if self is not box_out and self is not box_in:
+                continue
+
+            if options.bundle_connections and (box_out, box_in) not in bundle_keys:
+                bundle_keys.add((box_out, box_in))
+                CanvasUpdateBundle(box_out, box_in)
+
+            CanvasUpdateLine(connection, box_out, box_in)
+
+    def isCollapsed(self):
+        return self.m_collapsed
+
+    def setCollapsed(self, yesno):
+        if yesno == self.m_collapsed:
+            return
+
+        self.m_collapsed = yesno
+        self.updatePortWidgets()
+        self.updatePositions()
+
+    def updatePortWidgets(self):
+        show = not (self.m_virtual or self.m_collapsed)
+
+        for port_id in self.m_port_list_ids:
+            port = canvas.ports.get(port_id)
+
+            if port is None:
+                continue
+
+            if show and port.widget is None:
+                port.widget = CanvasPort(port_id, port.port_name, port.port_mode, port.port_type, self)
+
+                if port_id in self.m_port_layout:
+                    port_x, port_y, port_width = self.m_port_layout[port_id]
+                    port.widget.setPos(QPointF(port_x, port_y))
+                    port.widget.setPortWidth(port_width)
+
+                if port_id in self.m_hidden_port_ids:
+                    port.widget.setVisible(False)
+
+            elif not show and port.widget is not None:
+                item = port.widget
+                port.widget = None
+                canvas.fade_animation.removeFade(item)
+                canvas.scene.removeItem(item)
+
+    def setPortHidden(self, port_id, yesno):
+        if yesno:
+            self.m_hidden_port_ids.add(port_id)
+        else:
+            self.m_hidden_port_ids.discard(port_id)
+
+        port = canvas.ports.get(port_id)
+
+        if port and port.widget:
+            port.widget.setVisible(not yesno)
+
+    # Scene position where lines meet a port, or the box header when the port has no item
+    def getPortAnchor(self, port):
+        pos = self.scenePos()
+        layout = self.m_port_layout.get(port.port_id)
+
+        if self.m_collapsed or layout is None:
+            x = pos.x() + self.p_width if port.port_mode == PORT_MODE_OUTPUT else pos.x()
+            return (x, pos.y() + float(canvas.theme.box_header_height)/2)
+
+        port_x, port_y, port_width = layout
+
+        if port.port_mode == PORT_MODE_OUTPUT:
+            port_x += port_width + 12
+
+        return (pos.x() + port_x, pos.y() + port_y + float(canvas.theme.port_height)/2)
+
+    def addPortFromGroup(self, port):
         if len(self.m_port_list_ids) == 0:
             if options.auto_hide_groups:
                 if options.eyecandy == EYECANDY_FULL:
                     CanvasItemFX(self, True)
                 self.setVisible(True)
 
-        new_widget = CanvasPort(port_id, port_name, port_mode, port_type, self)
+        self.m_port_list_ids.append(port.port_id)
 
-        port_dict = port_dict_t()
-        port_dict.group_id = self.m_group_id
-        port_dict.port_id = port_id
-        port_dict.port_name = port_name
-        port_dict.port_mode = port_mode
-        port_dict.port_type = port_type
-        port_dict.widget = new_widget
+        bucket_key = (port.port_mode, port.port_type)
+        if bucket_key in self.m_port_buckets:
+            self.m_port_buckets[bucket_key][port.port_id] = port
+        else:
+            self.m_port_buckets[bucket_key] = {port.port_id: port}
 
-        self.m_port_list_ids.append(port_id)
+        if self.m_virtual or self.m_collapsed:
+            return None
 
-        return new_widget
+        return CanvasPort(port.port_id, port.port_name, port.port_mode, port.port_type, self)
 
     def removePortFromGroup(self, port_id):
         if port_id in self.m_port_list_ids:
@@ -2138,8 +3343,15 @@ class CanvasBox(QGraphicsItem):
             qCritical("PatchCanvas::CanvasBox.removePort(%i) - unable to find port to remove" % port_id)
             return
 
+        for bucket in self.m_port_buckets.values():
+            if bucket.pop(port_id, None) is not None:
+                break
+
+        self.m_port_layout.pop(port_id, None)
+        self.m_hidden_port_ids.discard(port_id)
+
         if len(self.m_port_list_ids) > 0:
-            self.updatePositions()
+            self.scheduleLayout()
 
         elif self.isVisible():
             if options.auto_hide_groups:
@@ -2148,19 +3360,32 @@ class CanvasBox(QGraphicsItem):
                 else:
                     self.setVisible(False)
 
+    # Called once per connection end, twice for connections inside this box
     def addLineFromGroup(self, line, connection_id):
-        new_cbline = cb_line_t()
-        new_cbline.line = line
-        new_cbline.connection_id = connection_id
-        self.m_connection_lines.append(new_cbline)
+        if connection_id in self.m_connection_lines:
+            self.m_connections_external.discard(connection_id)
+            self.m_connections_internal.add(connection_id)
+        else:
+            self.m_connection_lines[connection_id] = line
+            self.m_connections_external.add(connection_id)
 
     def removeLineFromGroup(self, connection_id):
-        for connection in self.m_connection_lines:
-            if connection.connection_id == connection_id:
-                self.m_connection_lines.remove(connection)
-                return
+        if connection_id in self.m_connections_internal:
+            self.m_connections_internal.remove(connection_id)
+            self.m_connections_external.add(connection_id)
+            return
+        if connection_id in self.m_connections_external:
+            self.m_connections_external.remove(connection_id)
+            del self.m_connection_lines[connection_id]
+            return
         qCritical("PatchCanvas::CanvasBox.removeLineFromGroup(%i) - unable to find line to remove" % connection_id)
 
+    def addBundleFromGroup(self, bundle):
+        self.m_bundles.add(bundle)
+
+    def removeBundleFromGroup(self, bundle):
+        self.m_bundles.discard(bundle)
+
     def checkItemPos(self):
         if not canvas.size_rect.isNull():
             pos = self.scenePos()
@@ -2180,238 +3405,171 @@ class CanvasBox(QGraphicsItem):
         if self.icon_svg:
             canvas.scene.removeItem(self.icon_svg)
 
+    def scheduleLayout(self):
+        CanvasScheduleLayout(self)
+
     def updatePositions(self):
+        canvas.layout_boxes.discard(self)
         self.prepareGeometryChange()
 
-        max_in_width  = 0
-        max_in_height = canvas.theme.box_header_height + canvas.theme.box_header_spacing
-        max_out_width  = 0
-        max_out_height = canvas.theme.box_header_height + canvas.theme.box_header_spacing
-        port_spacing   = canvas.theme.port_height + canvas.theme.port_spacing
+        header_height = canvas.theme.box_header_height + canvas.theme.box_header_spacing
+        port_spacing  = canvas.theme.port_height + canvas.theme.port_spacing
 
-        have_audio_jack_in = have_midi_jack_in = have_midi_a2j_in = have_midi_alsa_in = False
-        have_audio_jack_out = have_midi_jack_out = have_midi_a2j_out = have_midi_alsa_out = False
+        max_width  = {PORT_MODE_INPUT: 0, PORT_MODE_OUTPUT: 0}
+        max_height = {PORT_MODE_INPUT: header_height, PORT_MODE_OUTPUT: header_height}
 
         # reset box size
         self.p_width  = 50
-        self.p_height = canvas.theme.box_header_height + canvas.theme.box_header_spacing + 1
+        self.p_height = header_height + 1
 
         # Check Text Name size
-        app_name_size = QFontMetrics(self.m_font_name).width(self.m_group_name) + 30
+        app_name_size = CanvasGetTextWidth(self.m_font_name, self.m_group_name) + 30
         if app_name_size > self.p_width:
             self.p_width = app_name_size
 
-        # Get Port List
-        port_list = []
-        for port in canvas.port_list:
-            if port.port_id in self.m_port_list_ids:
-                port_list.append(port)
+        # Collapsed boxes only have a header
+        port_buckets = {} if self.m_collapsed else self.m_port_buckets
 
         # Get Max Box Width/Height
-        for port in port_list:
-            if port.port_mode == PORT_MODE_INPUT:
-                max_in_height += port_spacing
-
-                size = QFontMetrics(self.m_font_port).width(port.port_name)
-                if size > max_in_width:
-                    max_in_width = size
-
-                if port.port_type == PORT_TYPE_AUDIO_JACK and not have_audio_jack_in:
-                    have_audio_jack_in = True
-                    max_in_height += canvas.theme.port_spacingT
-                elif port.port_type == PORT_TYPE_MIDI_JACK and not have_midi_jack_in:
-                    have_midi_jack_in = True
-                    max_in_height += canvas.theme.port_spacingT
-                elif port.port_type == PORT_TYPE_MIDI_A2J and not have_midi_a2j_in:
-                    have_midi_a2j_in = True
-                    max_in_height += canvas.theme.port_spacingT
-                elif port.port_type == PORT_TYPE_MIDI_ALSA and not have_midi_alsa_in:
-                    have_midi_alsa_in = True
-                    max_in_height += canvas.theme.port_spacingT
-
-            elif port.port_mode == PORT_MODE_OUTPUT:
-                max_out_height += port_spacing
-
-                size = QFontMetrics(self.m_font_port).width(port.port_name)
-                if size > max_out_width:
-                    max_out_width = size
-
-                if port.port_type == PORT_TYPE_AUDIO_JACK and not have_audio_jack_out:
-                    have_audio_jack_out = True
-                    max_out_height += canvas.theme.port_spacingT
-                elif port.port_type == PORT_TYPE_MIDI_JACK and not have_midi_jack_out:
-                    have_midi_jack_out = True
-                    max_out_height += canvas.theme.port_spacingT
-                elif port.port_type == PORT_TYPE_MIDI_A2J and not have_midi_a2j_out:
-                    have_midi_a2j_out = True
-                    max_out_height += canvas.theme.port_spacingT
-                elif port.port_type == PORT_TYPE_MIDI_ALSA and not have_midi_alsa_out:
-                    have_midi_alsa_out = True
-                    max_out_height += canvas.theme.port_spacingT
+        for (port_mode, port_type), bucket in port_buckets.items():
+            if port_mode not in max_width or len(bucket) == 0:
+                continue
+
+            max_height[port_mode] += port_spacing * len(bucket)
+
+            if port_type in PORT_TYPE_ORDER:
+                max_height[port_mode] += canvas.theme.port_spacingT
+
+            for port in bucket.values():
+                size = CanvasGetTextWidth(self.m_font_port, port.port_name)
+                if size > max_width[port_mode]:
+                    max_width[port_mode] = size
+
+        max_in_width  = max_width[PORT_MODE_INPUT]
+        max_out_width = max_width[PORT_MODE_OUTPUT]
 
         if canvas.theme.port_spacingT == 0:
-            max_in_height  += 2
-            max_out_height += 2
+            max_height[PORT_MODE_INPUT]  += 2
+            max_height[PORT_MODE_OUTPUT] += 2
 
         final_width = 30 + max_in_width + max_out_width
         if final_width > self.p_width:
             self.p_width = final_width
 
-        if max_in_height > self.p_height:
-            self.p_height = max_in_height
+        if max_height[PORT_MODE_INPUT] > self.p_height:
+            self.p_height = max_height[PORT_MODE_INPUT]
 
-        if max_out_height > self.p_height:
-            self.p_height = max_out_height
+        if max_height[PORT_MODE_OUTPUT] > self.p_height:
+            self.p_height = max_height[PORT_MODE_OUTPUT]
 
         # Remove bottom space
         self.p_height -= canvas.theme.port_spacingT
 
         if canvas.theme.box_header_spacing > 0:
-            if len(port_list) == 0:
+            if self.m_collapsed or len(self.m_port_list_ids) == 0:
                 self.p_height -= canvas.theme.box_header_spacing
             else:
                 self.p_height -= canvas.theme.box_header_spacing/2
 
-        last_in_pos  = canvas.theme.box_header_height + canvas.theme.box_header_spacing
-        last_out_pos = canvas.theme.box_header_height + canvas.theme.box_header_spacing
-        last_in_type  = PORT_TYPE_NULL
-        last_out_type = PORT_TYPE_NULL
-
-        # Re-position ports, AUDIO_JACK
-        for port in port_list:
-            if port.port_type == PORT_TYPE_AUDIO_JACK:
-                if port.port_mode == PORT_MODE_INPUT:
-                    port.widget.setPos(QPointF(1 + canvas.theme.port_offset, last_in_pos))
-                    port.widget.setPortWidth(max_in_width)
-
-                    last_in_pos += port_spacing
-                    last_in_type = port.port_type
-
-                elif port.port_mode == PORT_MODE_OUTPUT:
-                    port.widget.setPos(QPointF(self.p_width - max_out_width - canvas.theme.port_offset - 13, last_out_pos))
-                    port.widget.setPortWidth(max_out_width)
-
-                    last_out_pos += port_spacing
-                    last_out_type = port.port_type
-
-        # Re-position ports, MIDI_JACK
-        for port in port_list:
-            if port.port_type == PORT_TYPE_MIDI_JACK:
-                if port.port_mode == PORT_MODE_INPUT:
-                    if last_in_type != PORT_TYPE_NULL and port.port_type != last_in_type:
-                        last_in_pos += canvas.theme.port_spacingT
-
-                    port.widget.setPos(QPointF(1 + canvas.theme.port_offset, last_in_pos))
-                    port.widget.setPortWidth(max_in_width)
-
-                    last_in_pos += port_spacing
-                    last_in_type = port.port_type
-
-                elif port.port_mode == PORT_MODE_OUTPUT:
-                    if last_out_type != PORT_TYPE_NULL and port.port_type != last_out_type:
-                        last_out_pos += canvas.theme.port_spacingT
-
-                    port.widget.setPos(QPointF(self.p_width - max_out_width - canvas.theme.port_offset - 13, last_out_pos))
-                    port.widget.setPortWidth(max_out_width)
-
-                    last_out_pos += port_spacing
-                    last_out_type = port.port_type
-
-        # Re-position ports, MIDI_A2J
-        for port in port_list:
-            if port.port_type == PORT_TYPE_MIDI_A2J:
-                if port.port_mode == PORT_MODE_INPUT:
-                    if last_in_type != PORT_TYPE_NULL and port.port_type != last_in_type:
-                        last_in_pos += canvas.theme.port_spacingT
-
-                    port.widget.setPos(QPointF(1 + canvas.theme.port_offset, last_in_pos))
-                    port.widget.setPortWidth(max_in_width)
-
-                    last_in_pos += port_spacing
-                    last_in_type = port.port_type
+        # Re-position ports, one port type after the other
+        for port_mode, port_x, port_width in ((PORT_MODE_INPUT, 1 + canvas.theme.port_offset, max_in_width),
+                                              (PORT_MODE_OUTPUT, self.p_width - max_out_width - canvas.theme.port_offset - 13, max_out_width)):
+            last_pos  = header_height
+            last_type = PORT_TYPE_NULL
 
-                elif port.port_mode == PORT_MODE_OUTPUT:
-                    if last_out_type != PORT_TYPE_NULL and port.port_type != last_out_type:
-                        last_out_pos += canvas.theme.port_spacingT
-
-                    port.widget.setPos(QPointF(self.p_width - max_out_width - canvas.theme.port_offset - 13, last_out_pos))
-                    port.widget.setPortWidth(max_out_width)
+            for port_type in PORT_TYPE_ORDER:
+                bucket = port_buckets.get((port_mode, port_type))
 
-                    last_out_pos += port_spacing
-                    last_out_type = port.port_type
-
-        # Re-position ports, MIDI_ALSA
-        for port in port_list:
-            if port.port_type == PORT_TYPE_MIDI_ALSA:
-                if port.port_mode == PORT_MODE_INPUT:
-                    if last_in_type != PORT_TYPE_NULL and port.port_type != last_in_type:
-                        last_in_pos += canvas.theme.port_spacingT
+                if not bucket:
+                    continue
 
-                    port.widget.setPos(QPointF(1 + canvas.theme.port_offset, last_in_pos))
-                    port.widget.setPortWidth(max_in_width)
+                if last_type != PORT_TYPE_NULL:
+                    last_pos += canvas.theme.port_spacingT
 
-                    last_in_pos += port_spacing
-                    last_in_type = port.port_type
+                # Port items might not exist, lines use the layout
+                for port_id, port in bucket.items():
+                    self.m_port_layout[port_id] = (port_x, last_pos, port_width)
 
-                elif port.port_mode == PORT_MODE_OUTPUT:
-                    if last_out_type != PORT_TYPE_NULL and port.port_type != last_out_type:
-                        last_out_pos += canvas.theme.port_spacingT
+                    if port.widget is not None:
+                        port.widget.setPos(QPointF(port_x, last_pos))
+                        port.widget.setPortWidth(port_width)
 
-                    port.widget.setPos(QPointF(self.p_width - max_out_width - canvas.theme.port_offset - 13, last_out_pos))
-                    port.widget.setPortWidth(max_out_width)
+                    last_pos += port_spacing
 
-                    last_out_pos += port_spacing
-                    last_out_type = port.port_type
+                last_type = port_type
 
         self.repaintLines(True)
         self.update()
 
+        canvas.box_index.updateBox(self)
+        CanvasScheduleVirtualize()
+
     def repaintLines(self, forced=False):
         if self.pos() != self.m_last_pos or forced:
-            for connection in self.m_connection_lines:
-                connection.line.updateLinePos()
+            for line in self.m_connection_lines.values():
+                line.updateLinePos()
+
+            for bundle in self.m_bundles:
+                bundle.updateLinePos()
 
         self.m_last_pos = self.pos()
 
     def resetLinesZValue(self):
-        for connection in canvas.connection_list:
-            if connection.port_out_id in self.m_port_list_ids and connection.port_in_id in self.m_port_list_ids:
-                z_value = canvas.last_z_value
-            else:
-                z_value = canvas.last_z_value - 1
+        z_value = canvas.last_z_value
+        for connection_id in self.m_connections_internal:
+            self.m_connection_lines[connection_id].setZValue(z_value)
 
-            connection.widget.setZValue(z_value)
+        z_value = canvas.last_z_value - 1
+        for connection_id in self.m_connections_external:
+            self.m_connection_lines[connection_id].setZValue(z_value)
+
+        for bundle in self.m_bundles:
+            bundle.setZValue(z_value)
 
     def type(self):
         return CanvasBoxType
 
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            canvas.box_index.updateBox(self)
+            self.repaintLines()
+            CanvasScheduleVirtualize()
+
+        elif change == QGraphicsItem.ItemSelectedHasChanged:
+            for bundle in list(self.m_bundles):
+                bundle.updateExpanded()
+
+        return QGraphicsItem.itemChange(self, change, value)
+
     def contextMenuEvent(self, event):
         menu = QMenu()
         discMenu = QMenu("Disconnect", menu)
 
-        port_con_list = []
-        port_con_list_ids = []
+        # connection_id -> port_id, in port order
+        port_con_list = {}
 
         for port_id in self.m_port_list_ids:
-            tmp_port_con_list = CanvasGetPortConnectionList(port_id)
-            for port_con_id in tmp_port_con_list:
+            for port_con_id in CanvasGetPortConnectionList(port_id):
                 if port_con_id not in port_con_list:
-                    port_con_list.append(port_con_id)
-                    port_con_list_ids.append(port_id)
+                    port_con_list[port_con_id] = port_id
 
         if len(port_con_list) > 0:
-            for i in range(len(port_con_list)):
-                port_con_id = CanvasGetConnectedPort(port_con_list[i], port_con_list_ids[i])
+            for connection_id, port_id in port_con_list.items():
+                port_con_id = CanvasGetConnectedPort(connection_id, port_id)
                 act_x_disc = discMenu.addAction(CanvasGetFullPortName(port_con_id))
-                act_x_disc.setData(port_con_list[i])
+                act_x_disc.setData(connection_id)
                 act_x_disc.triggered.connect(canvas.qobject.PortContextMenuDisconnect)
         else:
             act_x_disc = discMenu.addAction("No connections")
             act_x_disc.setEnabled(False)
 
         groupName = CanvasGetGroupName(self.m_group_id)
-          
-        windowtitle_list = GroupPropertiesHelper.instance().getWinIdsAndtitles(groupName)
+        group = canvas.groups.get(self.m_group_id)
+
+        if group and group.ray_client:
+          windowtitle_list = GroupPropertiesHelper.instance().getWinIdsAndtitles(groupName)
+        else:
+          windowtitle_list = []
         if len(windowtitle_list) > 1:
           goToWindowMenu = QMenu("Go to app", menu)
           
@@ -2441,6 +3599,7 @@ class CanvasBox(QGraphicsItem):
         
         act_x_sep2 = menu.addSeparator()
         act_x_split_join = menu.addAction("Join" if self.m_splitted else "Split")
+        act_x_collapse = menu.addAction("Expand" if self.m_collapsed else "Collapse")
 
         if not features.group_info:
             act_x_info.setVisible(False)
@@ -2455,8 +3614,9 @@ class CanvasBox(QGraphicsItem):
             act_x_go_to_app.setVisible(False)
         
         haveIns = haveOuts = False
-        for port in canvas.port_list:
-            if port.port_id in self.m_port_list_ids:
+        for port_id in self.m_port_list_ids:
+            port = canvas.ports.get(port_id)
+            if port:
                 if port.port_mode == PORT_MODE_INPUT:
                     haveIns = True
                 elif port.port_mode == PORT_MODE_OUTPUT:
@@ -2485,6 +3645,9 @@ class CanvasBox(QGraphicsItem):
                 canvas.callback(ACTION_GROUP_JOIN, self.m_group_id, 0, "")
             else:
                 canvas.callback(ACTION_GROUP_SPLIT, self.m_group_id, 0, "")
+
+        elif act_selected == act_x_collapse:
+            self.setCollapsed(not self.m_collapsed)
         
         event.accept()
 
@@ -2518,7 +3681,6 @@ class CanvasBox(QGraphicsItem):
             if not self.m_cursor_moving:
                 self.setCursor(QCursor(Qt.SizeAllCursor))
                 self.m_cursor_moving = True
-            self.repaintLines()
         QGraphicsItem.mouseMoveEvent(self, event)
 
     def mouseReleaseEvent(self, event):
@@ -2541,6 +3703,13 @@ class CanvasBox(QGraphicsItem):
         else:
             painter.setPen(canvas.theme.box_pen)
 
+        # Zoomed out, a solid rectangle is enough
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < options.lod_simple:
+            painter.setBrush(canvas.theme.box_bg_1)
+            painter.drawRect(0, 0, self.p_width, self.p_height)
+            painter.restore()
+            return
+
         if canvas.theme.box_bg_type == Theme.THEME_BG_GRADIENT:
             box_gradient = QLinearGradient(0, 0, 0, self.p_height)
             box_gradient.setColorAt(0, canvas.theme.box_bg_1)
@@ -2572,14 +3741,12 @@ class CanvasBox(QGraphicsItem):
         if canvas.theme.box_use_icon:
             textPos = QPointF(25, canvas.theme.box_text_ypos)
         else:
-            appNameSize = QFontMetrics(self.m_font_name).width(self.m_group_name)
+            appNameSize = CanvasGetTextWidth(self.m_font_name, self.m_group_name)
             rem = self.p_width - appNameSize
             textPos = QPointF(rem/2, canvas.theme.box_text_ypos)
 
         painter.drawText(textPos, self.m_group_name)
 
-        self.repaintLines()
-
         painter.restore()
 
 # ------------------------------------------------------------------------------
@@ -2590,12 +3757,10 @@ class CanvasIcon(QGraphicsSvgItem):
         QGraphicsSvgItem.__init__(self, parent)
 
         self.m_renderer = None
+        self.m_icon_path = ""
+        self.m_color = canvas.theme.box_text.color()
         self.p_size = QRectF(0, 0, 0, 0)
 
-        self.m_colorFX = QGraphicsColorizeEffect(self)
-        self.m_colorFX.setColor(canvas.theme.box_text.color())
-
-        self.setGraphicsEffect(self.m_colorFX)
         self.setIcon(icon, name)
 
     def setIcon(self, icon, name):
@@ -2654,7 +3819,8 @@ class CanvasIcon(QGraphicsSvgItem):
             qCritical("PatchCanvas::CanvasIcon.setIcon(%s, %s) - unsupported icon requested" % (icon2str(icon), name.encode()))
             return
 
-        self.m_renderer = QSvgRenderer(icon_path, canvas.scene)
+        self.m_renderer = CanvasGetIconRenderer(icon_path)
+        self.m_icon_path = icon_path
         self.setSharedRenderer(self.m_renderer)
         self.update()
 
@@ -2665,12 +3831,18 @@ class CanvasIcon(QGraphicsSvgItem):
         return self.p_size
 
     def paint(self, painter, option, widget):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+
+        if lod < options.lod_simple:
+            return
+
         if self.m_renderer:
-            painter.save()
-            painter.setRenderHint(QPainter.Antialiasing, False)
-            painter.setRenderHint(QPainter.TextAntialiasing, False)
-            self.m_renderer.render(painter, self.p_size)
-            painter.restore()
+            # Rasterize for the current zoom level, in steps so zooming doesn't fill up the cache
+            scale = lod * painter.device().devicePixelRatioF()
+            pixel_ratio = min(max(ceil(scale * 4) / 4.0, 1.0), ICON_PIXEL_RATIO_MAX)
+
+            pixmap = CanvasGetIconPixmap(self.m_icon_path, self.p_size.size(), self.m_color, pixel_ratio)
+            painter.drawPixmap(self.p_size.topLeft(), pixmap)
         else:
             QGraphicsSvgItem.paint(self, painter, option, widget)
 
@@ -2684,14 +3856,10 @@ class CanvasPortGlow(QGraphicsDropShadowEffect):
         self.setBlurRadius(12)
         self.setOffset(0, 0)
 
-        if port_type == PORT_TYPE_AUDIO_JACK:
-            self.setColor(canvas.theme.line_audio_jack_glow)
-        elif port_type == PORT_TYPE_MIDI_JACK:
-            self.setColor(canvas.theme.line_midi_jack_glow)
-        elif port_type == PORT_TYPE_MIDI_A2J:
-            self.setColor(canvas.theme.line_midi_a2j_glow)
-        elif port_type == PORT_TYPE_MIDI_ALSA:
-            self.setColor(canvas.theme.line_midi_alsa_glow)
+        color = canvas.theme.line_glows.get(port_type)
+
+        if color is not None:
+            self.setColor(color)
 
 # ------------------------------------------------------------------------------
 # canvasboxshadow.cpp
@@ -2713,8 +3881,3 @@ class CanvasBoxShadow(QGraphicsDropShadowEffect):
         color = QColor(canvas.theme.box_shadow)
         color.setAlphaF(opacity)
         self.setColor(color)
-
-    def draw(self, painter):
-        if self.m_fakeParent:
-            self.m_fakeParent.repaintLines()
-        QGraphicsDropShadowEffect.draw(self, painter)
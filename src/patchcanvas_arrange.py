@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchCanvas automatic layout, layered (Sugiyama style)
+# Copyright (C) 2010-2018 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the GPL.txt file
+
+# ------------------------------------------------------------------------------
+# Imports (Global)
+
+from collections import deque
+
+# ------------------------------------------------------------------------------
+# Layout constants
+
+# Box kind
+ARRANGE_CLIENT = 0
+ARRANGE_SOURCE = 1 # capture hardware, always on the left
+ARRANGE_SINK   = 2 # playback hardware, always on the right
+
+ARRANGE_COLUMN_SPACING = 80
+ARRANGE_ROW_SPACING    = 20
+ARRANGE_SWEEPS         = 4
+
+# Incremental layout only for up to this fraction of new boxes
+ARRANGE_INCREMENTAL_MAX = 0.1
+
+# ------------------------------------------------------------------------------
+# Layout data
+# Plain python data only, this code runs outside the GUI thread
+
+class arrange_box_t(object):
+    __slots__ = [
+        'key',
+        'kind',
+        'x',
+        'y',
+        'width',
+        'height'
+    ]
+
+class arrange_state_t(object):
+    __slots__ = [
+        'layers',     # {key: layer}
+        'columns',    # x position of each layer
+        'sink_layer'
+    ]
+
+class arrange_result_t(object):
+    __slots__ = [
+        'positions',  # {key: (x, y)}
+        'state',
+        'incremental',
+        'crossings'
+    ]
+
+# ------------------------------------------------------------------------------
+# Layout engine
+
+# boxes is a list of arrange_box_t, edges is a {(key_out, key_in): weight} dict
+# Without allow_full, returns None if the new boxes can't be placed incrementally
+def arrangeGraph(boxes, edges, previous=None, allow_full=True):
+    if previous is not None:
+        result = arrangeIncremental(boxes, edges, previous)
+        if result is not None or not allow_full:
+            return result
+
+    return arrangeFull(boxes, edges)
+
+def arrangeFull(boxes, edges):
+    boxes_by_key  = dict((box.key, box) for box in boxes)
+    succs, preds  = buildAdjacency(boxes, edges)
+    layers, sink_layer = assignLayers(boxes, succs, preds)
+    rows, crossings    = orderLayers(boxes, layers, succs, preds, sink_layer + 1)
+
+    positions = {}
+    columns   = []
+    column_x  = 0
+    heights   = []
+
+    for row in rows:
+        heights.append(sum(boxes_by_key[key].height for key in row) + ARRANGE_ROW_SPACING * max(0, len(row) - 1))
+
+    max_height = max(heights) if heights else 0
+
+    for row, height in zip(rows, heights):
+        columns.append(column_x)
+
+        if len(row) == 0:
+            continue
+
+        # Columns are vertically centered to each other
+        y = (max_height - height) / 2
+
+        for key in row:
+            positions[key] = (column_x, y)
+            y += boxes_by_key[key].height + ARRANGE_ROW_SPACING
+
+        column_x += max(boxes_by_key[key].width for key in row) + ARRANGE_COLUMN_SPACING
+
+    state = arrange_state_t()
+    state.layers  = layers
+    state.columns = columns
+    state.sink_layer = sink_layer
+
+    result = arrange_result_t()
+    result.positions = positions
+    result.state = state
+    result.incremental = False
+    result.crossings   = crossings
+    return result
+
+# Only places new boxes, everything else stays where it is
+def arrangeIncremental(boxes, edges, previous):
+    new_boxes = [box for box in boxes if box.key not in previous.layers]
+
+    if len(new_boxes) > max(1, int(len(boxes) * ARRANGE_INCREMENTAL_MAX)):
+        return None
+
+    # Needs a column for clients
+    if previous.sink_layer < 2:
+        return None
+
+    boxes_by_key = dict((box.key, box) for box in boxes)
+    succs, preds = buildAdjacency(boxes, edges)
+    layers = dict((key, layer) for key, layer in previous.layers.items() if key in boxes_by_key)
+    placed = dict((key, (boxes_by_key[key].x, boxes_by_key[key].y)) for key in layers)
+    positions = {}
+
+    for box in new_boxes:
+        if box.kind == ARRANGE_SOURCE:
+            layer = 0
+        elif box.kind == ARRANGE_SINK:
+            layer = previous.sink_layer
+        else:
+            pred_layers = [layers[key] for key in preds[box.key] if key in layers]
+            succ_layers = [layers[key] for key in succs[box.key] if key in layers]
+
+            if pred_layers:
+                layer = max(pred_layers) + 1
+            elif succ_layers:
+                layer = min(succ_layers) - 1
+            else:
+                layer = 1
+
+            layer = min(max(layer, 1), previous.sink_layer - 1)
+
+        # Aim for the vertical center of the connected boxes
+        centers = []
+        for key in list(preds[box.key]) + list(succs[box.key]):
+            if key in placed:
+                centers.append(placed[key][1] + boxes_by_key[key].height / 2)
+
+        occupied = sorted((placed[key][1], placed[key][1] + boxes_by_key[key].height)
+                          for key, key_layer in layers.items() if key_layer == layer and key in placed)
+
+        if centers:
+            wanted_y = sum(centers) / len(centers) - box.height / 2
+        elif occupied:
+            wanted_y = occupied[-1][1] + ARRANGE_ROW_SPACING
+        else:
+            wanted_y = 0
+
+        x = previous.columns[layer]
+        y = findFreeSlot(occupied, wanted_y, box.height)
+
+        layers[box.key] = layer
+        placed[box.key] = positions[box.key] = (x, y)
+
+    state = arrange_state_t()
+    state.layers  = layers
+    state.columns = previous.columns
+    state.sink_layer = previous.sink_layer
+
+    result = arrange_result_t()
+    result.positions = positions
+    result.state = state
+    result.incremental = True
+    result.crossings   = -1
+    return result
+
+# ------------------------------------------------------------------------------
+# Layout steps
+
+def buildAdjacency(boxes, edges):
+    succs = dict((box.key, {}) for box in boxes)
+    preds = dict((box.key, {}) for box in boxes)
+
+    for (key_out, key_in), weight in edges.items():
+        if key_out == key_in or key_out not in succs or key_in not in preds:
+            continue
+
+        succs[key_out][key_in] = weight
+        preds[key_in][key_out] = weight
+
+    return (succs, preds)
+
+# Longest path layering from the sources, cycles are broken at the client with fewest pending inputs
+def assignLayers(boxes, succs, preds):
+    layers  = {}
+    clients = []
+    sinks   = []
+
+    for box in boxes:
+        if box.kind == ARRANGE_SOURCE:
+            layers[box.key] = 0
+        elif box.kind == ARRANGE_SINK:
+            sinks.append(box.key)
+        else:
+            clients.append(box.key)
+
+    index    = dict((key, i) for i, key in enumerate(clients))
+    indegree = dict((key, sum(1 for pred in preds[key] if pred in index)) for key in clients)
+
+    ready = deque(key for key in clients if indegree[key] == 0)
+    remaining = set(clients)
+    order = []
+
+    while remaining:
+        if not ready:
+            ready.append(min(remaining, key=lambda key: (indegree[key], index[key])))
+
+        key = ready.popleft()
+
+        if key not in remaining:
+            continue
+
+        remaining.discard(key)
+        order.append(key)
+
+        layer = 1
+        for pred in preds[key]:
+            if pred in layers and layers[pred] >= layer:
+                layer = layers[pred] + 1
+
+        layers[key] = layer
+
+        for succ in succs[key]:
+            if succ in remaining:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    ready.append(succ)
+
+    # Clients without inputs go right before their first output
+    for key in reversed(order):
+        if any(pred in layers for pred in preds[key]):
+            continue
+
+        succ_layers = [layers[succ] for succ in succs[key] if succ in index]
+        if succ_layers:
+            layers[key] = max(1, min(succ_layers) - 1)
+
+    sink_layer = max([layers[key] for key in clients] or [0]) + 1
+
+    for key in sinks:
+        layers[key] = sink_layer
+
+    return (layers, sink_layer)
+
+# Barycenter ordering, alternating down and up sweeps, keeping the order with fewest crossings
+def orderLayers(boxes, layers, succs, preds, layer_count):
+    rows = [[] for i in range(layer_count)]
+
+    # Start from the current vertical order, so results stay close to what the user had
+    for box in sorted(boxes, key=lambda box: (box.y, box.x)):
+        rows[layers[box.key]].append(box.key)
+
+    position = {}
+    for row in rows:
+        updateRowPositions(row, position)
+
+    best_rows = [list(row) for row in rows]
+    best_crossings = countCrossings(rows, layers, succs, position)
+
+    for sweep in range(ARRANGE_SWEEPS):
+        if sweep % 2 == 0:
+            sweep_rows = rows[1:]
+            neighbours = preds
+        else:
+            sweep_rows = reversed(rows[:-1])
+            neighbours = succs
+
+        for row in sweep_rows:
+            barycenters = {}
+
+            for key in row:
+                total = weights = 0.0
+                layer = layers[key]
+
+                for other, weight in neighbours[key].items():
+                    if (layers[other] < layer) if neighbours is preds else (layers[other] > layer):
+                        total   += position[other] * weight
+                        weights += weight
+
+                barycenters[key] = total / weights if weights else position[key]
+
+            row.sort(key=barycenters.get)
+            updateRowPositions(row, position)
+
+        crossings = countCrossings(rows, layers, succs, position)
+
+        if crossings < best_crossings:
+            best_rows = [list(row) for row in rows]
+            best_crossings = crossings
+
+    return (best_rows, best_crossings)
+
+def updateRowPositions(row, position):
+    count = float(len(row))
+
+    for i, key in enumerate(row):
+        position[key] = (i + 0.5) / count
+
+# Crossings between adjacent layers, counted as inversions
+def countCrossings(rows, layers, succs, position):
+    crossings = 0
+
+    for layer in range(len(rows) - 1):
+        pairs = []
+
+        for key in rows[layer]:
+            for succ in succs[key]:
+                if layers[succ] == layer + 1:
+                    pairs.append((position[key], position[succ]))
+
+        pairs.sort()
+        crossings += countInversions([pair[1] for pair in pairs])
+
+    return crossings
+
+def countInversions(values):
+    if len(values) < 2:
+        return 0
+
+    ranks = dict((value, i + 1) for i, value in enumerate(sorted(set(values))))
+    tree  = [0] * (len(ranks) + 1)
+    inversions = 0
+
+    for count, value in enumerate(values):
+        rank = ranks[value]
+
+        # Number of previous values greater than this one
+        i = rank
+        lower_or_equal = 0
+        while i > 0:
+            lower_or_equal += tree[i]
+            i -= i & -i
+
+        inversions += count - lower_or_equal
+
+        i = rank
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
+
+    return inversions
+
+# Closest y to wanted_y that does not overlap the occupied (top, bottom) ranges
+def findFreeSlot(occupied, wanted_y, height):
+    candidates = [wanted_y]
+
+    for top, bottom in occupied:
+        candidates.append(bottom + ARRANGE_ROW_SPACING)
+        candidates.append(top - ARRANGE_ROW_SPACING - height)
+
+    for y in sorted(candidates, key=lambda y: abs(y - wanted_y)):
+        for top, bottom in occupied:
+            if y < bottom + ARRANGE_ROW_SPACING and y + height + ARRANGE_ROW_SPACING > top:
+                break
+        else:
+            return y
+
+    return wanted_y
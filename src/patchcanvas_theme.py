@@ -21,10 +21,10 @@
 
 if True:
     from PyQt5.QtCore import Qt
-    from PyQt5.QtGui import QColor, QFont, QPen, QPixmap
+    from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPen, QPixmap
 else:
     from PyQt4.QtCore import Qt
-    from PyQt4.QtGui import QColor, QFont, QPen, QPixmap
+    from PyQt4.QtGui import QColor, QFont, QFontMetrics, QPen, QPixmap
 
 # ------------------------------------------------------------------------------------------------------------
 # patchcanvas-theme.cpp
@@ -465,6 +465,35 @@ class Theme(object):
             self.rubberband_pen = QPen(QColor(1, 230, 238), 2, Qt.SolidLine)
             self.rubberband_brush = QColor(90, 90, 90, 100)
 
+    # Lookup tables for painting, by (port_type, selected) and font key.
+    # 'port_types' maps each canvas port type to its name in the attributes above.
+    def buildRenderCache(self, port_types):
+        self.port_styles = {}
+        self.line_colors = {}
+        self.line_glows  = {}
+
+        for port_type, name in port_types.items():
+            for selected in (False, True):
+                suffix = "_sel" if selected else ""
+
+                # background, outline pen, text pen
+                self.port_styles[(port_type, selected)] = (getattr(self, "port_%s_bg%s" % (name, suffix)),
+                                                           getattr(self, "port_%s_pen%s" % (name, suffix)),
+                                                           getattr(self, "port_%s_text%s" % (name, suffix)))
+
+                self.line_colors[(port_type, selected)] = getattr(self, "line_%s%s" % (name, suffix))
+
+            self.line_glows[port_type] = getattr(self, "line_%s_glow" % name)
+
+        # Shared by all boxes and ports
+        self.box_font  = QFont(self.box_font_name, self.box_font_size, self.box_font_state)
+        self.port_font = QFont(self.port_font_name, self.port_font_size, self.port_font_state)
+
+        self.font_metrics = {
+            self.box_font.key():  QFontMetrics(self.box_font),
+            self.port_font.key(): QFontMetrics(self.port_font)
+        }
+
 def getDefaultTheme():
     return Theme.THEME_MODERN_DARK
 
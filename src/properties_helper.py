@@ -4,6 +4,7 @@ import glob
 import yaml
 import os
 import datetime as dt
+import concurrent.futures
 import subprocess
 import shlex
 #import jack
@@ -12,23 +13,237 @@ from pathlib import Path
 import traceback
 import threading
 import time
+import select
+import socket
+import struct
+import types
+
+from PyQt5.QtCore import pyqtSignal, QObject
 
 _instance = None
 
-class GroupPropertiesHelper:
+# ------------------------------------------------------------------------------------------------------------
+# OSC client for ray-daemon, one persistent socket per daemon port
+
+RAY_OSC_TIMEOUT = 1.0
+
+# seconds before OSC is tried again on a daemon that failed, doubled on each further failure
+RAY_OSC_RETRY_DELAY = 2
+RAY_OSC_RETRY_DELAY_MAX = 60
+
+# queries sent ahead before waiting for their replies
+RAY_OSC_MAX_PENDING = 64
+
+# these are replied with several /reply messages, the last one without values
+RAY_OSC_LIST_PATHS = ('/ray/session/list_clients',)
+
+# seconds between full reads, the second one once all daemons send their changes
+RAY_POLL_INTERVAL = 5
+RAY_MONITOR_POLL_INTERVAL = 60
+
+# seconds a session is read again after a daemon message, further messages until then are merged
+RAY_SESSION_READ_DELAY = 0.2
+
+# seconds before resolved pids and window lists are looked up again
+RAY_PID_TTL = 30
+RAY_WINDOWS_TTL = 3
+RAY_RESOLVER_WORKERS = 4
+RAY_RESOLVER_CACHE_SIZE = 512
+
+RAY_CUSTOM_DATA_NAMES = ('jacknames', 'layer', 'with_gui', 'windowtitle', 'guitoload', 'clienttype')
+
+def osc_string(value):
+  data = value.encode('utf-8') + b'\0'
+  return data + b'\0' * (-len(data) % 4)
+
+def osc_read_string(data, pos):
+  end = data.index(b'\0', pos)
+  return data[pos:end].decode('utf-8', errors='replace'), (end + 4) & ~3
+
+def osc_encode(path, *args):
+  typetags = ','
+  payload = b''
+  for arg in args:
+    if isinstance(arg, int):
+      typetags += 'i'
+      payload += struct.pack('>i', arg)
+    elif isinstance(arg, float):
+      typetags += 'f'
+      payload += struct.pack('>f', arg)
+    else:
+      typetags += 's'
+      payload += osc_string(str(arg))
+  return osc_string(path) + osc_string(typetags) + payload
+
+def osc_decode(data):
+  path, pos = osc_read_string(data, 0)
+  args = []
+  if pos >= len(data):
+    return path, args
+
+  typetags, pos = osc_read_string(data, pos)
+  for tag in typetags[1:]:
+    if tag == 'i':
+      args.append(struct.unpack_from('>i', data, pos)[0])
+      pos += 4
+    elif tag == 'f':
+      args.append(struct.unpack_from('>f', data, pos)[0])
+      pos += 4
+    elif tag == 'h':
+      args.append(struct.unpack_from('>q', data, pos)[0])
+      pos += 8
+    elif tag == 'd':
+      args.append(struct.unpack_from('>d', data, pos)[0])
+      pos += 8
+    elif tag in 'sS':
+      value, pos = osc_read_string(data, pos)
+      args.append(value)
+    elif tag in 'TFN':
+      args.append({'T': True, 'F': False, 'N': None}[tag])
+    else:
+      raise ValueError('unsupported OSC type tag: %s' % tag)
+  return path, args
+
+class RayOscClient:
+
+  def __init__(self, port, timeout=RAY_OSC_TIMEOUT):
+    self.address = ('127.0.0.1', int(port))
+    self.lock = threading.Lock()
+    self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    self.sock.bind(('127.0.0.1', 0))
+    self.sock.settimeout(timeout)
+    self.closed = False
+
+  def close(self):
+    self.closed = True
+    self.sock.close()
+
+  # Sends all queries ahead and returns their results in the same order: the reply values
+  # after the query path, or None where the daemon replied with an error.
+  # The daemon answers in order, so each reply goes to the oldest query pending for its path.
+  def query(self, queries):
+    results = [[] if query[0] in RAY_OSC_LIST_PATHS else None for query in queries]
+    pending = []
+    sent = 0
+
+    with self.lock:
+      while sent < len(queries) or pending:
+        while sent < len(queries) and len(pending) < RAY_OSC_MAX_PENDING:
+          self.sock.sendto(osc_encode(*queries[sent]), self.address)
+          pending.append(sent)
+          sent += 1
+
+        # socket.timeout if the daemon is gone
+        path, args = osc_decode(self.sock.recv(65536))
+        if path not in ('/reply', '/error') or not args:
+          continue
+
+        for index in pending:
+          if queries[index][0] == args[0]:
+            break
+        else:
+          continue
+
+        if path == '/error':
+          results[index] = None
+          pending.remove(index)
+        elif args[0] in RAY_OSC_LIST_PATHS:
+          if len(args) == 1:
+            pending.remove(index)
+          else:
+            results[index] += args[1:]
+        else:
+          results[index] = args[1:]
+          pending.remove(index)
+
+    return results
+
+# Receives the changes ray-daemon sends to its monitors, on a socket of its own
+class RayOscMonitor:
+
+  def __init__(self):
+    self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    self.sock.bind(('127.0.0.1', 0))
+    self.address = self.sock.getsockname()
+
+  def close(self):
+    self.sock.close()
+
+  def send(self, port, path, *args):
+    self.sock.sendto(osc_encode(path, *args), ('127.0.0.1', int(port)))
+
+  # Ends a wait() running in another thread
+  def wake(self):
+    self.sock.sendto(osc_encode('/wake'), self.address)
+
+  # Next message as (daemon port, path, args), None once the timeout is over
+  def wait(self, timeout):
+    if not select.select([self.sock], [], [], max(timeout, 0))[0]:
+      return None
+    data, address = self.sock.recvfrom(65536)
+    path, args = osc_decode(data)
+    return str(address[1]), path, args
+
+# ------------------------------------------------------------------------------------------------------------
+# Jack clients properties as published to readers
+
+# stands for the pid in jack names registered by clients which add their pid to it
+PID_PATTERN = 'xxx-PID-xxx'
+
+# Never modified once built, the helper replaces it as a whole on each update
+class JackClientsSnapshot:
+
+  def __init__(self, jackclients={}):
+    self.clients = types.MappingProxyType(dict(jackclients))
+    # pid names are found by splitting them on their pid, as their pattern splits on PID_PATTERN
+    self.pid_patterns = {}
+    for name in jackclients:
+      if PID_PATTERN in name:
+        self.pid_patterns[tuple(name.split(PID_PATTERN))] = name
+
+  # Registered name of a jack client, which may end with a pid, and that pid
+  def lookup(self, jackclientname):
+    digits = jackclientname[len(jackclientname.rstrip('0123456789')):]
+    if not digits:
+      return jackclientname, 0
 
+    candidatepid = int(digits)
+    name = self.pid_patterns.get(tuple(jackclientname.split(str(candidatepid))))
+    return name or jackclientname, candidatepid
 
-  def __init__(self, Debug=True):
+# ------------------------------------------------------------------------------------------------------------
+
+class GroupPropertiesHelper(QObject):
+  # {jackname: properties, or None when removed}, emitted after the snapshot holds them
+  jackClientsChanged = pyqtSignal(dict)
+
+  def __init__(self, Debug=True, UseOsc=True):
+    QObject.__init__(self)
     self.Debug = Debug
     if self.Debug:
       print('<==== GroupPropertiesHelper:: init')
 
     self.sched = None
     self.session_path_by_port = {}
+    self.daemon_ports = set()
     self.jackclients = {}
+    self.snapshot = JackClientsSnapshot()
     self.layer_list = []
     self.lock = threading.Lock()            
+    self.use_osc = UseOsc
+    self.osc_clients = {}
+    # {port: (failures, time of the next OSC try)}
+    self.osc_failures = {}
+    self.osc_lock = threading.Lock()
+    self.monitor = RayOscMonitor() if UseOsc else None
+    self.monitored_ports = set()
+    self.session_reads = {}
+    self.resolver = concurrent.futures.ThreadPoolExecutor(max_workers=RAY_RESOLVER_WORKERS)
+    self.resolver_cache = {}
+    self.resolver_pending = {}
+    self.resolver_lock = threading.Lock()
     self.executing = False
+    self.jackClientsChanged.connect(self.applyJackClientsChanges)
     self.read_sessions()
     self.stopEvent = threading.Event()
     self.thread = threading.Thread(target=self.run)
@@ -37,9 +252,182 @@ class GroupPropertiesHelper:
     if self.Debug:
       print('>==== GroupPropertiesHelper:: init')
   
+  # Waits for daemon changes, with full reads in between in case some were missed
   def run(self):
-    while not self.stopEvent.wait(5):
-      self.read_sessions()
+    last_read = time.monotonic()
+    while not self.stopEvent.is_set():
+      now = time.monotonic()
+      timeout = last_read + self.pollInterval() - now
+      if timeout <= 0:
+        # reads all sessions anyway
+        self.session_reads = {}
+        self.read_sessions()
+        last_read = time.monotonic()
+      elif self.session_reads and min(self.session_reads.values()) <= now:
+        self.readPendingSessions(now)
+      elif self.monitor:
+        if self.session_reads:
+          timeout = min(timeout, min(self.session_reads.values()) - now)
+        try:
+          message = self.monitor.wait(timeout)
+          if message:
+            self.monitorMessage(*message)
+        except Exception as e:
+          if self.Debug:
+            traceback.print_exc()
+            print (e)
+      else:
+        self.stopEvent.wait(timeout)
+
+    if self.monitor:
+      for port in self.monitored_ports:
+        try:
+          self.monitor.send(port, '/ray/server/monitor_quit')
+        except OSError:
+          pass
+      self.monitor.close()
+
+    # pool lookups may be querying over the OSC clients, let them finish first
+    self.resolver.shutdown(wait=True)
+
+    for port in list(self.osc_clients):
+      self.closeOscClient(port)
+
+  def pollInterval(self):
+    if self.daemon_ports and self.monitored_ports.issuperset(self.daemon_ports):
+      return RAY_MONITOR_POLL_INTERVAL
+    return RAY_POLL_INTERVAL
+
+  def monitorPort(self, port):
+    if self.monitor and self.use_osc:
+      try:
+        self.monitor.send(port, '/ray/server/monitor_announce')
+      except OSError as e:
+        if self.Debug:
+          print (e)
+
+  def monitorMessage(self, port, path, args):
+    if port not in self.daemon_ports:
+      return
+
+    if path in ('/reply', '/error') and args[:1] == ['/ray/server/monitor_announce']:
+      # daemons without monitors stay polled at the usual rate
+      if path == '/reply':
+        self.monitored_ports.add(port)
+      return
+
+    if not path.startswith('/ray/monitor/'):
+      return
+
+    if self.Debug:
+      print ('<==== GroupPropertiesHelper:: monitorMessage %s %s %s' % (port, path, str(args)))
+
+    clientid = args[0] if args and isinstance(args[0], str) else ''
+    if clientid:
+      # the client may have been restarted with another pid
+      self.uncache(('pid', port, clientid))
+
+    if path in ('/ray/monitor/client_event', '/ray/monitor/client_state') and clientid and port in self.session_path_by_port:
+      if path == '/ray/monitor/client_event' and args[1:2] == ['removed']:
+        self.setProperties(port, {}, clientid)
+      else:
+        self.updateProperties(port, clientid)
+    else:
+      self.scheduleSessionRead(port)
+
+  # a burst of daemon messages, like while a session loads, gives a single read
+  def scheduleSessionRead(self, port):
+    if port not in self.session_reads:
+      self.session_reads[port] = time.monotonic() + RAY_SESSION_READ_DELAY
+
+  def readPendingSessions(self, now):
+    for port, read_time in list(self.session_reads.items()):
+      if read_time > now:
+        continue
+      del self.session_reads[port]
+      if port not in self.daemon_ports:
+        continue
+      try:
+        self.readSession(port, force=True)
+      except Exception as e:
+        if self.Debug:
+          traceback.print_exc()
+          print (e)
+
+  def applyJackClientsChanges(self, changes):
+    # all jack names of a client share its pid and windows
+    clients = {}
+    for jackname, properties in changes.items():
+      if properties is not None:
+        clients.setdefault((properties['port'], properties['clientid']), jackname)
+
+    for (port, clientid), jackname in clients.items():
+      self.uncache(('pid', port, clientid))
+      self.prewarm(jackname)
+
+  # Resolves the "Go to app" menu of a new client in the pool, so it opens from the cache
+  def prewarm(self, jackclientname):
+    try:
+      self.resolver.submit(self.getWinIdsAndtitles, jackclientname)
+    except RuntimeError:
+      # pool already shut down
+      pass
+
+  # Value of resolve(*args), kept ttl seconds under key.
+  # Expired values are still returned while being resolved again in the pool, missing ones are resolved here.
+  # A missing value already being resolved by another thread is waited for.
+  def cached(self, key, ttl, resolve, *args):
+    with self.resolver_lock:
+      entry = self.resolver_cache.get(key)
+      if entry and entry[0] > time.monotonic():
+        return entry[1]
+      pending = self.resolver_pending.get(key)
+      if pending is None:
+        self.resolver_pending[key] = (threading.Event(), entry is None)
+
+    if entry is None:
+      if pending is None:
+        return self.resolveEntry(key, ttl, resolve, args)
+      event, first = pending
+      # refreshes may still be queued in the pool, which could be waiting here itself
+      if first:
+        event.wait()
+        with self.resolver_lock:
+          entry = self.resolver_cache.get(key)
+        if entry is not None:
+          return entry[1]
+      # failed, or uncached meanwhile
+      return resolve(*args)
+
+    if pending is None:
+      try:
+        self.resolver.submit(self.resolveEntry, key, ttl, resolve, args)
+      except RuntimeError:
+        self.resolveDone(key)
+    return entry[1]
+
+  def resolveEntry(self, key, ttl, resolve, args):
+    try:
+      value = resolve(*args)
+      with self.resolver_lock:
+        if len(self.resolver_cache) >= RAY_RESOLVER_CACHE_SIZE:
+          now = time.monotonic()
+          for oldkey in [oldkey for oldkey, entry in self.resolver_cache.items() if entry[0] <= now]:
+            del self.resolver_cache[oldkey]
+        self.resolver_cache[key] = (time.monotonic() + ttl, value)
+      return value
+    finally:
+      self.resolveDone(key)
+
+  def resolveDone(self, key):
+    with self.resolver_lock:
+      pending = self.resolver_pending.pop(key, None)
+    if pending:
+      pending[0].set()
+
+  def uncache(self, key):
+    with self.resolver_lock:
+      self.resolver_cache.pop(key, None)
       
   @staticmethod
   def instance():
@@ -52,45 +440,44 @@ class GroupPropertiesHelper:
     if self.Debug:
       print ('GroupPropertiesHelper:: stop')
     self.stopEvent.set()
+    if self.monitor:
+      self.monitor.wake()
+    self.resolver.shutdown(wait=False, cancel_futures=True)
   
+  def readSession(self, port, force=False):
+    session_path = self.get_session_path(port)
+    if not session_path:
+      if port in self.session_path_by_port:
+        self.removeProperties(port)
+        del self.session_path_by_port[port]
+    elif force or self.session_path_by_port.get(port) != session_path:
+      self.session_path_by_port[port] = session_path
+      self.updateProperties(port)
+
   def read_sessions(self):
     if not self.executing:
       self.executing = True
       try:
         if self.Debug:
           print ('<==== GroupPropertiesHelper:: read_sessions')
-        portsToRemove = []
-        for port in self.session_path_by_port:
-          portsToRemove.append(port)
-        
-        ports = self.get_list_daemons()
-        if ports:
-          for port in ports:
-            if port.isdigit():
-              session_path = self.get_session_path(port)
-                
-              if port not in self.session_path_by_port:
-                if session_path:
-                  self.session_path_by_port[port] = session_path
-                  self.updateProperties(port)
-                  if port in portsToRemove:
-                    portsToRemove.remove(port)
-              elif self.session_path_by_port[port] != session_path:
-                if session_path:
-                  self.removeProperties(port)
-                  self.session_path_by_port[port] = session_path
-                  self.updateProperties(port)
-                  if port in portsToRemove:
-                    portsToRemove.remove(port)
-              elif self.session_path_by_port[port] == session_path:
-                if port in portsToRemove:
-                  portsToRemove.remove(port)
-
-        for port in portsToRemove:
-          self.removeProperties(port)
-
-        for port in portsToRemove:
-          del self.session_path_by_port[port]
+        ports = [port for port in self.get_list_daemons() or [] if port.isdigit()]
+        for port in ports:
+          if port not in self.daemon_ports:
+            self.monitorPort(port)
+          # clients are read again too, daemons without monitor don't tell when they change
+          self.readSession(port, force=True)
+
+        for port in list(self.session_path_by_port):
+          if port not in ports:
+            self.removeProperties(port)
+            del self.session_path_by_port[port]
+
+        for port in self.daemon_ports.difference(ports):
+          self.closeOscClient(port)
+          with self.osc_lock:
+            self.osc_failures.pop(port, None)
+          self.monitored_ports.discard(port)
+        self.daemon_ports = set(ports)
 
       except Exception as e:
         if self.Debug:
@@ -101,7 +488,51 @@ class GroupPropertiesHelper:
     if self.Debug:
       print ('>==== GroupPropertiesHelper:: read_sessions')
             
+  # Runs the queries over the daemon OSC port, None if that doesn't work and ray_control is needed
+  def osc_query(self, port, queries):
+    if not self.use_osc:
+      return None
+
+    client = None
+    try:
+      with self.osc_lock:
+        failure = self.osc_failures.get(port)
+        if failure and failure[1] > time.monotonic():
+          return None
+        client = self.osc_clients.get(port)
+        if client is None:
+          client = self.osc_clients[port] = RayOscClient(port)
+      results = client.query(queries)
+      if failure:
+        with self.osc_lock:
+          self.osc_failures.pop(port, None)
+      return results
+    except Exception as e:
+      # closed by another thread meanwhile, not a daemon failure
+      if client is not None and client.closed:
+        return None
+      if self.Debug:
+        traceback.print_exc()
+        print (e)
+      # late replies would be taken for the next ones, so don't reuse the socket
+      self.closeOscClient(port)
+      with self.osc_lock:
+        failures = self.osc_failures.get(port, (0, 0))[0] + 1
+        delay = min(RAY_OSC_RETRY_DELAY * 2 ** (failures - 1), RAY_OSC_RETRY_DELAY_MAX)
+        self.osc_failures[port] = (failures, time.monotonic() + delay)
+      return None
+
+  def closeOscClient(self, port):
+    with self.osc_lock:
+      client = self.osc_clients.pop(port, None)
+    if client:
+      client.close()
+
   def get_list_clients(self, port):
+    results = self.osc_query(port, [('/ray/session/list_clients',)])
+    if results is not None:
+      return results[0] or None
+
     cmd = ['ray_control','--port', str(port), 'list_clients']
     if self.Debug:
       print(' '.join(cmd))
@@ -134,6 +565,32 @@ class GroupPropertiesHelper:
         print (e)
       return None
     
+  # Custom data of the clients with jack names, as {clientid: {dataname: value}}.
+  # Over OSC this is a single batch, ray_control is called per client and data.
+  def get_clients_custom_data(self, port, clientids):
+    clientsdata = {}
+    queries = [('/ray/client/get_custom_data', clientid, dataname) for clientid in clientids for dataname in RAY_CUSTOM_DATA_NAMES]
+    results = self.osc_query(port, queries)
+
+    if results is not None:
+      for i, clientid in enumerate(clientids):
+        values = results[i * len(RAY_CUSTOM_DATA_NAMES):(i + 1) * len(RAY_CUSTOM_DATA_NAMES)]
+        data = dict((dataname, str(value[0]) if value else None) for dataname, value in zip(RAY_CUSTOM_DATA_NAMES, values))
+        if data['jacknames'] is not None:
+          data['jacknames'] = data['jacknames'].split(';')
+        if data['jacknames']:
+          clientsdata[clientid] = data
+      return clientsdata
+
+    for clientid in clientids:
+      jacknames = self.get_custom_data(port, clientid, 'jacknames', seperator=';', listtype=True)
+      if jacknames:
+        data = {'jacknames': jacknames}
+        for dataname in RAY_CUSTOM_DATA_NAMES[1:]:
+          data[dataname] = self.get_custom_data(port, clientid, dataname)
+        clientsdata[clientid] = data
+    return clientsdata
+
   def get_session_path(self, port):
     try:
       sessionpath = subprocess.check_output(['ray_control', '--port', str(port), 'get_session_path'], text=True)
@@ -168,60 +625,70 @@ class GroupPropertiesHelper:
     if self.Debug:
       print ('<==== GroupPropertiesHelper:: removeProperties port: %s' % port)
 
-    listToRemove = []
-    for jackname in self.jackclients:
-      if self.jackclients[jackname]['port'] == port:
-        listToRemove.append(jackname)
+    self.setProperties(port, {})
+
+  # Replaces the properties of a daemon, or of one of its clients, and publishes what changed
+  def setProperties(self, port, jackclients, clientid=None):
+    changes = {}
 
     self.lock.acquire()
-    for jackname in listToRemove:
-      del self.jackclients[jackname]
+
+    for name, properties in list(self.jackclients.items()):
+      if properties['port'] == port and (clientid is None or properties['clientid'] == clientid) and name not in jackclients:
+        del self.jackclients[name]
+        changes[name] = None
+
+    for name, properties in jackclients.items():
+      current = self.jackclients.get(name)
+      # the first daemon with this name keeps it
+      if current and current['port'] != port:
+        continue
+      if current != properties:
+        self.jackclients[name] = properties
+        changes[name] = properties
+
+    if self.Debug:
+      print (self.jackclients)
+
+    if changes:
+      self.snapshot = JackClientsSnapshot(self.jackclients)
     self.lock.release()
 
-  def updateProperties(self,port):
+    if changes:
+      self.jackClientsChanged.emit(changes)
+
+  def updateProperties(self, port, clientid=None):
     if self.Debug:
       print ('<==== GroupPropertiesHelper:: updateProperties')
       print ('update properties for port %s session_path %s' % (str(port), self.session_path_by_port[port]))
     
-    clientids = self.get_list_clients(port)
+    clientids = [clientid] if clientid else self.get_list_clients(port)
     sessionname = self.get_session_name(port)
 
     jackclients = {}
     if clientids:
+      clientsdata = self.get_clients_custom_data(port, clientids)
       for clientid in clientids:
-        jacknames = self.get_custom_data(port, clientid, 'jacknames', seperator=';', listtype=True)
-        if jacknames:
-          layer = self.get_custom_data(port, clientid, 'layer')
-          with_gui = self.get_custom_data(port, clientid, 'with_gui')
-          windowtitle = self.get_custom_data(port, clientid, 'windowtitle')
-          guitoload = self.get_custom_data(port, clientid, 'guitoload')
-          clienttype = self.get_custom_data(port, clientid, 'clienttype')
+        if clientid in clientsdata:
+          data = clientsdata[clientid]
         
-          for jackname in jacknames:
+          for jackname in data['jacknames']:
             jackclients[jackname] = {
               'name' : jackname,
-              'windowtitle' : windowtitle,
-              'layer' : layer,
-              'guitoload' : guitoload,
+              'windowtitle' : data['windowtitle'],
+              'layer' : data['layer'],
+              'guitoload' : data['guitoload'],
               'sessionname' : sessionname,
               'clientid' : clientid,
               'port': port,
-              'clienttype' : clienttype,
-              'with_gui' : with_gui
+              'clienttype' : data['clienttype'],
+              'with_gui' : data['with_gui']
             }
     
     if self.Debug:
       print ('Updating ...')
     
-    self.lock.acquire()
-
-    for name in jackclients:
-      if name not in self.jackclients:
-        self.jackclients[name] = jackclients[name]
-
-    if self.Debug:
-      print (self.jackclients)
-    self.lock.release()
+    self.setProperties(port, jackclients, clientid)
 
     if self.Debug:
       print ('>==== GroupPropertiesHelper:: updateProperties')
@@ -234,20 +701,38 @@ class GroupPropertiesHelper:
     #result = out.splitlines()[0]
     #return result.endswith(sessionname)
   
-  def __getPidFromRayControl(self, jackclientname):
+  def __getPidFromRayControl(self, jackclientname, snapshot):
     
-    if jackclientname not in self.jackclients:
+    if jackclientname not in snapshot.clients:
       if self.Debug:
         print ('jackclientname not registered in properties: %s' % jackclientname)
       return 0
     
-    port = self.jackclients[jackclientname]['port']
-    sessionname = self.jackclients[jackclientname]['sessionname']
-    clientid = self.jackclients[jackclientname]['clientid']
-    clienttype = self.jackclients[jackclientname]['clienttype']
+    port = snapshot.clients[jackclientname]['port']
+    sessionname = snapshot.clients[jackclientname]['sessionname']
+    clientid = snapshot.clients[jackclientname]['clientid']
+    clienttype = snapshot.clients[jackclientname]['clienttype']
     
     pid = 0
     if clientid and port and clienttype:
+      pid = self.cached(('pid', port, clientid), RAY_PID_TTL, self.resolvePid, port, clientid, clienttype)
+    
+    if self.Debug:
+      print ('final pid: %d' % pid)
+    return pid
+
+  # Pid of a client, or of the program started by it for proxy clients
+  def resolvePid(self, port, clientid, clienttype):
+    pid = 0
+    results = self.osc_query(port, [('/ray/client/get_pid', clientid)])
+    if results is not None:
+      try:
+        pid = int(results[0][0]) if results[0] else 0
+      except ValueError:
+        pid = 0
+      if self.Debug:
+        print ('ray pid: %d' % pid)
+    else:
       cmd = ['ray_control','--port', str(port), 'client', '"' + clientid + '"', 'get_pid']
       if self.Debug:
         print(' '.join(cmd))
@@ -260,27 +745,24 @@ class GroupPropertiesHelper:
       except Exception as e:
         print (e)
         pid = 0
-      if pid != 0 and (clienttype == 'proxy' or clienttype == 'proxy-wrapper'):
-        try:
+    if pid != 0 and (clienttype == 'proxy' or clienttype == 'proxy-wrapper'):
+      try:
+        cmd = ['pgrep','-P', str(pid)]
+        out = subprocess.check_output(' '.join(cmd), shell=True, text=True)        
+        result = out.splitlines()[0].split()
+        pid = int(result[0])
+        if self.Debug:
+          print ('proxy child pid: %d' % pid)
+        if clienttype == 'proxy-wrapper':
           cmd = ['pgrep','-P', str(pid)]
           out = subprocess.check_output(' '.join(cmd), shell=True, text=True)        
           result = out.splitlines()[0].split()
           pid = int(result[0])
           if self.Debug:
-            print ('proxy child pid: %d' % pid)
-          if clienttype == 'proxy-wrapper':
-            cmd = ['pgrep','-P', str(pid)]
-            out = subprocess.check_output(' '.join(cmd), shell=True, text=True)        
-            result = out.splitlines()[0].split()
-            pid = int(result[0])
-            if self.Debug:
-              print ('wrapper child pid: %d' % pid)
-        except:
-          print (e)
-          pid = 0
-    
-    if self.Debug:
-      print ('final pid: %d' % pid)
+            print ('wrapper child pid: %d' % pid)
+      except Exception as e:
+        print (e)
+        pid = 0
     return pid
 
   #def __getPidFromFile(self, jackclientname):
@@ -348,28 +830,24 @@ class GroupPropertiesHelper:
     
 
       
+  # Reads the current snapshot, without waiting for updates in progress
   def getProperty(self, jackclientname, propertyname):
-    self.lock.acquire()
-    result = self.get_property_unlock(jackclientname, propertyname)
-    self.lock.release()
-    return result
+    return self.get_property_unlock(jackclientname, propertyname)
   
-  def get_property_unlock(self, jackclientname, propertyname):
+  # Pass the same snapshot to read several properties of one state
+  def get_property_unlock(self, jackclientname, propertyname, snapshot=None):
+    if snapshot is None:
+      snapshot = self.snapshot
+
     # if the string ends with a number, its perhaps a pid number
-    candidatepid = 0
-    m = re.search(r'(\d+)$', jackclientname)
-    if m:
-      candidatepid = int(m.group(0))
-      nametosearch = jackclientname.replace(str(candidatepid),'xxx-PID-xxx')
-      if nametosearch in self.jackclients:
-        jackclientname = nametosearch
+    jackclientname, candidatepid = snapshot.lookup(jackclientname)
         
     if propertyname == 'pid':
       # try to get pid from jacklib
       #result = jack.client_pid(jackclientname)
       # otherwise we get pid from pid Ray Control or from file
       #if result == 0:
-      result = self.__getPidFromRayControl(jackclientname)
+      result = self.__getPidFromRayControl(jackclientname, snapshot)
       #if result == 0:
         #result = self.__getPidFromFile(jackclientname)
       result = int(result)
@@ -379,8 +857,8 @@ class GroupPropertiesHelper:
     
     result = None
     
-    if jackclientname in self.jackclients and propertyname in self.jackclients[jackclientname]:
-      result = self.jackclients[jackclientname][propertyname]
+    if jackclientname in snapshot.clients and propertyname in snapshot.clients[jackclientname]:
+      result = snapshot.clients[jackclientname][propertyname]
         
     if self.Debug:
       print ('%s: "%s"' % (propertyname, result))
@@ -440,7 +918,14 @@ class GroupPropertiesHelper:
             menuoptions.append({'winid': winid, 'title': title})
     return menuoptions
 
+
+  def cachedWinIdsAndtitlesFromPid(self, pid, regexp=None):
+    return list(self.cached(('pid-windows', pid, regexp), RAY_WINDOWS_TTL, self.getWinIdsAndtitlesFromPid, pid, '--many-titles', regexp))
+
+  def cachedWinIdsAndtitlesFromRegexp(self, regexp, option='--many-titles'):
+    return list(self.cached(('regexp-windows', regexp, option), RAY_WINDOWS_TTL, self.getWinIdsAndtitlesFromRegexp, regexp, option))
     
+  # Called from the GUI thread for the group context menu, and from the resolver pool to prewarm it
   def getWinIdsAndtitles(self, jackclientname):
     if self.Debug:
       print ('<==== GroupPropertiesHelper:: getWinIdsAndtitles')
@@ -454,33 +939,29 @@ class GroupPropertiesHelper:
     menuoptions = []
 
 
-    try:
-      self.lock.acquire()
-            
-      windowtitle = self.get_property_unlock(jackclientname,'windowtitle')
-      guitoload = self.get_property_unlock(jackclientname,'guitoload')
-      with_gui = self.get_property_unlock(jackclientname,'with_gui')
-      layer = self.get_property_unlock(jackclientname,'layer')
-      pid = self.get_property_unlock(jackclientname, 'pid')
-      sessionname = self.get_property_unlock(jackclientname,'sessionname')      
-      
-      if self.Debug:
-        print('--pid: %d\n--windowtitle:%s\n--guitoload:%s\n--layer:%s\n--sessionname:%s\nwith_gui:%s\n' % (pid,windowtitle,guitoload,layer,sessionname, str(with_gui)))
-      
-      if with_gui and pid != 0 and windowtitle:
-        menuoptions = self.getWinIdsAndtitlesFromPid(pid, regexp=windowtitle)
-      elif with_gui and pid != 0:
-        menuoptions = self.getWinIdsAndtitlesFromPid(pid)
-      elif not with_gui and windowtitle:
-        menuoptions = self.getWinIdsAndtitlesFromRegexp(windowtitle)
-    finally:
-      self.lock.release()
+    snapshot = self.snapshot
+    windowtitle = self.get_property_unlock(jackclientname,'windowtitle', snapshot)
+    guitoload = self.get_property_unlock(jackclientname,'guitoload', snapshot)
+    with_gui = self.get_property_unlock(jackclientname,'with_gui', snapshot)
+    layer = self.get_property_unlock(jackclientname,'layer', snapshot)
+    pid = self.get_property_unlock(jackclientname, 'pid', snapshot)
+    sessionname = self.get_property_unlock(jackclientname,'sessionname', snapshot)      
+    
+    if self.Debug:
+      print('--pid: %d\n--windowtitle:%s\n--guitoload:%s\n--layer:%s\n--sessionname:%s\nwith_gui:%s\n' % (pid,windowtitle,guitoload,layer,sessionname, str(with_gui)))
+    
+    if with_gui and pid != 0 and windowtitle:
+      menuoptions = self.cachedWinIdsAndtitlesFromPid(pid, regexp=windowtitle)
+    elif with_gui and pid != 0:
+      menuoptions = self.cachedWinIdsAndtitlesFromPid(pid)
+    elif not with_gui and windowtitle:
+      menuoptions = self.cachedWinIdsAndtitlesFromRegexp(windowtitle)
 
     if len(menuoptions) == 0 and guitoload:
       menuoptions.append({'winid': None, 'title': 'start ' + guitoload})
 
     if sessionname:
-      menuoptions += self.getWinIdsAndtitlesFromRegexp('RaySession - %s' % sessionname, option='--single-title')
+      menuoptions += self.cachedWinIdsAndtitlesFromRegexp('RaySession - %s' % sessionname, option='--single-title')
 
       
 
@@ -503,15 +984,12 @@ class GroupPropertiesHelper:
     sessionname = None
     menuoptions = None
 
-    self.lock.acquire()
-
-    if jackclientname in self.jackclients:
-      windowtitle = self.get_property_unlock(jackclientname,'windowtitle')
-      guitoload = self.get_property_unlock(jackclientname,'guitoload')
-      layer = self.get_property_unlock(jackclientname,'layer')
-      sessionname = self.get_property_unlock(jackclientname,'sessionname')      
-
-    self.lock.release()
+    snapshot = self.snapshot
+    if jackclientname in snapshot.clients:
+      windowtitle = self.get_property_unlock(jackclientname,'windowtitle', snapshot)
+      guitoload = self.get_property_unlock(jackclientname,'guitoload', snapshot)
+      layer = self.get_property_unlock(jackclientname,'layer', snapshot)
+      sessionname = self.get_property_unlock(jackclientname,'sessionname', snapshot)      
 
     cmd = None
     if winid:
@@ -528,7 +528,6 @@ class AbstractCanvasJackClass(QMainWindow):
     # Shared Connections
 
     def setCanvasConnections(self):
-        self.ui.act_canvas_arrange.setEnabled(False) # TODO, later
         self.ui.act_canvas_arrange.triggered.connect(self.slot_canvasArrange)
         self.ui.act_canvas_refresh.triggered.connect(self.slot_canvasRefresh)
         self.ui.act_canvas_zoom_fit.triggered.connect(self.slot_canvasZoomFit)
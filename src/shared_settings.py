@@ -158,6 +158,9 @@ class SettingsW(QDialog):
             self.ui.cb_canvas_hide_groups.setChecked(settings.value("Canvas/AutoHideGroups", self.fAutoHideGroups, type=bool))
             self.ui.cb_canvas_bezier_lines.setChecked(settings.value("Canvas/UseBezierLines", True, type=bool))
             self.ui.cb_canvas_eyecandy.setCheckState(settings.value("Canvas/EyeCandy", CANVAS_EYECANDY_SMALL, type=int))
+            self.ui.cb_canvas_item_cache.setChecked(settings.value("Canvas/UseItemCache", False, type=bool))
+            self.ui.cb_canvas_virtualize.setChecked(settings.value("Canvas/VirtualizeGroups", False, type=bool))
+            self.ui.cb_canvas_bundle.setChecked(settings.value("Canvas/BundleConnections", False, type=bool))
             self.ui.cb_canvas_use_opengl.setChecked(settings.value("Canvas/UseOpenGL", False, type=bool))
             self.ui.cb_canvas_render_aa.setCheckState(settings.value("Canvas/Antialiasing", CANVAS_ANTIALIASING_SMALL, type=int))
             self.ui.cb_canvas_render_hq_aa.setChecked(settings.value("Canvas/HighQualityAntialiasing", False, type=bool))
@@ -202,6 +205,9 @@ class SettingsW(QDialog):
             settings.setValue("Canvas/Theme", self.ui.cb_canvas_theme.currentText())
             settings.setValue("Canvas/AutoHideGroups", self.ui.cb_canvas_hide_groups.isChecked())
             settings.setValue("Canvas/UseBezierLines", self.ui.cb_canvas_bezier_lines.isChecked())
+            settings.setValue("Canvas/UseItemCache", self.ui.cb_canvas_item_cache.isChecked())
+            settings.setValue("Canvas/VirtualizeGroups", self.ui.cb_canvas_virtualize.isChecked())
+            settings.setValue("Canvas/BundleConnections", self.ui.cb_canvas_bundle.isChecked())
             settings.setValue("Canvas/UseOpenGL", self.ui.cb_canvas_use_opengl.isChecked())
             settings.setValue("Canvas/HighQualityAntialiasing", self.ui.cb_canvas_render_hq_aa.isChecked())
 
@@ -232,6 +238,9 @@ class SettingsW(QDialog):
             self.ui.cb_canvas_hide_groups.setChecked(self.fAutoHideGroups)
             self.ui.cb_canvas_bezier_lines.setChecked(True)
             self.ui.cb_canvas_eyecandy.setCheckState(Qt.PartiallyChecked)
+            self.ui.cb_canvas_item_cache.setChecked(False)
+            self.ui.cb_canvas_virtualize.setChecked(False)
+            self.ui.cb_canvas_bundle.setChecked(False)
             self.ui.cb_canvas_use_opengl.setChecked(False)
             self.ui.cb_canvas_render_aa.setCheckState(Qt.PartiallyChecked)
             self.ui.cb_canvas_render_hq_aa.setChecked(False)